@@ -1,8 +1,12 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.cache_usuarios import cache_usuarios
+from app.crud.user import crud_user
+from app.db.async_session import get_async_db
 from app.db.session import get_db
-from app.core.security import get_current_user as get_current_user_security
+from app.core.security import obtener_id_usuario_token, verificar_usuario
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login/access-token")
@@ -21,7 +25,35 @@ def get_current_user(
     """
     Devuelve el usuario autenticado actual a partir del token JWT.
     Lanza HTTPException si el token no es válido o el usuario no existe.
+
+    El token se decodifica en el mismo hilo y el usuario sale de la caché de
+    usuarios; solo si no está (o venció) se consulta la base de datos.
+    """
+    user_id = obtener_id_usuario_token(token)
+    user = cache_usuarios.obtener(user_id)
+    if user is None:
+        generacion = cache_usuarios.generacion
+        user = crud_user.get(db, id=user_id)
+        if user is not None:
+            # Desacoplado de la sesión de esta petición para poder compartirlo entre peticiones
+            db.expunge(user)
+        cache_usuarios.guardar(user, generacion)
+    return verificar_usuario(user)
+
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    """
+    Igual que get_current_user pero con la sesión asíncrona, para los endpoints async.
     """
-    # Usa la función asíncrona de seguridad, pero aquí la llamamos de forma síncrona
-    import asyncio
-    return asyncio.run(get_current_user_security(db=db, token=token))
\ No newline at end of file
+    user_id = obtener_id_usuario_token(token)
+    user = cache_usuarios.obtener(user_id)
+    if user is None:
+        generacion = cache_usuarios.generacion
+        user = await crud_user.get_async(db, id=user_id)
+        if user is not None:
+            db.expunge(user)
+        cache_usuarios.guardar(user, generacion)
+    return verificar_usuario(user)
@@ -1,39 +1,42 @@
 from typing import Any, List
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.schemas.alternativa import AlternativaCreate, AlternativaUpdate, Alternativa
 
 from app.api import deps
+from app.db.async_session import get_async_db
 from app.db.session import get_db
 
 router = APIRouter()
 
 
 @router.get("/escenario/{escenario_id}", response_model=List[Alternativa])
-def read_alternativas_by_escenario(
+async def read_alternativas_by_escenario(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     escenario_id: int,
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: models.User = Depends(deps.get_current_user_async),
 ) -> Any:
     """
     Obtener alternativas de un escenario específico
     """
     # Verificar que el escenario pertenece al usuario
-    escenario = db.query(models.Escenario).join(models.Proyecto).filter(
+    escenario = await db.scalar(select(models.Escenario.id).join(models.Proyecto).where(
         models.Escenario.id == escenario_id,
         models.Proyecto.owner_id == current_user.id
-    ).first()
+    ))
     if not escenario:
         raise HTTPException(status_code=404, detail="Escenario no encontrado")
     
-    alternativas = db.query(models.Alternativa).filter(
+    alternativas = await db.scalars(select(models.Alternativa).where(
         models.Alternativa.escenario_id == escenario_id
-    ).all()
-    return alternativas
+    ))
+    return list(alternativas)
 
 
 @router.post("/", response_model=Alternativa)
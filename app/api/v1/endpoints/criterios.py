@@ -1,38 +1,41 @@
 from typing import Any, List
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.schemas.criterio import CriterioCreate, CriterioUpdate, Criterio
 from app.api import deps
+from app.db.async_session import get_async_db
 from app.db.session import get_db
 
 router = APIRouter()
 
 
 @router.get("/escenario/{escenario_id}", response_model=List[Criterio])
-def read_criterios_by_escenario(
+async def read_criterios_by_escenario(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     escenario_id: int,
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: models.User = Depends(deps.get_current_user_async),
 ) -> Any:
     """
     Obtener criterios de un escenario específico
     """
     # Verificar que el escenario pertenece al usuario
-    escenario = db.query(models.Escenario).join(models.Proyecto).filter(
+    escenario = await db.scalar(select(models.Escenario.id).join(models.Proyecto).where(
         models.Escenario.id == escenario_id,
         models.Proyecto.owner_id == current_user.id
-    ).first()
+    ))
     if not escenario:
         raise HTTPException(status_code=404, detail="Escenario no encontrado")
     
-    criterios = db.query(models.Criterio).filter(
+    criterios = await db.scalars(select(models.Criterio).where(
         models.Criterio.escenario_id == escenario_id
-    ).all()
-    return criterios
+    ))
+    return list(criterios)
 
 
 @router.post("/", response_model=Criterio)
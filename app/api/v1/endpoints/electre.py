@@ -1,6 +1,6 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
@@ -12,13 +12,67 @@ from fastapi.responses import FileResponse
 import os
 from app.utils.electreIII import crear_csv_electre3_desde_bd
 from app.utils.electreIII import ejecutar_electre3_desde_bd_flujo_neto
-from app.utils.electreIII import ejecutar_electre3_desde_bd_destilacion, ejecutar_electre3_desde_argumentos_destilacion, ejecutar_electre3_desde_argumentos_flujo_neto, ejecutar_electre3_desde_csv_destilacion, ejecutar_electre3_desde_csv_flujo_neto
+from app.utils.electreIII import ejecutar_electre3_desde_bd_destilacion, ejecutar_electre3_desde_argumentos_destilacion, ejecutar_electre3_desde_argumentos_flujo_neto, ejecutar_electre3_desde_csv_en_memoria
 from app.models.ElectreRequest import ElectreIIIRequest
 from fastapi import UploadFile, File, Form
-import tempfile
-import shutil
+from app.utils.electreIII import MOTOR_NUMPY, MOTORES_ELECTRE, analisis_sensibilidad_lambda_desde_bd, ejecutar_electre3_flujo_neto_con_puntajes
+from app.utils.electreIII import analisis_robustez_pesos_desde_bd
+from app.utils.electreIII_numpy import METODO_DESTILACION, METODO_FLUJO_NETO
+from app.utils.electreIII_libreria import registro_electre
+import numpy as np
+from app.utils.electreIII_procesos import pool_procesos_electre
+from app.utils.electreIII_cache import cache_resultados_electre
+from app.utils.electreIII_incremental import estados_credibilidad
+from app.utils.electreIII_robustez import analizador_robustez
+from app.utils.ejecutor_electre import ColaEjecutorLlenaError, EjecucionCanceladaError, ejecutor_electre
+from app.db.base import engine
+from app.db.async_session import async_engine
+from app.db.pool import metricas_pool, metricas_pool_async
 router = APIRouter()
 
+DESCRIPCION_MOTOR = "Motor de cálculo: 'dll', 'numpy' o 'binario' (por defecto el configurado)"
+
+def validar_motor(motor: Optional[str]) -> Optional[str]:
+    """
+    Verifica que el motor solicitado exista antes de ejecutar ELECTRE III.
+    """
+    if motor is not None and motor.strip().lower() not in MOTORES_ELECTRE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Motor no válido. Opciones: {', '.join(MOTORES_ELECTRE)}"
+        )
+    return motor
+
+@router.get("/salud")
+def salud_libreria_electre() -> Any:
+    """
+    Endpoint de salud de la librería ELECTRE III: ejecuta un problema mínimo y
+    reporta el tiempo de carga, los contadores de llamadas del proceso, la
+    profundidad de la cola del ejecutor, el estado del pool de procesos aislados,
+    los aciertos/fallos de la caché de resultados, los estados de credibilidad incremental,
+    el pool del análisis de robustez y el pool de conexiones de la base de datos.
+    """
+    estado = registro_electre.salud()
+    estado["ejecutor"] = ejecutor_electre.estado()
+    estado["procesos"] = pool_procesos_electre.estado()
+    estado["cache"] = cache_resultados_electre.estado()
+    estado["incremental"] = estados_credibilidad.estado()
+    estado["robustez"] = analizador_robustez.estado()
+    estado["base_datos"] = salud_pool_base_datos()
+    return estado
+
+@router.get("/salud/base_datos")
+def salud_pool_base_datos() -> Any:
+    """
+    Métricas del pool de conexiones sin ejecutar ELECTRE III: espera de los checkouts
+    (promedio, p95 y máxima), conexiones en uso y disponibles, desbordes, agotamientos
+    del pool y conexiones nuevas o invalidadas (conexiones caídas detectadas por pre-ping).
+    El pool del engine asíncrono se reporta aparte en "asincrono".
+    """
+    estado = metricas_pool.estado(engine.pool)
+    estado["asincrono"] = metricas_pool_async.estado(async_engine.sync_engine.pool)
+    return estado
+
 @router.get("/escenarios/{escenario_id}/reporte", response_class=PlainTextResponse)
 def obtener_reporte_escenario(
     escenario_id: int,
@@ -58,12 +112,13 @@ def descargar_csv_electre3(
 @router.get("/escenarios/{escenario_id}/resultados_flujo_neto", response_model=List[str])
 def obtener_resultados_electre3(
     escenario_id: int,
+    motor: Optional[str] = Query(None, description=DESCRIPCION_MOTOR),
     db: Session = Depends(get_db),
 ) -> any:
     """
     Endpoint para ejecutar ELECTRE III usando datos de la base de datos y obtener los resultados.
     """
-    resultado = ejecutar_electre3_desde_bd_flujo_neto(db, escenario_id)
+    resultado = ejecutar_electre3_desde_bd_flujo_neto(db, escenario_id, motor=validar_motor(motor))
     if resultado is None:
         raise HTTPException(status_code=500, detail="Error al ejecutar ELECTRE III")
     return resultado
@@ -71,18 +126,93 @@ def obtener_resultados_electre3(
 @router.get("/escenarios/{escenario_id}/resultados_destilacion", response_model=List[str])
 def obtener_resultados_electre3(
     escenario_id: int,
+    motor: Optional[str] = Query(None, description=DESCRIPCION_MOTOR),
     db: Session = Depends(get_db),
 ) -> any:
     """
     Endpoint para ejecutar ELECTRE III usando datos de la base de datos y obtener los resultados.
     """
-    resultado = ejecutar_electre3_desde_bd_destilacion(db, escenario_id)
+    resultado = ejecutar_electre3_desde_bd_destilacion(db, escenario_id, motor=validar_motor(motor))
     if resultado is None:
         raise HTTPException(status_code=500, detail="Error al ejecutar ELECTRE III")
     return resultado
 
+@router.get("/escenarios/{escenario_id}/sensibilidad_lambda")
+def sensibilidad_lambda_escenario(
+    escenario_id: int,
+    lambdas: Optional[List[float]] = Query(None, description="Valores de lambda a evaluar (si se omite se usa inicio/fin/pasos)"),
+    inicio: float = Query(0.0, description="Primer lambda del barrido"),
+    fin: float = Query(1.0, description="Último lambda del barrido"),
+    pasos: int = Query(51, ge=2, le=1000, description="Cantidad de lambdas del barrido"),
+    metodo: str = Query(METODO_FLUJO_NETO, description="Método de explotación: 'flujo_neto' o 'destilacion'"),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Endpoint de análisis de sensibilidad: calcula la matriz de credibilidad una sola vez
+    y devuelve el ranking para cada lambda junto con los intervalos de lambda donde no cambia.
+    """
+    if metodo not in (METODO_FLUJO_NETO, METODO_DESTILACION):
+        raise HTTPException(status_code=400, detail="Método no válido. Opciones: flujo_neto, destilacion")
+    if lambdas is None:
+        lambdas = np.linspace(inicio, fin, pasos).round(10).tolist()
+    elif len(lambdas) > 1000:
+        raise HTTPException(status_code=400, detail="Se permiten como máximo 1000 valores de lambda")
+
+    try:
+        return analisis_sensibilidad_lambda_desde_bd(db, escenario_id, lambdas, metodo)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/escenarios/{escenario_id}/robustez_pesos")
+def robustez_pesos_escenario(
+    escenario_id: int,
+    muestras: int = Query(10000, ge=100, le=200000, description="Vectores de pesos a muestrear"),
+    metodo: str = Query(METODO_FLUJO_NETO, description="Método de explotación: 'flujo_neto' o 'destilacion'"),
+    concentracion: Optional[float] = Query(None, gt=0, description="Si se indica, los pesos se muestrean alrededor de los del escenario (Dirichlet); si no, uniformes"),
+    perturbacion_umbrales: float = Query(0.0, ge=0.0, lt=1.0, description="Variación relativa máxima de los umbrales P/Q/V"),
+    muestras_umbrales: int = Query(20, ge=1, le=1000, description="Juegos de umbrales a muestrear cuando se perturban"),
+    semilla: Optional[int] = Query(None, description="Semilla para resultados reproducibles"),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Endpoint de robustez de pesos: muestrea vectores de pesos (y opcionalmente umbrales)
+    y devuelve la aceptabilidad de cada posición y los índices de victoria por pares.
+    """
+    if metodo not in (METODO_FLUJO_NETO, METODO_DESTILACION):
+        raise HTTPException(status_code=400, detail="Método no válido. Opciones: flujo_neto, destilacion")
+
+    try:
+        return analisis_robustez_pesos_desde_bd(
+            db, escenario_id, metodo, muestras, concentracion,
+            perturbacion_umbrales, muestras_umbrales, semilla
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/ejecutar_flujo_neto")
 def ejecutar_electre3(request: ElectreIIIRequest):
+    motor = validar_motor(request.motor)
+    if request.incluir_puntajes:
+        # Los puntajes solo los calcula el motor NumPy (por bloques, sin la matriz n x n ni caché)
+        if motor is not None and motor.strip().lower() != MOTOR_NUMPY:
+            raise HTTPException(status_code=400, detail="incluir_puntajes solo está disponible con el motor 'numpy'")
+        # Ranking con el flujo neto de cada alternativa, sin construir la matriz n x n
+        resultado = ejecutar_electre3_flujo_neto_con_puntajes(
+            alternativas_matriz=request.alternativas_matriz,
+            pesos=request.pesos,
+            preferencia=request.preferencia,
+            indiferencia=request.indiferencia,
+            veto=request.veto,
+            direccion=request.direccion,
+            lambda_corte=request.lambda_corte,
+            nombres_alternativas=request.nombres_alternativas
+        )
+        if resultado is None:
+            raise HTTPException(status_code=500, detail="Error al ejecutar ELECTRE III")
+        return resultado
+
     resultado = ejecutar_electre3_desde_argumentos_flujo_neto(
         alternativas_matriz=request.alternativas_matriz,
         criterios_nombres=request.criterios_nombres,
@@ -92,7 +222,8 @@ def ejecutar_electre3(request: ElectreIIIRequest):
         veto=request.veto,
         direccion=request.direccion,
         lambda_corte=request.lambda_corte,
-        nombres_alternativas=request.nombres_alternativas
+        nombres_alternativas=request.nombres_alternativas,
+        motor=motor
     )
     if resultado is None:
         raise HTTPException(status_code=500, detail="Error al ejecutar ELECTRE III")
@@ -109,7 +240,8 @@ def ejecutar_electre3(request: ElectreIIIRequest):
         veto=request.veto,
         direccion=request.direccion,
         lambda_corte=request.lambda_corte,
-        nombres_alternativas=request.nombres_alternativas
+        nombres_alternativas=request.nombres_alternativas,
+        motor=validar_motor(request.motor)
     )
     if resultado is None:
         raise HTTPException(status_code=500, detail="Error al ejecutar ELECTRE III")
@@ -117,62 +249,58 @@ def ejecutar_electre3(request: ElectreIIIRequest):
 
 
 @router.post("/ejecutar_directo_flujo_neto")
-async def ejecutar_electre3_directo_flujo_neto(file: UploadFile = File(...), lambda_corte: float = Form(...)):
+async def ejecutar_electre3_directo_flujo_neto(request: Request, file: UploadFile = File(...),
+                                               lambda_corte: float = Form(...),
+                                               motor: Optional[str] = Form(None)):
     """
-    Endpoint que recibe un archivo CSV y un valor lambda (float), guarda temporalmente el CSV
-    y llama a ejecutar_electre3_desde_csv_flujo_neto con la ruta del archivo y el lambda.
+    Endpoint que recibe un archivo CSV y un valor lambda (float) y ejecuta ELECTRE III
+    en el ejecutor acotado. El CSV se procesa por bloques en memoria, sin archivos temporales.
+    Si el cliente se desconecta, la ejecución se cancela.
     """
+    motor = validar_motor(motor)
     try:
-        # Guardar archivo subido en un archivo temporal
-        suffix = ".csv"
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            shutil.copyfileobj(file.file, tmp)
-            tmp_path = tmp.name
-
-        # Llamar a la función que ejecuta ELECTRE III desde CSV (ajustar kwargs según la firma real)
-        resultado = ejecutar_electre3_desde_csv_flujo_neto(tmp_path, lambda_corte=lambda_corte)
-
-        # Borrar archivo temporal
-        try:
-            os.remove(tmp_path)
-        except Exception:
-            pass
+        resultado = await ejecutor_electre.ejecutar_cancelable(
+            request.is_disconnected,
+            ejecutar_electre3_desde_csv_en_memoria, file.file, lambda_corte, METODO_FLUJO_NETO, motor
+        )
 
         if resultado is None:
             raise HTTPException(status_code=500, detail="Error al ejecutar ELECTRE III")
         return resultado
     except HTTPException:
         raise
+    except ColaEjecutorLlenaError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except EjecucionCanceladaError as e:
+        raise HTTPException(status_code=499, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
         
 @router.post("/ejecutar_directo_destilacion")
-async def ejecutar_electre3_directo_destilacion(file: UploadFile = File(...), lambda_corte: float = Form(...)):
+async def ejecutar_electre3_directo_destilacion(request: Request, file: UploadFile = File(...),
+                                                lambda_corte: float = Form(...),
+                                                motor: Optional[str] = Form(None)):
     """
-    Endpoint que recibe un archivo CSV y un valor lambda (float), guarda temporalmente el CSV
-    y llama a ejecutar_electre3_desde_csv_destilacion con la ruta del archivo y el lambda.
+    Endpoint que recibe un archivo CSV y un valor lambda (float) y ejecuta ELECTRE III
+    en el ejecutor acotado. El CSV se procesa por bloques en memoria, sin archivos temporales.
+    Si el cliente se desconecta, la ejecución se cancela.
     """
+    motor = validar_motor(motor)
     try:
-        # Guardar archivo subido en un archivo temporal
-        suffix = ".csv"
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            shutil.copyfileobj(file.file, tmp)
-            tmp_path = tmp.name
-
-        # Llamar a la función que ejecuta ELECTRE III desde CSV (ajustar kwargs según la firma real)
-        resultado = ejecutar_electre3_desde_csv_destilacion(tmp_path, lambda_corte=lambda_corte)
-
-        # Borrar archivo temporal
-        try:
-            os.remove(tmp_path)
-        except Exception:
-            pass
+        resultado = await ejecutor_electre.ejecutar_cancelable(
+            request.is_disconnected,
+            ejecutar_electre3_desde_csv_en_memoria, file.file, lambda_corte, METODO_DESTILACION, motor
+        )
 
         if resultado is None:
             raise HTTPException(status_code=500, detail="Error al ejecutar ELECTRE III")
         return resultado
     except HTTPException:
         raise
+    except ColaEjecutorLlenaError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except EjecucionCanceladaError as e:
+        raise HTTPException(status_code=499, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
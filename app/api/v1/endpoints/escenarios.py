@@ -1,38 +1,42 @@
 from typing import Any, List
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.schemas.escenario import EscenarioCreate, EscenarioUpdate, Escenario
 from app.api import deps
+from app.crud.clonado import clonar_contenido_escenarios, mapa_escenario
+from app.db.async_session import get_async_db
 from app.db.session import get_db
 
 router = APIRouter()
 
 
 @router.get("/proyecto/{proyecto_id}", response_model=List[Escenario])
-def read_escenarios_by_proyecto(
+async def read_escenarios_by_proyecto(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     proyecto_id: int,
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: models.User = Depends(deps.get_current_user_async),
 ) -> Any:
     """
     Obtener escenarios de un proyecto específico
     """
     # Verificar que el proyecto pertenece al usuario
-    proyecto = db.query(models.Proyecto).filter(
+    proyecto = await db.scalar(select(models.Proyecto.id).where(
         models.Proyecto.id == proyecto_id,
         models.Proyecto.owner_id == current_user.id
-    ).first()
+    ))
     if not proyecto:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
     
-    escenarios = db.query(models.Escenario).filter(
+    escenarios = await db.scalars(select(models.Escenario).where(
         models.Escenario.proyecto_id == proyecto_id
-    ).all()
-    return escenarios
+    ))
+    return list(escenarios)
 
 
 @router.post("/", response_model=Escenario)
@@ -162,44 +166,8 @@ def clonar_escenario(
     db.add(nuevo_escenario)
     db.flush()  # Para obtener el id del nuevo escenario
 
-    # Mapear criterios originales a nuevos
-    criterio_id_map = {}
-    for criterio in escenario.criterios:
-        nuevo_criterio = models.Criterio(
-            name=criterio.name,
-            description=criterio.description,
-            weight=criterio.weight,
-            is_benefit=criterio.is_benefit,
-            escenario_id=nuevo_escenario.id,
-            preference_threshold=criterio.preference_threshold,
-            indifference_threshold=criterio.indifference_threshold,
-            veto_threshold=criterio.veto_threshold
-        )
-        db.add(nuevo_criterio)
-        db.flush()
-        criterio_id_map[criterio.id] = nuevo_criterio.id
-
-    # Mapear alternativas originales a nuevas
-    alternativa_id_map = {}
-    for alternativa in escenario.alternativas:
-        nueva_alternativa = models.Alternativa(
-            name=alternativa.name,
-            description=alternativa.description,
-            escenario_id=nuevo_escenario.id
-        )
-        db.add(nueva_alternativa)
-        db.flush()
-        alternativa_id_map[alternativa.id] = nueva_alternativa.id
-
-    # Clonar evaluaciones usando los nuevos IDs
-    for evaluacion in escenario.evaluaciones:
-        nueva_evaluacion = models.Evaluacion(
-            value=evaluacion.value,
-            escenario_id=nuevo_escenario.id,
-            alternativa_id=alternativa_id_map.get(evaluacion.alternativa_id),
-            criterio_id=criterio_id_map.get(evaluacion.criterio_id)
-        )
-        db.add(nueva_evaluacion)
+    # Copiar criterios, alternativas y evaluaciones con INSERT ... SELECT (ids remapeados en el servidor)
+    clonar_contenido_escenarios(db, mapa_escenario(escenario.id, nuevo_escenario.id))
 
     db.commit()
     db.refresh(nuevo_escenario)
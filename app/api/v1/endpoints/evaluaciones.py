@@ -1,38 +1,216 @@
-from typing import Any, List
+from typing import Any, Dict, List, Tuple, Union
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from sqlalchemy import and_, case, delete, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
 from app import crud, models, schemas
-from app.schemas.evaluacion import EvaluacionCreate, EvaluacionUpdate, Evaluacion
+from app.schemas.evaluacion import EvaluacionCreate, EvaluacionUpdate, Evaluacion, MatrizEvaluacionesActualizada
+from app.schemas.evaluacion import MatrizEvaluacionesDensa, MatrizEvaluacionesDensaBase
 from app.api import deps
+from app.core.respuestas import RespuestaJSON
+from app.db.async_session import get_async_db
 from app.db.session import get_db
+from app.utils.electreIII_incremental import estados_credibilidad
 
 router = APIRouter()
 
+# Evaluaciones por sentencia UPDATE ... CASE en la actualización masiva de la matriz
+TAMANO_LOTE_ACTUALIZACION = 1000
+
+# Matriz densa en binario: float64 little-endian [n, m, ids de alternativas (n), ids de criterios (m),
+# valores (n*m) fila por fila], NaN donde no hay evaluación
+MEDIA_TYPE_BINARIO = "application/octet-stream"
+
+# El esquema Evaluacion anida criterio y alternativa: se cargan con un SELECT ... IN por relación
+# (cada criterio/alternativa una sola vez) en lugar de dos SELECT perezosos por evaluación
+CON_CRITERIO_Y_ALTERNATIVA = (
+    selectinload(models.Evaluacion.criterio),
+    selectinload(models.Evaluacion.alternativa),
+)
+
+
+def verificar_criterios_y_alternativas(db: Session, escenario_id: int):
+    """
+    Verifica que el escenario tenga al menos un criterio y una alternativa.
+    """
+    if not db.query(models.Criterio.id).filter(models.Criterio.escenario_id == escenario_id).first():
+        raise HTTPException(status_code=400, detail="El escenario no tiene criterios")
+    if not db.query(models.Alternativa.id).filter(models.Alternativa.escenario_id == escenario_id).first():
+        raise HTTPException(status_code=400, detail="El escenario no tiene alternativas")
+
+
+def insertar_matriz_evaluaciones(db: Session, escenario_id: int, solo_faltantes: bool = False) -> int:
+    """
+    Inserta con un solo INSERT ... SELECT una evaluación con valor 0 por cada par criterio x alternativa.
+
+    Args:
+        db: Sesión de base de datos
+        escenario_id: ID del escenario
+        solo_faltantes: si es True solo se insertan los pares que todavía no tienen evaluación
+
+    Returns:
+        Número de evaluaciones insertadas
+    """
+    pares = (
+        select(
+            models.Alternativa.id,
+            models.Criterio.id,
+            literal(escenario_id),
+            literal(0.0),
+        )
+        .select_from(models.Criterio)
+        .join(models.Alternativa, models.Alternativa.escenario_id == models.Criterio.escenario_id)
+        .where(models.Criterio.escenario_id == escenario_id)
+        # Mismo orden que el doble for anterior: criterios afuera, alternativas adentro
+        .order_by(models.Criterio.id, models.Alternativa.id)
+    )
+    if solo_faltantes:
+        pares = pares.outerjoin(models.Evaluacion, and_(
+            models.Evaluacion.escenario_id == escenario_id,
+            models.Evaluacion.criterio_id == models.Criterio.id,
+            models.Evaluacion.alternativa_id == models.Alternativa.id,
+        )).where(models.Evaluacion.id.is_(None))
+
+    resultado = db.execute(
+        insert(models.Evaluacion).from_select(
+            ["alternativa_id", "criterio_id", "escenario_id", "value"], pares
+        )
+    )
+    return resultado.rowcount
+
+
+def aplicar_cambios_evaluaciones(db: Session, escenario_id: int, cambios: List[Dict[str, Any]]):
+    """
+    Aplica los valores nuevos con un UPDATE ... CASE por lote, hace commit y parcha
+    la credibilidad incremental del escenario.
+
+    Args:
+        db: Sesión de base de datos
+        escenario_id: ID del escenario
+        cambios: dicts con id, alternativa_id, criterio_id, anterior y value de cada celda que cambia
+    """
+    for desde in range(0, len(cambios), TAMANO_LOTE_ACTUALIZACION):
+        lote = {cambio["id"]: cambio["value"] for cambio in cambios[desde:desde + TAMANO_LOTE_ACTUALIZACION]}
+        db.execute(
+            update(models.Evaluacion)
+            .where(models.Evaluacion.id.in_(list(lote)))
+            .values(value=case(lote, value=models.Evaluacion.id))
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    # Parchar la credibilidad incremental del escenario con los valores nuevos
+    estados_credibilidad.actualizar_evaluaciones(
+        escenario_id,
+        [(c["alternativa_id"], c["criterio_id"], c["value"]) for c in cambios]
+    )
+
+
+def matriz_densa(db: Session, escenario_id: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Matriz de evaluaciones del escenario como arreglos densos (alternativas x criterios, ordenados por id).
+
+    Returns:
+        Tupla (ids de alternativas, ids de criterios, valores con NaN donde falta
+        la evaluación, ids de las evaluaciones con -1 donde falta)
+    """
+    ids_alternativas = np.fromiter(db.scalars(
+        select(models.Alternativa.id).where(models.Alternativa.escenario_id == escenario_id)
+        .order_by(models.Alternativa.id)
+    ), dtype=np.int64)
+    ids_criterios = np.fromiter(db.scalars(
+        select(models.Criterio.id).where(models.Criterio.escenario_id == escenario_id)
+        .order_by(models.Criterio.id)
+    ), dtype=np.int64)
+    filas = db.execute(
+        select(
+            models.Evaluacion.id, models.Evaluacion.alternativa_id,
+            models.Evaluacion.criterio_id, models.Evaluacion.value
+        ).where(models.Evaluacion.escenario_id == escenario_id)
+    ).all()
+
+    valores = np.full((len(ids_alternativas), len(ids_criterios)), np.nan)
+    ids_evaluaciones = np.full(valores.shape, -1, dtype=np.int64)
+    if filas and valores.size:
+        ids, alternativas, criterios, valores_filas = (np.asarray(columna) for columna in zip(*filas))
+        i = np.minimum(np.searchsorted(ids_alternativas, alternativas), len(ids_alternativas) - 1)
+        j = np.minimum(np.searchsorted(ids_criterios, criterios), len(ids_criterios) - 1)
+        # Se descartan evaluaciones cuya alternativa o criterio ya no está en el escenario
+        validas = (ids_alternativas[i] == alternativas) & (ids_criterios[j] == criterios)
+        valores[i[validas], j[validas]] = valores_filas[validas].astype(np.float64)
+        ids_evaluaciones[i[validas], j[validas]] = ids[validas]
+    return ids_alternativas, ids_criterios, valores, ids_evaluaciones
+
+
+def codificar_matriz_binaria(ids_alternativas: np.ndarray, ids_criterios: np.ndarray, valores: np.ndarray) -> bytes:
+    """
+    Codifica la matriz densa en el formato binario de MEDIA_TYPE_BINARIO.
+    """
+    return np.concatenate((
+        [len(ids_alternativas), len(ids_criterios)], ids_alternativas, ids_criterios, valores.ravel()
+    )).astype("<f8").tobytes()
+
+
+def decodificar_matriz_binaria(cuerpo: bytes) -> MatrizEvaluacionesDensaBase:
+    """
+    Decodifica una matriz densa en el formato binario de MEDIA_TYPE_BINARIO.
+    """
+    if len(cuerpo) % 8 or len(cuerpo) < 16:
+        raise HTTPException(status_code=400, detail="El cuerpo binario debe ser float64: [n, m, alternativas, criterios, valores]")
+    datos = np.frombuffer(cuerpo, dtype="<f8")
+    if not np.isfinite(datos[:2]).all():
+        raise HTTPException(status_code=400, detail="n y m del cuerpo binario deben ser números finitos")
+    n, m = datos[0], datos[1]
+    if n != int(n) or m != int(m) or n < 0 or m < 0 or datos.size != 2 + n + m + n * m:
+        raise HTTPException(status_code=400, detail="El tamaño del cuerpo binario no corresponde con n y m")
+    n, m = int(n), int(m)
+    return MatrizEvaluacionesDensaBase.model_construct(
+        alternativas=datos[2:2 + n].astype(np.int64).tolist(),
+        criterios=datos[2 + n:2 + n + m].astype(np.int64).tolist(),
+        valores=datos[2 + n + m:],
+    )
+
+
+async def leer_cuerpo(request: Request) -> bytes:
+    return await request.body()
+
+
+def evaluaciones_con_objetos(db: Session, escenario_id: int) -> List[models.Evaluacion]:
+    """
+    Todas las evaluaciones del escenario con criterio y alternativa en tres consultas.
+    """
+    return db.query(models.Evaluacion).options(*CON_CRITERIO_Y_ALTERNATIVA).filter(
+        models.Evaluacion.escenario_id == escenario_id
+    ).order_by(models.Evaluacion.id).all()
+
 
 @router.get("/escenario/{escenario_id}", response_model=List[Evaluacion])
-def read_evaluaciones_by_escenario(
+async def read_evaluaciones_by_escenario(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     escenario_id: int,
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: models.User = Depends(deps.get_current_user_async),
 ) -> Any:
     """
     Obtener evaluaciones de un escenario específico
     """
     # Verificar que el escenario pertenece al usuario
-    escenario = db.query(models.Escenario).join(models.Proyecto).filter(
+    escenario = await db.scalar(select(models.Escenario.id).join(models.Proyecto).where(
         models.Escenario.id == escenario_id,
         models.Proyecto.owner_id == current_user.id
-    ).first()
+    ))
     if not escenario:
         raise HTTPException(status_code=404, detail="Escenario no encontrado")
     
-    evaluaciones = db.query(models.Evaluacion).filter(
+    # Con la sesión asíncrona no hay carga perezosa: criterio y alternativa se cargan aquí
+    evaluaciones = await db.scalars(select(models.Evaluacion).options(*CON_CRITERIO_Y_ALTERNATIVA).where(
         models.Evaluacion.escenario_id == escenario_id
-    ).all()
-    return evaluaciones
+    ))
+    return list(evaluaciones)
 
 
 @router.get("/alternativa/{alternativa_id}", response_model=List[Evaluacion])
@@ -59,7 +237,7 @@ def read_evaluaciones_by_alternativa(
     if not alternativa:
         raise HTTPException(status_code=404, detail="Alternativa no encontrada")
     
-    evaluaciones = db.query(models.Evaluacion).filter(
+    evaluaciones = db.query(models.Evaluacion).options(*CON_CRITERIO_Y_ALTERNATIVA).filter(
         models.Evaluacion.alternativa_id == alternativa_id
     ).all()
     return evaluaciones
@@ -83,49 +261,18 @@ def reinicializar_evaluaciones_matriz(
     if not escenario:
         raise HTTPException(status_code=404, detail="Escenario no encontrado")
     
-    # Obtener todos los criterios y alternativas del escenario
-    criterios = db.query(models.Criterio).filter(
-        models.Criterio.escenario_id == escenario_id
-    ).all()
-    
-    alternativas = db.query(models.Alternativa).filter(
-        models.Alternativa.escenario_id == escenario_id
-    ).all()
-    
-    if not criterios:
-        raise HTTPException(status_code=400, detail="El escenario no tiene criterios")
-    
-    if not alternativas:
-        raise HTTPException(status_code=400, detail="El escenario no tiene alternativas")
-    
-    # Eliminar todas las evaluaciones existentes del escenario
-    evaluaciones_existentes = db.query(models.Evaluacion).filter(
-        models.Evaluacion.escenario_id == escenario_id
-    ).all()
-    
-    for evaluacion in evaluaciones_existentes:
-        db.delete(evaluacion)
+    verificar_criterios_y_alternativas(db, escenario_id)
     
-    # Crear todas las nuevas combinaciones
-    nuevas_evaluaciones = []
-    for criterio in criterios:
-        for alternativa in alternativas:
-            evaluacion = models.Evaluacion(
-                criterio_id=criterio.id,
-                alternativa_id=alternativa.id,
-                escenario_id=escenario_id,
-                valor=0.0  # Valor por defecto
-            )
-            db.add(evaluacion)
-            nuevas_evaluaciones.append(evaluacion)
+    # Eliminar todas las evaluaciones existentes del escenario con un solo DELETE
+    db.execute(delete(models.Evaluacion).where(models.Evaluacion.escenario_id == escenario_id))
     
+    # Crear todas las nuevas combinaciones con valor 0
+    insertar_matriz_evaluaciones(db, escenario_id)
     db.commit()
+    estados_credibilidad.invalidar(escenario_id)
     
-    # Refrescar todas las evaluaciones para obtener sus IDs
-    for evaluacion in nuevas_evaluaciones:
-        db.refresh(evaluacion)
-    
-    return nuevas_evaluaciones
+    # Leer todas las evaluaciones (con sus IDs) con sus criterios y alternativas
+    return evaluaciones_con_objetos(db, escenario_id)
 
 @router.get("/criterio/{criterio_id}", response_model=List[Evaluacion])
 def read_evaluaciones_by_criterio(
@@ -151,23 +298,30 @@ def read_evaluaciones_by_criterio(
     if not criterio:
         raise HTTPException(status_code=404, detail="Criterio no encontrado")
     
-    evaluaciones = db.query(models.Evaluacion).filter(
+    evaluaciones = db.query(models.Evaluacion).options(*CON_CRITERIO_Y_ALTERNATIVA).filter(
         models.Evaluacion.criterio_id == criterio_id
     ).all()
     return evaluaciones
 
 
 
-@router.put("/matriz/escenario/{escenario_id}", response_model=List[Evaluacion])
+@router.put(
+    "/matriz/escenario/{escenario_id}",
+    response_model=Union[MatrizEvaluacionesActualizada, List[Evaluacion]]
+)
 def update_evaluaciones_matriz(
     *,
     db: Session = Depends(get_db),
     escenario_id: int,
     evaluaciones_data: List[EvaluacionUpdate],
+    completa: bool = Query(False, description="Devolver las evaluaciones actualizadas con criterio y alternativa anidados"),
     current_user: models.User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Actualizar múltiples evaluaciones de la matriz de un escenario por ID.
+
+    Los valores se aplican con un UPDATE ... CASE por lote y por defecto se devuelve
+    solo el acuse con las celdas que cambiaron (valor anterior y nuevo).
     """
     # Verificar que el escenario pertenece al usuario
     escenario = db.query(models.Escenario).join(models.Proyecto).filter(
@@ -177,43 +331,191 @@ def update_evaluaciones_matriz(
     if not escenario:
         raise HTTPException(status_code=404, detail="Escenario no encontrado")
 
-    # Obtener los IDs de las evaluaciones a actualizar
-    ids = [e.id for e in evaluaciones_data if hasattr(e, "id") and e.id is not None]
-    if not ids:
+    # Valor nuevo por ID (si un ID se repite gana el último)
+    valores = {e.id: e.value for e in evaluaciones_data if e.id is not None}
+    if not valores:
         raise HTTPException(status_code=400, detail="Debes enviar los IDs de las evaluaciones a actualizar")
 
-    # Obtener solo las evaluaciones con esos IDs y que pertenezcan al escenario
-    evaluaciones_existentes = db.query(models.Evaluacion).filter(
-        models.Evaluacion.escenario_id == escenario_id,
-        models.Evaluacion.id.in_(ids)
-    ).all()
-    eval_dict = {e.id: e for e in evaluaciones_existentes}
-
-    evaluaciones_actualizadas = []
-    for eval_data in evaluaciones_data:
-        evaluacion = eval_dict.get(eval_data.id)
-        if not evaluacion:
+    # Leer solo las columnas necesarias de las evaluaciones del escenario con esos IDs
+    existentes = {
+        fila.id: fila for fila in db.execute(
+            select(
+                models.Evaluacion.id, models.Evaluacion.alternativa_id,
+                models.Evaluacion.criterio_id, models.Evaluacion.value
+            ).where(
+                models.Evaluacion.escenario_id == escenario_id,
+                models.Evaluacion.id.in_(list(valores))
+            )
+        )
+    }
+    for id_evaluacion in valores:
+        if id_evaluacion not in existentes:
             raise HTTPException(
                 status_code=404,
-                detail=f"No se encontró evaluación con id {eval_data.id} en el escenario"
+                detail=f"No se encontró evaluación con id {id_evaluacion} en el escenario"
             )
-        eval_dict_data = eval_data.dict(exclude_unset=True)
-        for field, value in eval_dict_data.items():
-            if field != "id":
-                setattr(evaluacion, field, value)
-        evaluaciones_actualizadas.append(evaluacion)
 
-    db.commit()
+    cambios = [
+        {
+            "id": fila.id,
+            "alternativa_id": fila.alternativa_id,
+            "criterio_id": fila.criterio_id,
+            "anterior": fila.value,
+            "value": valores[fila.id],
+        }
+        for fila in existentes.values() if fila.value != valores[fila.id]
+    ]
+    aplicar_cambios_evaluaciones(db, escenario_id, cambios)
 
-    # Devolver las evaluaciones actualizadas con criterio y alternativa anidados
-    evaluaciones_con_objetos = db.query(models.Evaluacion).options(
-        joinedload(models.Evaluacion.criterio),
-        joinedload(models.Evaluacion.alternativa)
-    ).filter(
-        models.Evaluacion.id.in_(ids)
-    ).all()
+    if completa:
+        # Devolver las evaluaciones actualizadas con criterio y alternativa anidados
+        return db.query(models.Evaluacion).options(*CON_CRITERIO_Y_ALTERNATIVA).filter(
+            models.Evaluacion.id.in_(list(valores))
+        ).all()
+
+    return {
+        "escenario_id": escenario_id,
+        "recibidas": len(evaluaciones_data),
+        "actualizadas": len(cambios),
+        "cambios": cambios,
+    }
+
+
+@router.get(
+    "/matriz/escenario/{escenario_id}",
+    response_model=MatrizEvaluacionesDensa,
+    responses={200: {"content": {MEDIA_TYPE_BINARIO: {}}}}
+)
+def read_evaluaciones_matriz_densa(
+    *,
+    db: Session = Depends(get_db),
+    escenario_id: int,
+    request: Request,
+    current_user: models.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Obtener la matriz de evaluaciones de un escenario en forma densa.
+
+    Devuelve los ids de las alternativas (filas) y de los criterios (columnas), ordenados
+    por id, y los valores fila por fila (null donde falta la evaluación). Con
+    "Accept: application/octet-stream" se devuelve en binario float64 little-endian:
+    [n, m, ids de alternativas, ids de criterios, valores] con NaN donde falta.
+    """
+    # Verificar que el escenario pertenece al usuario
+    escenario = db.query(models.Escenario).join(models.Proyecto).filter(
+        models.Escenario.id == escenario_id,
+        models.Proyecto.owner_id == current_user.id
+    ).first()
+    if not escenario:
+        raise HTTPException(status_code=404, detail="Escenario no encontrado")
+
+    ids_alternativas, ids_criterios, valores, _ = matriz_densa(db, escenario_id)
+    if MEDIA_TYPE_BINARIO in request.headers.get("accept", ""):
+        return Response(
+            content=codificar_matriz_binaria(ids_alternativas, ids_criterios, valores),
+            media_type=MEDIA_TYPE_BINARIO
+        )
 
-    return evaluaciones_con_objetos
+    # Arreglos de NumPy serializados directamente por orjson (NaN se escribe como null)
+    return RespuestaJSON({
+        "escenario_id": escenario_id,
+        "alternativas": ids_alternativas,
+        "criterios": ids_criterios,
+        "valores": valores.ravel(),
+    })
+
+
+@router.put(
+    "/matriz/escenario/{escenario_id}/densa",
+    response_model=MatrizEvaluacionesActualizada,
+    openapi_extra={"requestBody": {"required": True, "content": {
+        "application/json": {"schema": MatrizEvaluacionesDensaBase.model_json_schema()},
+        MEDIA_TYPE_BINARIO: {"schema": {"type": "string", "format": "binary"}},
+    }}}
+)
+def update_evaluaciones_matriz_densa(
+    *,
+    db: Session = Depends(get_db),
+    escenario_id: int,
+    request: Request,
+    cuerpo: bytes = Depends(leer_cuerpo),
+    current_user: models.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Actualizar la matriz de evaluaciones de un escenario a partir de su forma densa.
+
+    Acepta el mismo formato que el GET de la matriz (JSON o binario según el Content-Type).
+    Las filas y columnas pueden ser un subconjunto de las del escenario y en cualquier orden;
+    las celdas con null (o NaN) no se modifican. Los valores se aplican igual que en el PUT
+    de la matriz por IDs y se devuelve el mismo acuse con las celdas que cambiaron.
+    """
+    # Verificar que el escenario pertenece al usuario
+    escenario = db.query(models.Escenario).join(models.Proyecto).filter(
+        models.Escenario.id == escenario_id,
+        models.Proyecto.owner_id == current_user.id
+    ).first()
+    if not escenario:
+        raise HTTPException(status_code=404, detail="Escenario no encontrado")
+
+    if request.headers.get("content-type", "").startswith(MEDIA_TYPE_BINARIO):
+        datos = decodificar_matriz_binaria(cuerpo)
+    else:
+        try:
+            datos = MatrizEvaluacionesDensaBase.model_validate_json(cuerpo)
+        except ValidationError as e:
+            raise RequestValidationError(e.errors())
+
+    nuevos = np.asarray(datos.valores, dtype=np.float64)
+    if nuevos.size != len(datos.alternativas) * len(datos.criterios):
+        raise HTTPException(status_code=400, detail="La cantidad de valores debe ser alternativas x criterios")
+    # NaN significa "no modificar"; infinito no es un valor de evaluación válido
+    if np.isinf(nuevos).any():
+        raise HTTPException(status_code=400, detail="Los valores deben ser números finitos (o null para no modificar)")
+    if len(set(datos.alternativas)) != len(datos.alternativas) or len(set(datos.criterios)) != len(datos.criterios):
+        raise HTTPException(status_code=400, detail="Hay alternativas o criterios repetidos")
+    nuevos = nuevos.reshape(len(datos.alternativas), len(datos.criterios))
+
+    ids_alternativas, ids_criterios, actuales, ids_evaluaciones = matriz_densa(db, escenario_id)
+    fila_de = {int(id_alternativa): i for i, id_alternativa in enumerate(ids_alternativas)}
+    columna_de = {int(id_criterio): j for j, id_criterio in enumerate(ids_criterios)}
+    for id_alternativa in datos.alternativas:
+        if id_alternativa not in fila_de:
+            raise HTTPException(status_code=404, detail=f"La alternativa {id_alternativa} no pertenece al escenario")
+    for id_criterio in datos.criterios:
+        if id_criterio not in columna_de:
+            raise HTTPException(status_code=404, detail=f"El criterio {id_criterio} no pertenece al escenario")
+
+    filas = np.asarray([fila_de[a] for a in datos.alternativas], dtype=np.int64)
+    columnas = np.asarray([columna_de[c] for c in datos.criterios], dtype=np.int64)
+    actuales = actuales[np.ix_(filas, columnas)]
+    ids_evaluaciones = ids_evaluaciones[np.ix_(filas, columnas)]
+
+    definidos = ~np.isnan(nuevos)
+    faltantes = np.argwhere(definidos & (ids_evaluaciones < 0))
+    if len(faltantes):
+        i, j = faltantes[0]
+        raise HTTPException(
+            status_code=404,
+            detail=f"No hay evaluación para alternativa {datos.alternativas[i]} y criterio {datos.criterios[j]}"
+        )
+
+    i, j = np.nonzero(definidos & (nuevos != actuales))
+    cambios = [
+        {"id": id_evaluacion, "alternativa_id": alternativa_id, "criterio_id": criterio_id,
+         "anterior": anterior, "value": valor}
+        for id_evaluacion, alternativa_id, criterio_id, anterior, valor in zip(
+            ids_evaluaciones[i, j].tolist(), ids_alternativas[filas[i]].tolist(),
+            ids_criterios[columnas[j]].tolist(), actuales[i, j].tolist(), nuevos[i, j].tolist()
+        )
+    ]
+    aplicar_cambios_evaluaciones(db, escenario_id, cambios)
+
+    return {
+        "escenario_id": escenario_id,
+        "recibidas": int(definidos.sum()),
+        "actualizadas": len(cambios),
+        "cambios": cambios,
+    }
 
 
 @router.post("/matriz/escenario/{escenario_id}", response_model=List[Evaluacion])
@@ -234,52 +536,25 @@ def create_evaluaciones_matriz(
     if not escenario:
         raise HTTPException(status_code=404, detail="Escenario no encontrado")
     
-    # Obtener todos los criterios y alternativas del escenario
-    criterios = db.query(models.Criterio).filter(
-        models.Criterio.escenario_id == escenario_id
-    ).all()
-    
-    alternativas = db.query(models.Alternativa).filter(
-        models.Alternativa.escenario_id == escenario_id
-    ).all()
-    
-    if not criterios:
-        raise HTTPException(status_code=400, detail="El escenario no tiene criterios")
-    
-    if not alternativas:
-        raise HTTPException(status_code=400, detail="El escenario no tiene alternativas")
+    verificar_criterios_y_alternativas(db, escenario_id)
     
     # Verificar si ya existen evaluaciones para evitar duplicados
-    evaluaciones_existentes = db.query(models.Evaluacion).filter(
+    evaluacion_existente = db.query(models.Evaluacion.id).filter(
         models.Evaluacion.escenario_id == escenario_id
-    ).all()
+    ).first()
     
-    if evaluaciones_existentes:
+    if evaluacion_existente:
         raise HTTPException(
             status_code=400, 
             detail="Ya existen evaluaciones para este escenario. Use el endpoint de actualización individual."
         )
     
-    # Crear todas las combinaciones
-    nuevas_evaluaciones = []
-    for criterio in criterios:
-        for alternativa in alternativas:
-            evaluacion = models.Evaluacion(
-                criterio_id=criterio.id,
-                alternativa_id=alternativa.id,
-                escenario_id=escenario_id,
-                valor=0.0  # Valor por defecto, puede ser cambiado después
-            )
-            db.add(evaluacion)
-            nuevas_evaluaciones.append(evaluacion)
-    
+    # Crear todas las combinaciones (valor 0 por defecto, puede ser cambiado después)
+    insertar_matriz_evaluaciones(db, escenario_id)
     db.commit()
     
-    # Refrescar todas las evaluaciones para obtener sus IDs
-    for evaluacion in nuevas_evaluaciones:
-        db.refresh(evaluacion)
-    
-    return nuevas_evaluaciones
+    # Leer todas las evaluaciones (con sus IDs) con sus criterios y alternativas
+    return evaluaciones_con_objetos(db, escenario_id)
 
 
 @router.post("/", response_model=Evaluacion)
@@ -365,6 +640,10 @@ def update_evaluacion(
     db.add(evaluacion)
     db.commit()
     db.refresh(evaluacion)
+    estados_credibilidad.actualizar_evaluaciones(
+        evaluacion.escenario_id,
+        [(evaluacion.alternativa_id, evaluacion.criterio_id, evaluacion.value)]
+    )
     return evaluacion
 
 
@@ -418,8 +697,10 @@ def delete_evaluacion(
     if not evaluacion:
         raise HTTPException(status_code=404, detail="Evaluación no encontrada")
     
+    escenario_id = evaluacion.escenario_id
     db.delete(evaluacion)
     db.commit()
+    estados_credibilidad.invalidar(escenario_id)
     return {"message": "Evaluación eliminada correctamente"}
 
 @router.post("/matriz/escenario/{escenario_id}/completar", response_model=List[Evaluacion])
@@ -442,42 +723,13 @@ def completar_evaluaciones_matriz(
     if not escenario:
         raise HTTPException(status_code=404, detail="Escenario no encontrado")
     
-    criterios = db.query(models.Criterio).filter(
-        models.Criterio.escenario_id == escenario_id
-    ).all()
-    alternativas = db.query(models.Alternativa).filter(
-        models.Alternativa.escenario_id == escenario_id
-    ).all()
-    
-    if not criterios or not alternativas:
+    if not (db.query(models.Criterio.id).filter(models.Criterio.escenario_id == escenario_id).first()
+            and db.query(models.Alternativa.id).filter(models.Alternativa.escenario_id == escenario_id).first()):
         raise HTTPException(status_code=400, detail="El escenario debe tener criterios y alternativas")
     
-    # Obtener todas las evaluaciones existentes en el escenario
-    evaluaciones_existentes = db.query(models.Evaluacion).filter(
-        models.Evaluacion.escenario_id == escenario_id
-    ).all()
-    eval_dict = {
-        (e.criterio_id, e.alternativa_id): e for e in evaluaciones_existentes
-    }
-    
-    nuevas_evaluaciones = []
-    for criterio in criterios:
-        for alternativa in alternativas:
-            key = (criterio.id, alternativa.id)
-            if key not in eval_dict:
-                evaluacion = models.Evaluacion(
-                    criterio_id=criterio.id,
-                    alternativa_id=alternativa.id,
-                    escenario_id=escenario_id,
-                    value=0.0
-                )
-                db.add(evaluacion)
-                nuevas_evaluaciones.append(evaluacion)
-    
+    # Insertar solo los pares criterio x alternativa que no tienen evaluación
+    insertar_matriz_evaluaciones(db, escenario_id, solo_faltantes=True)
     db.commit()
     
     # Devolver todas las evaluaciones del escenario (existentes y nuevas)
-    todas = db.query(models.Evaluacion).filter(
-        models.Evaluacion.escenario_id == escenario_id
-    ).all()
-    return todas
\ No newline at end of file
+    return evaluaciones_con_objetos(db, escenario_id)
@@ -1,30 +1,34 @@
 from typing import Any, List
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.schemas.proyecto import ProyectoCreate, ProyectoUpdate, Proyecto
 from app.api import deps
+from app.crud.clonado import clonar_escenarios_de_proyecto
+from app.db.async_session import get_async_db
 from app.db.session import get_db
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[Proyecto])
-def read_proyectos(
-    db: Session = Depends(get_db),
+async def read_proyectos(
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: models.User = Depends(deps.get_current_user_async),
 ) -> Any:
     """
     Obtener proyectos del usuario actual
     """
-    proyectos = db.query(models.Proyecto).filter(
+    proyectos = await db.scalars(select(models.Proyecto).where(
         models.Proyecto.owner_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    return proyectos
+    ).offset(skip).limit(limit))
+    return list(proyectos)
 
 
 @router.post("/", response_model=Proyecto)
@@ -140,54 +144,9 @@ def clonar_proyecto(
     db.add(nuevo_proyecto)
     db.flush()  # Para obtener el id del nuevo proyecto
 
-    for escenario in proyecto.escenarios:
-        nuevo_escenario = models.Escenario(
-            name=escenario.name,
-            description=escenario.description,
-            proyecto_id=nuevo_proyecto.id,
-            corte =escenario.corte,
-        )
-        db.add(nuevo_escenario)
-        db.flush()
-
-        # Mapear criterios originales a nuevos
-        criterio_id_map = {}
-        for criterio in escenario.criterios:
-            nuevo_criterio = models.Criterio(
-                name=criterio.name,
-                description=criterio.description,
-                weight=criterio.weight,
-                is_benefit=criterio.is_benefit,
-                escenario_id=nuevo_escenario.id,
-                preference_threshold=criterio.preference_threshold,
-                indifference_threshold=criterio.indifference_threshold,
-                veto_threshold=criterio.veto_threshold
-            )
-            db.add(nuevo_criterio)
-            db.flush()
-            criterio_id_map[criterio.id] = nuevo_criterio.id
-
-        # Mapear alternativas originales a nuevas
-        alternativa_id_map = {}
-        for alternativa in escenario.alternativas:
-            nueva_alternativa = models.Alternativa(
-                name=alternativa.name,
-                description=alternativa.description,
-                escenario_id=nuevo_escenario.id
-            )
-            db.add(nueva_alternativa)
-            db.flush()
-            alternativa_id_map[alternativa.id] = nueva_alternativa.id
-
-        # Clonar evaluaciones usando los nuevos IDs
-        for evaluacion in escenario.evaluaciones:
-            nueva_evaluacion = models.Evaluacion(
-                value=evaluacion.value,
-                escenario_id=nuevo_escenario.id,
-                alternativa_id=alternativa_id_map.get(evaluacion.alternativa_id),
-                criterio_id=criterio_id_map.get(evaluacion.criterio_id)
-            )
-            db.add(nueva_evaluacion)
+    # Copiar escenarios, criterios, alternativas y evaluaciones con INSERT ... SELECT
+    # en la misma transacción (ids remapeados en el servidor)
+    clonar_escenarios_de_proyecto(db, proyecto.id, nuevo_proyecto.id)
 
     db.commit()
     db.refresh(nuevo_proyecto)
@@ -1,74 +1,156 @@
-from typing import Any, List, Dict
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, as_completed
+from typing import Any, AsyncIterator, Iterator, List, Dict, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 
 from app import crud, models, schemas
+from app.core.config import settings
+from app.core.respuestas import RespuestaJSON, serializar_json
 from app.schemas.proyecto import ProyectoCreate, ProyectoUpdate, Proyecto
 from app.api import deps
+from app.db.base import SessionLocal
 from app.db.session import get_db
-from app.utils.electreIII import obtener_datos_escenario_para_electre, ejecutar_electre3_desde_bd_flujo_neto, ejecutar_electre3_desde_bd_destilacion
+from app.utils.electreIII import ejecutar_electre3_desde_bd_combinado
+from app.utils.electreIII_escenario import EscenarioElectre, cargar_escenarios_electre
+from app.utils.ejecutor_electre import (
+    ColaEjecutorLlenaError,
+    EjecucionCanceladaError,
+    ejecutor_electre,
+    esperar_o_cancelar,
+    verificar_cancelacion,
+)
 
 router = APIRouter()
 
-@router.get("/proyecto/{proyecto_id}/reporte_completo")
-def obtener_reporte_completo_proyecto(
-    *,
-    db: Session = Depends(get_db),
-    proyecto_id: int,
-    current_user: models.User = Depends(deps.get_current_user),
-) -> Dict:
+
+def rankear_escenario(escenario_id: int, datos: EscenarioElectre, encolado: float,
+                      cancelacion: Optional[threading.Event] = None) -> Tuple[Dict, Dict]:
     """
-    Obtener un reporte completo de todos los escenarios de un proyecto,
-    incluyendo información detallada de alternativas, criterios y resultados
-    de ELECTRE III con ambos métodos (destilación y flujo neto).
-    
+    Ejecuta ELECTRE III (flujo neto y destilación) para un escenario ya cargado.
+
     Args:
-        db: Sesión de base de datos
-        proyecto_id: ID del proyecto
-        current_user: Usuario autenticado
-        
+        cancelacion: si ya está activo cuando la tarea sale de la cola, el escenario no se calcula
+
     Returns:
-        Dict con información completa del proyecto y resultados de análisis
+        Tupla (resultado combinado, tiempos en segundos de espera en cola y de cálculo)
+    """
+    verificar_cancelacion(cancelacion)
+    inicio = time.perf_counter()
+    # Con los datos ya cargados no se usa la sesión, así que la tarea puede correr en otro hilo
+    resultado = ejecutar_electre3_desde_bd_combinado(None, escenario_id, datos) or {}
+    return resultado, {
+        "espera_segundos": inicio - encolado,
+        "calculo_segundos": time.perf_counter() - inicio
+    }
+
+
+def obtener_proyecto_y_escenarios(db: Session, proyecto_id: int,
+                                  owner_id: int) -> Tuple[models.Proyecto, List[models.Escenario]]:
+    """
+    Verifica que el proyecto pertenece al usuario y obtiene sus escenarios.
     """
-    # Verificar que el proyecto pertenece al usuario
     proyecto = db.query(models.Proyecto).filter(
         models.Proyecto.id == proyecto_id,
-        models.Proyecto.owner_id == current_user.id
+        models.Proyecto.owner_id == owner_id
     ).first()
     if not proyecto:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
-    
-    # Obtener todos los escenarios del proyecto
+
     escenarios = db.query(models.Escenario).filter(
         models.Escenario.proyecto_id == proyecto_id
     ).all()
-    
+
     if not escenarios:
         raise HTTPException(status_code=404, detail="El proyecto no tiene escenarios")
-    
-    resultado_proyecto = {
-        "proyecto": {
-            "id": proyecto.id,
-            "title": proyecto.title,
-            "description": proyecto.description,
-            "created_at": proyecto.created_at,
-            "updated_at": proyecto.updated_at
-        },
-        "escenarios": []
+    return proyecto, escenarios
+
+
+def info_proyecto(proyecto: models.Proyecto) -> Dict:
+    return {
+        "id": proyecto.id,
+        "title": proyecto.title,
+        "description": proyecto.description,
+        "created_at": proyecto.created_at,
+        "updated_at": proyecto.updated_at
     }
-    
-    for escenario in escenarios:
+
+
+class BloqueEscenarios:
+    """
+    Datos de un grupo de escenarios cargados en bloque y sus rankings enviados al ejecutor.
+    """
+
+    def __init__(self, db: Session, escenarios: List[models.Escenario],
+                 cancelacion: Optional[threading.Event] = None):
+        ids_escenarios = [escenario.id for escenario in escenarios]
+        self.escenarios = escenarios
+        self.datos = cargar_escenarios_electre(db, ids_escenarios)
+        self.criterios = defaultdict(list)
+        for criterio in db.query(models.Criterio).filter(
+            models.Criterio.escenario_id.in_(ids_escenarios)
+        ).order_by(models.Criterio.id):
+            self.criterios[criterio.escenario_id].append(criterio)
+        self.alternativas = defaultdict(list)
+        for alternativa in db.query(models.Alternativa).filter(
+            models.Alternativa.escenario_id.in_(ids_escenarios)
+        ).order_by(models.Alternativa.id):
+            self.alternativas[alternativa.escenario_id].append(alternativa)
+        self.tareas: Dict[int, Optional[Future]] = {}
+        self.cancelacion = cancelacion
+
+    def enviar(self):
+        """
+        Envía al ejecutor de ELECTRE III todos los escenarios con datos completos.
+        """
+        for escenario_id, datos_electre in self.datos.items():
+            if isinstance(datos_electre, Exception):
+                continue
+            try:
+                self.tareas[escenario_id] = ejecutor_electre.enviar(
+                    rankear_escenario, escenario_id, datos_electre, time.perf_counter(), self.cancelacion
+                )
+            except ColaEjecutorLlenaError:
+                # Con la cola llena el escenario se calcula en el hilo que lo consulte
+                self.tareas[escenario_id] = None
+
+    def en_orden_de_llegada(self) -> Iterator[models.Escenario]:
+        """
+        Recorre los escenarios a medida que termina su cálculo (primero los que no se calculan).
+        """
+        por_futuro = {futuro: escenario_id for escenario_id, futuro in self.tareas.items() if futuro is not None}
+        por_id = {escenario.id: escenario for escenario in self.escenarios}
+        for escenario in self.escenarios:
+            if self.tareas.get(escenario.id) is None:
+                verificar_cancelacion(self.cancelacion)
+                yield escenario
+        for futuro in as_completed(por_futuro):
+            verificar_cancelacion(self.cancelacion)
+            yield por_id[por_futuro[futuro]]
+
+    def info_escenario(self, escenario: models.Escenario) -> Dict:
+        """
+        Información completa de un escenario (o su error, sin afectar a los demás).
+        """
         try:
-            # Obtener datos detallados del escenario para ELECTRE
-            datos_electre = obtener_datos_escenario_para_electre(db, escenario.id)
-            
-            # Ejecutar ELECTRE III con ambos métodos
-            resultado_flujo_neto = ejecutar_electre3_desde_bd_flujo_neto(db, escenario.id)
-            resultado_destilacion = ejecutar_electre3_desde_bd_destilacion(db, escenario.id)
-            
-            # Preparar información del escenario
-            escenario_info = {
+            datos_electre = self.datos[escenario.id]
+            if isinstance(datos_electre, Exception):
+                raise datos_electre
+
+            # Ambos métodos sobre una sola matriz de credibilidad (calculados en el ejecutor)
+            futuro = self.tareas.get(escenario.id)
+            if futuro is not None:
+                resultado_combinado, tiempos = futuro.result()
+            else:
+                resultado_combinado, tiempos = rankear_escenario(escenario.id, datos_electre,
+                                                                 time.perf_counter(), self.cancelacion)
+
+            return {
                 "id": escenario.id,
                 "name": escenario.name,
                 "description": escenario.description,
@@ -86,7 +168,7 @@ def obtener_reporte_completo_proyecto(
                         "indifference_threshold": criterio.indifference_threshold,
                         "veto_threshold": criterio.veto_threshold
                     }
-                    for criterio in datos_electre["criterios_obj"]
+                    for criterio in self.criterios[escenario.id]
                 ],
                 "alternativas": [
                     {
@@ -94,25 +176,165 @@ def obtener_reporte_completo_proyecto(
                         "name": alternativa.name,
                         "description": alternativa.description,
                     }
-                    for alternativa in datos_electre["alternativas_obj"]
+                    for alternativa in self.alternativas[escenario.id]
                 ],
-                "matriz_decision": datos_electre["matriz_decision"].tolist(),
+                # Arreglo de NumPy: lo serializa directamente RespuestaJSON / serializar_json
+                "matriz_decision": datos_electre["matriz_decision"],
                 "resultados_electre": {
-                    "flujo_neto": resultado_flujo_neto,
-                    "destilacion": resultado_destilacion
-                }
+                    "flujo_neto": resultado_combinado.get("flujo_neto"),
+                    "destilacion": resultado_combinado.get("destilacion"),
+                    "puntajes": resultado_combinado.get("puntajes"),
+                    "concordancia": resultado_combinado.get("concordancia")
+                },
+                "tiempos": tiempos
             }
-            
-            resultado_proyecto["escenarios"].append(escenario_info)
-            
+
         except Exception as e:
             # Si hay error en un escenario, incluirlo con mensaje de error pero seguir con los demás
-            escenario_info = {
+            return {
                 "id": escenario.id,
                 "name": escenario.name,
                 "description": escenario.description,
                 "error": f"Error al procesar escenario: {str(e)}"
             }
-            resultado_proyecto["escenarios"].append(escenario_info)
-    
-    return resultado_proyecto
\ No newline at end of file
+
+
+def construir_reporte_proyecto(db: Session, proyecto: models.Proyecto, escenarios: List[models.Escenario],
+                               cancelacion: threading.Event) -> Dict:
+    """
+    Arma el reporte completo del proyecto; se detiene en cuanto se activa la cancelación.
+    """
+    inicio = time.perf_counter()
+    # Cargar en bloque los datos de ELECTRE y la información descriptiva de todos los escenarios
+    bloque = BloqueEscenarios(db, escenarios, cancelacion)
+    tiempo_carga = time.perf_counter() - inicio
+    bloque.enviar()
+
+    escenarios_info = []
+    for escenario in escenarios:
+        verificar_cancelacion(cancelacion)
+        escenarios_info.append(bloque.info_escenario(escenario))
+
+    return {
+        "proyecto": info_proyecto(proyecto),
+        "escenarios": escenarios_info,
+        "tiempos": {
+            "carga_segundos": tiempo_carga,
+            "total_segundos": time.perf_counter() - inicio
+        }
+    }
+
+
+@router.get("/proyecto/{proyecto_id}/reporte_completo", response_class=RespuestaJSON)
+async def obtener_reporte_completo_proyecto(
+    *,
+    request: Request,
+    db: Session = Depends(get_db),
+    proyecto_id: int,
+    current_user: models.User = Depends(deps.get_current_user),
+) -> RespuestaJSON:
+    """
+    Obtener un reporte completo de todos los escenarios de un proyecto,
+    incluyendo información detallada de alternativas, criterios y resultados
+    de ELECTRE III con ambos métodos (destilación y flujo neto).
+
+    Los escenarios se cargan en bloque y se procesan en paralelo en el ejecutor
+    de ELECTRE III; cada escenario incluye sus tiempos de espera y de cálculo.
+    Si el cliente se desconecta, los escenarios pendientes ya no se calculan.
+
+    Args:
+        request: Petición, para detectar la desconexión del cliente
+        db: Sesión de base de datos
+        proyecto_id: ID del proyecto
+        current_user: Usuario autenticado
+
+    Returns:
+        Dict con información completa del proyecto y resultados de análisis
+    """
+    proyecto, escenarios = await run_in_threadpool(obtener_proyecto_y_escenarios, db, proyecto_id, current_user.id)
+
+    cancelacion = threading.Event()
+    try:
+        resultado_proyecto = await esperar_o_cancelar(
+            run_in_threadpool(construir_reporte_proyecto, db, proyecto, escenarios, cancelacion),
+            request.is_disconnected, cancelacion
+        )
+    except EjecucionCanceladaError as e:
+        raise HTTPException(status_code=499, detail=str(e))
+    # Se devuelve la respuesta directamente para no pasar la matriz de NumPy por jsonable_encoder
+    return RespuestaJSON(resultado_proyecto)
+
+
+def lineas_reporte_proyecto(proyecto_id: int, escenario_ids: List[int],
+                            cancelacion: Optional[threading.Event] = None) -> Iterator[bytes]:
+    """
+    Genera el reporte del proyecto como líneas NDJSON.
+
+    Los escenarios se cargan y calculan en grupos del tamaño del ejecutor, de modo
+    que la memoria queda acotada; cada escenario se emite en cuanto termina su cálculo.
+    Si se activa la cancelación, los escenarios pendientes ya no se calculan.
+    """
+    inicio = time.perf_counter()
+    tamano_grupo = max(1, settings.ELECTRE_EJECUTOR_HILOS * 2)
+    tiempo_carga = 0.0
+    # La sesión de la petición se cierra antes de terminar la respuesta: el generador usa la suya
+    db = SessionLocal()
+    try:
+        proyecto = db.query(models.Proyecto).filter(models.Proyecto.id == proyecto_id).first()
+        yield serializar_json({"tipo": "proyecto", "proyecto": info_proyecto(proyecto),
+                               "num_escenarios": len(escenario_ids)}) + b"\n"
+
+        for desde in range(0, len(escenario_ids), tamano_grupo):
+            escenarios = db.query(models.Escenario).filter(
+                models.Escenario.id.in_(escenario_ids[desde:desde + tamano_grupo])
+            ).order_by(models.Escenario.id).all()
+            inicio_carga = time.perf_counter()
+            verificar_cancelacion(cancelacion)
+            bloque = BloqueEscenarios(db, escenarios, cancelacion)
+            tiempo_carga += time.perf_counter() - inicio_carga
+            bloque.enviar()
+            for escenario in bloque.en_orden_de_llegada():
+                yield serializar_json({"tipo": "escenario",
+                                       "escenario": bloque.info_escenario(escenario)}) + b"\n"
+            db.expunge_all()
+
+        yield serializar_json({"tipo": "fin", "tiempos": {
+            "carga_segundos": tiempo_carga,
+            "total_segundos": time.perf_counter() - inicio
+        }}) + b"\n"
+    finally:
+        db.close()
+
+
+async def lineas_cancelables(lineas: Iterator[bytes], cancelacion: threading.Event) -> AsyncIterator[bytes]:
+    """
+    Recorre un generador síncrono en el threadpool y activa la cancelación al terminar,
+    también cuando el cliente se desconecta y Starlette corta la respuesta.
+    """
+    try:
+        async for linea in iterate_in_threadpool(lineas):
+            yield linea
+    finally:
+        cancelacion.set()
+
+
+@router.get("/proyecto/{proyecto_id}/reporte_completo/stream")
+def obtener_reporte_completo_proyecto_stream(
+    *,
+    db: Session = Depends(get_db),
+    proyecto_id: int,
+    current_user: models.User = Depends(deps.get_current_user),
+) -> StreamingResponse:
+    """
+    Variante en streaming del reporte completo del proyecto (NDJSON, una línea por evento).
+
+    La primera línea es {"tipo": "proyecto", ...}, luego una línea {"tipo": "escenario", ...}
+    por escenario en el orden en que termina su cálculo y al final {"tipo": "fin", "tiempos": ...}.
+    """
+    _, escenarios = obtener_proyecto_y_escenarios(db, proyecto_id, current_user.id)
+    escenario_ids = sorted(escenario.id for escenario in escenarios)
+    cancelacion = threading.Event()
+    return StreamingResponse(
+        lineas_cancelables(lineas_reporte_proyecto(proyecto_id, escenario_ids, cancelacion), cancelacion),
+        media_type="application/x-ndjson"
+    )
@@ -0,0 +1,97 @@
+"""
+Caché de usuarios autenticados por id.
+
+Evita la consulta del usuario en cada petición autenticada. Las entradas vencen
+tras USUARIOS_CACHE_TTL segundos y CRUDUser las invalida al actualizar o
+eliminar un usuario (incluida la desactivación con is_active=False); con varios
+workers el TTL acota cuánto tarda un worker en ver el cambio hecho en otro.
+Los usuarios se guardan desacoplados de la sesión (solo sus columnas).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.core.config import settings
+from app.models.user import User
+
+
+class CacheUsuarios:
+    """
+    LRU acotada por número de entradas con expiración por TTL.
+    """
+
+    def __init__(self, max_entradas: int, ttl: float):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[int, Tuple[float, User]]" = OrderedDict()
+        # Cambia con cada invalidación: un usuario leído antes de invalidar no se guarda
+        self._generacion = 0
+
+    @property
+    def activa(self) -> bool:
+        return self.max_entradas > 0
+
+    @property
+    def generacion(self) -> int:
+        return self._generacion
+
+    def obtener(self, user_id: int) -> Optional[User]:
+        """
+        Busca un usuario vigente en la caché.
+
+        Returns:
+            El usuario guardado o None si no existe o expiró
+        """
+        if not self.activa:
+            return None
+        with self._lock:
+            entrada = self._entradas.get(user_id)
+            if entrada is None:
+                return None
+            expira, user = entrada
+            if expira <= time.monotonic():
+                del self._entradas[user_id]
+                return None
+            self._entradas.move_to_end(user_id)
+            return user
+
+    def guardar(self, user: Optional[User], generacion: int) -> Optional[User]:
+        """
+        Guarda un usuario leído de la base de datos (los None no se guardan).
+
+        Args:
+            user: Usuario ya desacoplado de su sesión
+            generacion: valor de `generacion` antes de leer el usuario; si hubo una
+                invalidación mientras tanto el usuario puede estar desactualizado y no se guarda
+
+        Returns:
+            El mismo usuario recibido, para poder usarlo en un return
+        """
+        if not self.activa or user is None:
+            return user
+        with self._lock:
+            if generacion != self._generacion:
+                return user
+            self._entradas[user.id] = (time.monotonic() + self.ttl, user)
+            self._entradas.move_to_end(user.id)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return user
+
+    def invalidar(self, user_id: int):
+        with self._lock:
+            self._generacion += 1
+            self._entradas.pop(user_id, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._generacion += 1
+            self._entradas.clear()
+
+
+cache_usuarios = CacheUsuarios(
+    max_entradas=settings.USUARIOS_CACHE_MAX_ENTRADAS,
+    ttl=settings.USUARIOS_CACHE_TTL,
+)
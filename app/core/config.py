@@ -3,6 +3,17 @@ from typing import Any, Dict, List, Optional, Union
 from pydantic import AnyHttpUrl, PostgresDsn, validator
 from pydantic_settings import BaseSettings
 
+# Driver asíncrono que corresponde a cada driver síncrono de SQLALCHEMY_DATABASE_URI
+DRIVERS_ASINCRONOS = {
+    "mysql+pymysql://": "mysql+aiomysql://",
+    "mysql+mysqldb://": "mysql+aiomysql://",
+    "mysql://": "mysql+aiomysql://",
+    "sqlite+pysqlite://": "sqlite+aiosqlite://",
+    "sqlite://": "sqlite+aiosqlite://",
+}
+# Drivers de SQLAlchemy que ya son asyncio: la URI se usa tal cual en la capa asíncrona
+DRIVERS_ASYNCIO = ("aiomysql", "asyncmy", "aiosqlite", "asyncpg", "psycopg")
+
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Sistema de Apoyo a la Toma de Decisiones"
     API_V1_STR: str = "/api/v1"
@@ -10,11 +21,39 @@ class Settings(BaseSettings):
     # DLLS
     DLL_PATH: str
     DEBUGGER_PATH: str
+    # Shim binario de ELECTRE III compilado desde app/dll/shim/electre_binario.c (motor "binario")
+    DLL_BINARIO_PATH: Optional[str] = None
+
+    # Motor de ELECTRE III por defecto: "dll" (librería nativa con CSV en texto),
+    # "numpy" (motor vectorizado) o "binario" (librería nativa vía shim binario)
+    ELECTRE_MOTOR: str = "dll"
+    # Ejecutor acotado para el trabajo bloqueante de los endpoints async de ELECTRE III
+    ELECTRE_EJECUTOR_HILOS: int = 4
+    ELECTRE_EJECUTOR_MAX_COLA: int = 64
+    # Procesos aislados para la librería de ELECTRE III (0 = ejecutar en el proceso de la API)
+    ELECTRE_PROCESOS: int = 0
+    # Tiempo máximo en segundos de cada ejecución en un proceso aislado
+    ELECTRE_PROCESOS_TIMEOUT: float = 60.0
+    # Caché de resultados de ELECTRE III: entradas máximas (0 = desactivada) y vigencia en segundos
+    ELECTRE_CACHE_MAX_ENTRADAS: int = 256
+    ELECTRE_CACHE_TTL: float = 300.0
+    # Memoria máxima (MB) del motor numpy; si la matriz de credibilidad no cabe se calcula por bloques
+    ELECTRE_MEMORIA_MAXIMA_MB: int = 512
+    # Directorio para la matriz de credibilidad en disco (np.memmap); por defecto el temporal del sistema
+    ELECTRE_DIRECTORIO_MEMMAP: Optional[str] = None
+    # Escenarios con matriz de credibilidad incremental en memoria (motor numpy, 0 = desactivado);
+    # entre todos no ocupan más de ELECTRE_MEMORIA_MAXIMA_MB
+    ELECTRE_INCREMENTAL_MAX_ESCENARIOS: int = 32
+    # Procesos para el análisis de robustez de pesos por Monte Carlo (0 = en el proceso de la API)
+    ELECTRE_ROBUSTEZ_PROCESOS: int = 2
 
     # JWT
     SECRET_KEY: str 
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 días
+    # Caché del usuario autenticado: entradas máximas (0 = desactivada) y vigencia en segundos
+    USUARIOS_CACHE_MAX_ENTRADAS: int = 1024
+    USUARIOS_CACHE_TTL: float = 60.0
     
     # CORS
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
@@ -42,6 +81,36 @@ class Settings(BaseSettings):
             return v
         return f"mysql+pymysql://{values.get('MYSQL_USER')}:{values.get('MYSQL_PASSWORD')}@{values.get('MYSQL_HOST')}:{values.get('MYSQL_PORT')}/{values.get('MYSQL_DATABASE')}"
 
+    # URI para la capa asíncrona (SQLAlchemy asyncio); por defecto la misma base con el driver aiomysql
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[str] = None
+
+    @validator("SQLALCHEMY_ASYNC_DATABASE_URI", pre=True, always=True)
+    def assemble_async_db_connection(cls, v: Optional[str], values: Dict[str, Any]) -> Any:
+        if isinstance(v, str):
+            return v
+        uri = values.get("SQLALCHEMY_DATABASE_URI") or ""
+        for driver, driver_async in DRIVERS_ASINCRONOS.items():
+            if uri.startswith(driver):
+                return driver_async + uri[len(driver):]
+        esquema = uri.split("://", 1)[0]
+        if "+" in esquema and esquema.split("+", 1)[1] in DRIVERS_ASYNCIO:
+            return uri
+        raise ValueError(
+            f"No se conoce un driver asíncrono para '{esquema}://' de SQLALCHEMY_DATABASE_URI; "
+            "defina SQLALCHEMY_ASYNC_DATABASE_URI con un driver asyncio (p. ej. mysql+aiomysql://...)"
+        )
+
+    # Pool de conexiones: conexiones permanentes y extra (desborde); por defecto tantas como
+    # hilos del threadpool de los endpoints síncronos que suelen usar la base de datos a la vez
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    # Segundos tras los que se recicla una conexión (menor que wait_timeout de MySQL, -1 = nunca)
+    DB_POOL_RECYCLE: int = 1800
+    # Verificar la conexión antes de usarla para descartar conexiones caídas
+    DB_POOL_PRE_PING: bool = True
+    # Segundos máximos de espera por una conexión libre antes de fallar
+    DB_POOL_TIMEOUT: float = 30.0
+
     class Config:
         case_sensitive = True
         env_file = ".env"
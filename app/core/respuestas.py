@@ -0,0 +1,44 @@
+"""
+Respuestas JSON serializadas con orjson.
+
+orjson serializa de forma nativa arreglos y escalares de NumPy, datetime
+(ISO 8601, igual que jsonable_encoder) y NaN (como null). Un endpoint que
+devuelve datos con NumPy debe devolver directamente RespuestaJSON(...): así
+se evita el paso por jsonable_encoder y la conversión previa con .tolist().
+"""
+from typing import Any
+
+import numpy as np
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+
+_OPCIONES_ORJSON = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _serializar_otro(valor: Any) -> Any:
+    """
+    Tipos que orjson no serializa solo: arreglos no contiguos o de dtype no soportado
+    y, para el resto (modelos de pydantic, Decimal, ...), lo que haría jsonable_encoder.
+    """
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return jsonable_encoder(valor)
+
+
+def serializar_json(contenido: Any) -> bytes:
+    """
+    Serializa a JSON (bytes UTF-8) con las mismas reglas que RespuestaJSON.
+    """
+    return orjson.dumps(contenido, default=_serializar_otro, option=_OPCIONES_ORJSON)
+
+
+class RespuestaJSON(ORJSONResponse):
+    """
+    Respuesta JSON de la aplicación (default_response_class) serializada con orjson.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return serializar_json(content)
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Optional, Union
 
 from jose import jwt
 from passlib.context import CryptContext
@@ -32,11 +32,9 @@ def create_access_token(subject: Union[str, Any], expires_delta: timedelta = Non
 
 
 
-async def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> User:
+def obtener_id_usuario_token(token: str) -> int:
     """
-    Dependencia para obtener el usuario actual a partir del token JWT
+    Decodifica el token JWT y devuelve el id del usuario (401 si el token no es válido)
     """
     try:
         payload = jwt.decode(
@@ -55,8 +53,13 @@ async def get_current_user(
             detail="Credenciales de autenticación inválidas",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    user = crud_user.get(db, id=int(user_id))
+    return int(user_id)
+
+
+def verificar_usuario(user: Optional[User]) -> User:
+    """
+    Verifica que el usuario del token exista y esté activo
+    """
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
@@ -68,3 +71,13 @@ async def get_current_user(
         )
     return user
 
+
+async def get_current_user(
+    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+) -> User:
+    """
+    Dependencia para obtener el usuario actual a partir del token JWT
+    """
+    user_id = obtener_id_usuario_token(token)
+    return verificar_usuario(crud_user.get(db, id=user_id))
+
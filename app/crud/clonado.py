@@ -0,0 +1,135 @@
+"""
+Clonado de escenarios en la base de datos con sentencias INSERT ... SELECT.
+
+Las filas nuevas se insertan en el mismo orden de id que las originales, así
+que el k-ésimo criterio (o alternativa) de un escenario original corresponde
+al k-ésimo del clon. El mapeo de ids se hace en el servidor emparejando
+ROW_NUMBER() OVER (PARTITION BY escenario_id ORDER BY id) de ambos lados, sin
+cargar los objetos en Python.
+"""
+import datetime
+
+from sqlalchemy import Integer, and_, func, insert, literal, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Subquery
+
+from app import models
+
+
+def mapa_escenario(origen_id: int, destino_id: int) -> Subquery:
+    """
+    Mapa (origen, destino) de un solo escenario ya creado.
+    """
+    return select(
+        literal(origen_id, Integer).label("origen"),
+        literal(destino_id, Integer).label("destino"),
+    ).subquery()
+
+
+def _numerados(modelo, escenario_ids) -> Subquery:
+    """
+    Filas de criterios/alternativas de los escenarios indicados con su posición dentro del escenario.
+    """
+    return select(
+        modelo.id,
+        modelo.escenario_id,
+        func.row_number().over(partition_by=modelo.escenario_id, order_by=modelo.id).label("posicion"),
+    ).where(modelo.escenario_id.in_(escenario_ids)).subquery()
+
+
+def _mapa_ids(modelo, mapa: Subquery) -> Subquery:
+    """
+    Mapa (origen, destino) de ids de criterios o alternativas entre los escenarios originales y sus clones.
+    """
+    originales = _numerados(modelo, select(mapa.c.origen))
+    clones = _numerados(modelo, select(mapa.c.destino))
+    return (
+        select(originales.c.id.label("origen"), clones.c.id.label("destino"))
+        .select_from(originales)
+        .join(mapa, mapa.c.origen == originales.c.escenario_id)
+        .join(clones, and_(
+            clones.c.escenario_id == mapa.c.destino,
+            clones.c.posicion == originales.c.posicion,
+        ))
+        .subquery()
+    )
+
+
+def clonar_contenido_escenarios(db: Session, mapa: Subquery):
+    """
+    Copia criterios, alternativas y evaluaciones de cada escenario origen a su escenario destino.
+
+    Son tres INSERT ... SELECT sin importar cuántos escenarios o filas haya; no se hace commit.
+
+    Args:
+        db: Sesión de base de datos
+        mapa: subconsulta con columnas (origen, destino) de ids de escenarios
+    """
+    criterio = models.Criterio
+    db.execute(insert(criterio).from_select(
+        ["name", "description", "weight", "is_benefit", "escenario_id",
+         "preference_threshold", "indifference_threshold", "veto_threshold"],
+        select(
+            criterio.name, criterio.description, criterio.weight, criterio.is_benefit, mapa.c.destino,
+            criterio.preference_threshold, criterio.indifference_threshold, criterio.veto_threshold,
+        )
+        .join(mapa, mapa.c.origen == criterio.escenario_id)
+        .order_by(mapa.c.destino, criterio.id)
+    ))
+
+    alternativa = models.Alternativa
+    db.execute(insert(alternativa).from_select(
+        ["name", "description", "escenario_id"],
+        select(alternativa.name, alternativa.description, mapa.c.destino)
+        .join(mapa, mapa.c.origen == alternativa.escenario_id)
+        .order_by(mapa.c.destino, alternativa.id)
+    ))
+
+    evaluacion = models.Evaluacion
+    mapa_criterios = _mapa_ids(criterio, mapa)
+    mapa_alternativas = _mapa_ids(alternativa, mapa)
+    db.execute(insert(evaluacion).from_select(
+        ["value", "escenario_id", "alternativa_id", "criterio_id"],
+        select(evaluacion.value, mapa.c.destino, mapa_alternativas.c.destino, mapa_criterios.c.destino)
+        .join(mapa, mapa.c.origen == evaluacion.escenario_id)
+        .join(mapa_alternativas, mapa_alternativas.c.origen == evaluacion.alternativa_id)
+        .join(mapa_criterios, mapa_criterios.c.origen == evaluacion.criterio_id)
+        .order_by(evaluacion.id)
+    ))
+
+
+def clonar_escenarios_de_proyecto(db: Session, proyecto_origen_id: int, proyecto_destino_id: int):
+    """
+    Copia todos los escenarios de un proyecto (con su contenido) a otro proyecto vacío; no se hace commit.
+
+    Args:
+        db: Sesión de base de datos
+        proyecto_origen_id: ID del proyecto original
+        proyecto_destino_id: ID del proyecto clon (recién creado, sin escenarios)
+    """
+    escenario = models.Escenario
+    ahora = datetime.datetime.utcnow()
+    db.execute(insert(escenario).from_select(
+        ["name", "description", "proyecto_id", "corte", "created_at", "updated_at"],
+        select(
+            escenario.name, escenario.description, literal(proyecto_destino_id, Integer),
+            escenario.corte, literal(ahora), literal(ahora),
+        )
+        .where(escenario.proyecto_id == proyecto_origen_id)
+        .order_by(escenario.id)
+    ))
+
+    def numerados(proyecto_id: int) -> Subquery:
+        return select(
+            escenario.id,
+            func.row_number().over(order_by=escenario.id).label("posicion"),
+        ).where(escenario.proyecto_id == proyecto_id).subquery()
+
+    originales = numerados(proyecto_origen_id)
+    clones = numerados(proyecto_destino_id)
+    mapa = (
+        select(originales.c.id.label("origen"), clones.c.id.label("destino"))
+        .join(clones, clones.c.posicion == originales.c.posicion)
+        .subquery()
+    )
+    clonar_contenido_escenarios(db, mapa)
@@ -1,7 +1,10 @@
 from typing import Any, Dict, Optional, Union
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache_usuarios import cache_usuarios
 from app.crud.base import CRUDBase
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
@@ -12,6 +15,9 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         return db.query(User).filter(User.email == email).first()
 
 
+    async def get_by_email_async(self, db: AsyncSession, *, email: str) -> Optional[User]:
+        return await db.scalar(select(User).where(User.email == email))
+
     def create(self, db: Session, *, obj_in: UserCreate) -> User:
         db_obj = User(
             email=obj_in.email,
@@ -23,6 +29,17 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         db.refresh(db_obj)
         return db_obj
 
+    async def create_async(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
+        db_obj = User(
+            email=obj_in.email,
+            name=obj_in.name,
+            hashed_password=get_password_hash(obj_in.password)
+        )
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
     def update(
         self, db: Session, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
     ) -> User:
@@ -34,7 +51,35 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             hashed_password = get_password_hash(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
-        return super().update(db, db_obj=db_obj, obj_in=update_data)
+        user = super().update(db, db_obj=db_obj, obj_in=update_data)
+        # Los cambios (p. ej. is_active=False) deben verse en la siguiente petición autenticada
+        cache_usuarios.invalidar(user.id)
+        return user
+
+    async def update_async(
+        self, db: AsyncSession, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
+    ) -> User:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        if update_data.get("password"):
+            hashed_password = get_password_hash(update_data["password"])
+            del update_data["password"]
+            update_data["hashed_password"] = hashed_password
+        user = await super().update_async(db, db_obj=db_obj, obj_in=update_data)
+        cache_usuarios.invalidar(user.id)
+        return user
+
+    def remove(self, db: Session, *, id: int) -> User:
+        user = super().remove(db, id=id)
+        cache_usuarios.invalidar(id)
+        return user
+
+    async def remove_async(self, db: AsyncSession, *, id: int) -> User:
+        user = await super().remove_async(db, id=id)
+        cache_usuarios.invalidar(id)
+        return user
 
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
         user = self.get_by_email(db, email=email)
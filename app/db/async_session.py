@@ -0,0 +1,24 @@
+# app/db/async_session.py
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.pool import PoolAsyncConMetricas, metricas_pool_async, registrar_eventos_pool
+
+# Engine asíncrono sobre la misma base (mysql+aiomysql) con la misma configuración de pool
+async_engine = create_async_engine(
+    settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+    poolclass=PoolAsyncConMetricas,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+)
+registrar_eventos_pool(async_engine.sync_engine, metricas_pool_async)
+# Sin expirar al hacer commit: tras el commit los objetos se serializan sin volver a la base
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -3,10 +3,18 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 # ...otros modelos...
 from app.core.config import settings
+from app.db.pool import PoolConMetricas, registrar_eventos_pool
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+engine = create_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    poolclass=PoolConMetricas,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+)
+registrar_eventos_pool(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
-
-
@@ -0,0 +1,131 @@
+"""
+Pool de conexiones de la base de datos con métricas.
+
+PoolConMetricas es un QueuePool que mide cuánto espera cada checkout, cuenta
+las conexiones de desborde (max_overflow) y los agotamientos del pool
+(TimeoutError tras DB_POOL_TIMEOUT). Junto con las conexiones nuevas y las
+invalidadas (p. ej. por pre-ping sobre conexiones caídas de MySQL) permite
+distinguir un pool agotado de conexiones obsoletas.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Esperas recientes usadas para los percentiles
+_MAX_ESPERAS_RECIENTES = 1024
+
+
+class MetricasPool:
+    """
+    Contadores del pool de conexiones, compartidos entre recreaciones del pool (engine.dispose()).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._espera_total = 0.0
+        self._espera_maxima = 0.0
+        self._esperas = deque(maxlen=_MAX_ESPERAS_RECIENTES)
+        self._desbordes = 0
+        self._agotados = 0
+        self._conexiones_nuevas = 0
+        self._invalidadas = 0
+
+    def registrar_checkout(self, espera: float, desborde: bool):
+        with self._lock:
+            self._checkouts += 1
+            self._espera_total += espera
+            self._espera_maxima = max(self._espera_maxima, espera)
+            self._esperas.append(espera)
+            if desborde:
+                self._desbordes += 1
+
+    def registrar_agotado(self, espera: float):
+        with self._lock:
+            self._agotados += 1
+            self._espera_maxima = max(self._espera_maxima, espera)
+
+    def registrar_conexion(self):
+        with self._lock:
+            self._conexiones_nuevas += 1
+
+    def registrar_invalidada(self):
+        with self._lock:
+            self._invalidadas += 1
+
+    def estado(self, pool: Any) -> Dict[str, Any]:
+        """
+        Métricas acumuladas y ocupación actual del pool.
+
+        Args:
+            pool: Pool actual del engine (engine.pool)
+        """
+        with self._lock:
+            esperas = np.fromiter(self._esperas, dtype=np.float64)
+            estado = {
+                "checkouts": self._checkouts,
+                "espera_promedio_segundos": self._espera_total / self._checkouts if self._checkouts else 0.0,
+                "espera_p95_segundos": float(np.percentile(esperas, 95)) if esperas.size else 0.0,
+                "espera_maxima_segundos": self._espera_maxima,
+                "desbordes": self._desbordes,
+                "agotados": self._agotados,
+                "conexiones_nuevas": self._conexiones_nuevas,
+                "invalidadas": self._invalidadas,
+            }
+        if isinstance(pool, QueuePool):
+            estado.update({
+                "tamano": pool.size(),
+                "max_desborde": pool._max_overflow,
+                "en_uso": pool.checkedout(),
+                "disponibles": pool.checkedin(),
+                "desborde_actual": max(pool.overflow(), 0),
+                "timeout_segundos": pool.timeout(),
+            })
+        return estado
+
+
+metricas_pool = MetricasPool()
+# Pool del engine asíncrono (app.db.async_session)
+metricas_pool_async = MetricasPool()
+
+
+class PoolConMetricas(QueuePool):
+    """
+    QueuePool que registra en sus métricas (metricas_pool) la espera de cada checkout y los desbordes.
+    """
+    metricas = metricas_pool
+
+    def _do_get(self):
+        desborde_previo = self._overflow
+        inicio = time.perf_counter()
+        try:
+            conexion = super()._do_get()
+        except sa_exc.TimeoutError:
+            self.metricas.registrar_agotado(time.perf_counter() - inicio)
+            raise
+        # _overflow empieza en -pool_size y crece con cada conexión creada: > 0 es una conexión de desborde
+        desborde = self._overflow > desborde_previo and self._overflow > 0
+        self.metricas.registrar_checkout(time.perf_counter() - inicio, desborde)
+        return conexion
+
+
+class PoolAsyncConMetricas(PoolConMetricas, AsyncAdaptedQueuePool):
+    """
+    Variante para engines asíncronos (AsyncAdaptedQueuePool) que registra en metricas_pool_async.
+    """
+    metricas = metricas_pool_async
+
+
+def registrar_eventos_pool(engine: Engine, metricas: MetricasPool = metricas_pool):
+    """
+    Cuenta las conexiones nuevas (incluye las recicladas) y las invalidadas del engine.
+    """
+    event.listen(engine, "connect", lambda *args: metricas.registrar_conexion())
+    event.listen(engine, "invalidate", lambda *args: metricas.registrar_invalidada())
@@ -0,0 +1,145 @@
+/*
+ * Interfaz binaria para ELECTREIIISL.
+ *
+ * Recibe la matriz de decisión y los vectores de umbrales como buffers
+ * float64 contiguos (directamente desde ndarray.ctypes), arma en C la cadena
+ * que esperan ElectreIIIExplotarFlujoNeto / ElectreIIIExplotarDestilacion con
+ * "%.17g" (sin pérdida de precisión al leerla con strtod) y devuelve el
+ * resultado ya decodificado en buffers de salida.
+ *
+ * La función de la librería se recibe como puntero, por lo que el shim no
+ * depende de ELECTREIIISL en tiempo de enlace y funciona igual con el .so y el .dll.
+ *
+ * Compilar:
+ *   Linux:   gcc -O2 -shared -fPIC -o ELECTREIIISL_binario.so electre_binario.c
+ *   Windows: gcc -O2 -shared -o ELECTREIIISL_binario.dll electre_binario.c
+ */
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+#ifdef _WIN32
+#define EXPORTAR __declspec(dllexport)
+#else
+#define EXPORTAR __attribute__((visibility("default")))
+#endif
+
+#define ELECTRE_BINARIO_OK 0
+#define ELECTRE_BINARIO_ERROR_ARGUMENTOS -1
+#define ELECTRE_BINARIO_ERROR_MEMORIA -2
+#define ELECTRE_BINARIO_ERROR_SIN_RESULTADO -3
+#define ELECTRE_BINARIO_ERROR_RESULTADO -4
+
+/* Longitud máxima de un valor con "%.17g" más el separador */
+#define LONGITUD_VALOR 32
+
+typedef const char *(*electre_explotar_fn)(long, long, double, char *);
+
+static char *escribir_fila(char *cursor, const char *etiqueta, long indice,
+                           const double *valores, long paso, long cantidad, int enteros)
+{
+    long j;
+    if (indice >= 0)
+        cursor += sprintf(cursor, "%s%ld", etiqueta, indice);
+    else
+        cursor += sprintf(cursor, "%s", etiqueta);
+    for (j = 0; j < cantidad; j++) {
+        if (enteros)
+            cursor += sprintf(cursor, ",%ld", (long)valores[j * paso]);
+        else
+            cursor += sprintf(cursor, ",%.17g", valores[j * paso]);
+    }
+    cursor += sprintf(cursor, ";:");
+    return cursor;
+}
+
+static char *construir_entrada(long n, long m, const double *matriz, const double *pesos,
+                               const double *preferencia, const double *indiferencia,
+                               const double *veto, const double *direccion)
+{
+    long i, j;
+    size_t tamano = (size_t)(n + 6) * (size_t)(m + 1) * LONGITUD_VALOR + 64;
+    char *entrada = (char *)malloc(tamano);
+    char *cursor;
+    if (entrada == NULL)
+        return NULL;
+
+    /* Encabezado: los nombres de criterios no se usan en el cálculo */
+    cursor = entrada + sprintf(entrada, "-");
+    for (j = 0; j < m; j++)
+        cursor += sprintf(cursor, ",C%ld", j);
+    cursor += sprintf(cursor, ";:");
+
+    /* Las alternativas se nombran por índice para mapear el resultado */
+    for (i = 0; i < n; i++)
+        cursor = escribir_fila(cursor, "A", i, matriz + i * m, 1, m, 0);
+
+    cursor = escribir_fila(cursor, "W", -1, pesos, 1, m, 0);
+    cursor = escribir_fila(cursor, "P", -1, preferencia, 1, m, 0);
+    cursor = escribir_fila(cursor, "I", -1, indiferencia, 1, m, 0);
+    cursor = escribir_fila(cursor, "V", -1, veto, 1, m, 0);
+    escribir_fila(cursor, "D", -1, direccion, 1, m, 1);
+    return entrada;
+}
+
+static int leer_resultado(const char *resultado, long n, double *valores, int *orden)
+{
+    const char *cursor = resultado;
+    char *fin;
+    long leidos = 0;
+    long indice;
+
+    while (*cursor != '\0') {
+        if (*cursor == ':')
+            cursor++;
+        if (*cursor != 'A')
+            return ELECTRE_BINARIO_ERROR_RESULTADO;
+        indice = strtol(cursor + 1, &fin, 10);
+        if (fin == cursor + 1 || *fin != ':' || indice < 0 || indice >= n || leidos >= n)
+            return ELECTRE_BINARIO_ERROR_RESULTADO;
+        valores[indice] = strtod(fin + 1, &fin);
+        if (*fin != ';')
+            return ELECTRE_BINARIO_ERROR_RESULTADO;
+        orden[leidos++] = (int)indice;
+        cursor = fin + 1;
+    }
+    return leidos == n ? ELECTRE_BINARIO_OK : ELECTRE_BINARIO_ERROR_RESULTADO;
+}
+
+/*
+ * Ejecuta una explotación de ELECTRE III sobre buffers binarios.
+ *
+ * explotar:     puntero a ElectreIIIExplotarFlujoNeto o ElectreIIIExplotarDestilacion
+ * matriz:       n * m valores en orden por filas (una fila por alternativa)
+ * pesos, preferencia, indiferencia, veto, direccion: m valores cada uno
+ * valores:      salida, n valores; resultado de cada alternativa por índice
+ * orden:        salida, n índices en el orden en que la librería devolvió el ranking
+ *
+ * Retorna ELECTRE_BINARIO_OK o un código de error negativo.
+ */
+EXPORTAR int ElectreIIIExplotarBinario(electre_explotar_fn explotar, long n, long m, double lambda,
+                                       const double *matriz, const double *pesos,
+                                       const double *preferencia, const double *indiferencia,
+                                       const double *veto, const double *direccion,
+                                       double *valores, int *orden)
+{
+    char *entrada;
+    const char *resultado;
+    int estado;
+
+    if (explotar == NULL || n <= 0 || m <= 0 || matriz == NULL || valores == NULL || orden == NULL)
+        return ELECTRE_BINARIO_ERROR_ARGUMENTOS;
+
+    entrada = construir_entrada(n, m, matriz, pesos, preferencia, indiferencia, veto, direccion);
+    if (entrada == NULL)
+        return ELECTRE_BINARIO_ERROR_MEMORIA;
+
+    resultado = explotar(n, m, lambda, entrada);
+    if (resultado == NULL) {
+        free(entrada);
+        return ELECTRE_BINARIO_ERROR_SIN_RESULTADO;
+    }
+    estado = leer_resultado(resultado, n, valores, orden);
+    free(entrada);
+    return estado;
+}
@@ -10,4 +10,6 @@ class ElectreIIIRequest(BaseModel):
     veto: List[float] = Field(..., description="Umbrales de veto")
     direccion: List[int] = Field(..., description="Dirección de cada criterio (1=beneficio, 0=costo)")
     lambda_corte: float = Field(0.50, description="Valor de corte lambda")
-    nombres_alternativas: Optional[List[str]] = Field(None, description="Nombres de las alternativas (opcional)")
\ No newline at end of file
+    nombres_alternativas: Optional[List[str]] = Field(None, description="Nombres de las alternativas (opcional)")
+    motor: Optional[str] = Field(None, description="Motor de cálculo: 'dll', 'numpy' o 'binario' (por defecto el configurado)")
+    incluir_puntajes: bool = Field(False, description="Solo flujo neto: devolver {ranking, puntajes} calculado por bloques en memoria lineal. Siempre usa el motor NumPy: con otro motor explícito responde 400")
@@ -1,3 +1,4 @@
+from typing import List, Optional
 
 from pydantic import BaseModel
 from app.schemas.criterio import Criterio
@@ -31,4 +32,34 @@ class EvaluacionInDB(EvaluacionBase):
 
 # Propiedades públicas de la evaluación para la API
 class Evaluacion(EvaluacionInDB):
-    pass
\ No newline at end of file
+    pass
+
+
+# Cambio aplicado a una celda de la matriz de evaluaciones
+class EvaluacionCambio(BaseModel):
+    id: int
+    alternativa_id: int
+    criterio_id: int
+    anterior: float
+    value: float
+
+
+# Respuesta compacta de la actualización masiva de la matriz
+class MatrizEvaluacionesActualizada(BaseModel):
+    escenario_id: int
+    recibidas: int
+    actualizadas: int
+    cambios: List[EvaluacionCambio]
+
+
+# Matriz de evaluaciones en forma densa: valores por filas (alternativas) y columnas (criterios),
+# en orden fila por fila; null donde no hay evaluación (o donde no se quiere cambiar el valor)
+class MatrizEvaluacionesDensaBase(BaseModel):
+    alternativas: List[int]
+    criterios: List[int]
+    valores: List[Optional[float]]
+
+
+# Matriz densa de un escenario en la respuesta de la API
+class MatrizEvaluacionesDensa(MatrizEvaluacionesDensaBase):
+    escenario_id: int
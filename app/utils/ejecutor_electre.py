@@ -0,0 +1,180 @@
+"""
+Ejecutor acotado para el trabajo bloqueante de ELECTRE III.
+
+Los endpoints async delegan aquí la escritura de archivos, el parseo del CSV y
+la llamada a la librería nativa para no bloquear el event loop; el reporte de
+proyecto lo usa además para procesar sus escenarios en paralelo. El número de
+hilos y la cola máxima se configuran en settings.
+
+Si el cliente se desconecta, esperar_o_cancelar activa el evento de cancelación
+de la tarea: el pool de procesos termina el proceso que la ejecutaba (y levanta
+otro) y las tareas que todavía estaban en cola no llegan a ejecutarse.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+
+# Segundos entre comprobaciones de desconexión del cliente
+INTERVALO_DESCONEXION = 0.5
+
+
+class ColaEjecutorLlenaError(RuntimeError):
+    """Se lanza cuando la cola del ejecutor alcanzó su tamaño máximo."""
+
+
+class EjecucionCanceladaError(RuntimeError):
+    """Se lanza cuando una tarea se cancela porque el cliente se desconectó."""
+
+
+def verificar_cancelacion(cancelacion: Optional[threading.Event]):
+    """
+    Lanza EjecucionCanceladaError si el evento de cancelación está activo.
+    """
+    if cancelacion is not None and cancelacion.is_set():
+        raise EjecucionCanceladaError("Ejecución de ELECTRE III cancelada: el cliente se desconectó")
+
+
+async def esperar_o_cancelar(tarea: Awaitable, desconectado: Callable[[], Awaitable[bool]],
+                             cancelacion: threading.Event, futuro: Optional[Future] = None) -> Any:
+    """
+    Espera una tarea comprobando cada INTERVALO_DESCONEXION segundos si el cliente se desconectó.
+
+    Args:
+        tarea: tarea asíncrona que ejecuta el trabajo bloqueante
+        desconectado: función asíncrona que indica si el cliente se fue (request.is_disconnected)
+        cancelacion: evento que recibe el trabajo; se activa al detectar la desconexión
+        futuro: Future del ejecutor, para cancelarlo si todavía no empezó
+
+    Returns:
+        El resultado de la tarea
+
+    Raises:
+        EjecucionCanceladaError: si el cliente se desconectó
+    """
+    tarea = asyncio.ensure_future(tarea)
+    while True:
+        hechas, _ = await asyncio.wait({tarea}, timeout=INTERVALO_DESCONEXION)
+        if hechas:
+            return tarea.result()
+        if await desconectado():
+            cancelacion.set()
+            if futuro is not None:
+                futuro.cancel()
+            # La tarea en curso termina en cuanto ve el evento; se espera para no dejarla huérfana
+            try:
+                await tarea
+            except BaseException:
+                pass
+            raise EjecucionCanceladaError("Ejecución de ELECTRE III cancelada: el cliente se desconectó")
+
+
+class EjecutorElectre:
+    """
+    ThreadPoolExecutor con límite de cola y contadores de profundidad.
+    """
+
+    def __init__(self, max_hilos: int, max_cola: int):
+        self.max_hilos = max_hilos
+        self.max_cola = max_cola
+        self._pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="electre")
+        self._lock = threading.Lock()
+        self._en_cola = 0
+        self._en_ejecucion = 0
+        self._completadas = 0
+        self._fallidas = 0
+        self._rechazadas = 0
+
+    def _envolver(self, funcion: Callable, args, kwargs):
+        with self._lock:
+            self._en_cola -= 1
+            self._en_ejecucion += 1
+        exito = False
+        try:
+            resultado = funcion(*args, **kwargs)
+            exito = True
+            return resultado
+        finally:
+            with self._lock:
+                self._en_ejecucion -= 1
+                if exito:
+                    self._completadas += 1
+                else:
+                    self._fallidas += 1
+
+    def enviar(self, funcion: Callable, *args, **kwargs) -> Future:
+        """
+        Encola una función bloqueante desde código síncrono.
+
+        Returns:
+            Future de concurrent.futures con el resultado
+
+        Raises:
+            ColaEjecutorLlenaError: si ya hay max_cola tareas esperando
+        """
+        with self._lock:
+            if self._en_cola >= self.max_cola:
+                self._rechazadas += 1
+                raise ColaEjecutorLlenaError("La cola de ejecución de ELECTRE III está llena")
+            self._en_cola += 1
+        try:
+            futuro = self._pool.submit(self._envolver, funcion, args, kwargs)
+        except RuntimeError:
+            # El pool ya fue cerrado: la tarea nunca llegó a la cola
+            with self._lock:
+                self._en_cola -= 1
+            raise
+        futuro.add_done_callback(self._descontar_cancelada)
+        return futuro
+
+    def _descontar_cancelada(self, futuro: Future):
+        # Una tarea cancelada antes de empezar nunca pasa por _envolver
+        if futuro.cancelled():
+            with self._lock:
+                self._en_cola -= 1
+
+    async def ejecutar(self, funcion: Callable, *args, **kwargs) -> Any:
+        """
+        Ejecuta una función bloqueante en el pool sin bloquear el event loop.
+
+        Raises:
+            ColaEjecutorLlenaError: si ya hay max_cola tareas esperando
+        """
+        return await asyncio.wrap_future(self.enviar(funcion, *args, **kwargs))
+
+    async def ejecutar_cancelable(self, desconectado: Callable[[], Awaitable[bool]],
+                                  funcion: Callable, *args, **kwargs) -> Any:
+        """
+        Como ejecutar, pero la función recibe un threading.Event en el argumento `cancelacion`
+        que se activa si el cliente se desconecta (ver esperar_o_cancelar).
+
+        Args:
+            desconectado: función asíncrona que indica si el cliente se fue (request.is_disconnected)
+
+        Raises:
+            ColaEjecutorLlenaError: si ya hay max_cola tareas esperando
+            EjecucionCanceladaError: si el cliente se desconectó
+        """
+        cancelacion = threading.Event()
+        futuro = self.enviar(funcion, *args, cancelacion=cancelacion, **kwargs)
+        return await esperar_o_cancelar(asyncio.wrap_future(futuro), desconectado, cancelacion, futuro)
+
+    def estado(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "max_hilos": self.max_hilos,
+                "max_cola": self.max_cola,
+                "en_cola": self._en_cola,
+                "en_ejecucion": self._en_ejecucion,
+                "completadas": self._completadas,
+                "fallidas": self._fallidas,
+                "rechazadas": self._rechazadas,
+            }
+
+
+ejecutor_electre = EjecutorElectre(
+    max_hilos=settings.ELECTRE_EJECUTOR_HILOS,
+    max_cola=settings.ELECTRE_EJECUTOR_MAX_COLA,
+)
@@ -1,43 +1,282 @@
 import pandas as pd
 import numpy as np
+import logging
 import tempfile
 import re
 import os
 import ctypes
-import platform
+import threading
 from contextlib import contextmanager
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Tuple
+from typing import BinaryIO, List, Optional, Dict, Tuple
 from contextlib import contextmanager
 from app.core.config import settings
+from app.utils.electreIII_numpy import (
+    METODO_DESTILACION,
+    METODO_FLUJO_NETO,
+    barrido_lambda,
+    calcular_matriz_credibilidad,
+    ejecutar_electre3_numpy,
+    ejecutar_electre3_numpy_combinado,
+    ejecutar_electre3_numpy_flujo_neto_puntajes,
+    explotar,
+    ordenar_ranking,
+    preparar_datos_electre3,
+)
+from app.utils.electreIII_libreria import registro_electre
+from app.utils.electreIII_procesos import pool_procesos_electre
+from app.utils.electreIII_cache import cache_resultados_electre
+from app.utils.electreIII_csv import parsear_csv_electre
+from app.utils.electreIII_escenario import EscenarioElectre, cargar_escenario_electre
+from app.utils.electreIII_incremental import estados_credibilidad
+from app.utils.electreIII_robustez import analizador_robustez
+from app.utils.ejecutor_electre import verificar_cancelacion
 
 from app.models import Alternativa, Criterio, Evaluacion, Escenario
 
+logger = logging.getLogger(__name__)
+
+# Motores de cálculo disponibles para ELECTRE III
+MOTOR_DLL = "dll"
+MOTOR_NUMPY = "numpy"
+MOTOR_BINARIO = "binario"
+MOTORES_ELECTRE = (MOTOR_DLL, MOTOR_NUMPY, MOTOR_BINARIO)
+
+# Códigos de error de ElectreIIIExplotarBinario (app/dll/shim/electre_binario.c)
+ERRORES_SHIM_BINARIO = {
+    -1: "argumentos inválidos",
+    -2: "memoria insuficiente",
+    -3: "la librería no retornó resultado",
+    -4: "resultado de la librería con formato inesperado",
+}
+
 def cargar_dll_electre():
     """
-    Carga la librería ELECTRE III de forma compatible con Windows y Linux.
+    Obtiene la librería ELECTRE III cargada una sola vez por proceso (ver electreIII_libreria).
     
     Returns:
         ctypes.CDLL: Instancia de la librería cargada
     """
-    if platform.system() == 'Windows':
-        # En Windows, añadir el directorio de DLLs al path de búsqueda
-        os.add_dll_directory(settings.DEBUGGER_PATH)
-    
-    # Cargar la librería (.dll en Windows, .so en Linux)
-    dll = ctypes.CDLL(settings.DLL_PATH)
-    return dll
+    return registro_electre.cargar()
+
+def resolver_motor_electre(motor: Optional[str] = None) -> str:
+    """
+    Determina el motor de ELECTRE III a utilizar.
+
+    Args:
+        motor: motor solicitado en la petición ('dll', 'numpy' o 'binario'); si es None se usa settings.ELECTRE_MOTOR
+
+    Returns:
+        Nombre del motor normalizado
+    """
+    motor = (motor or settings.ELECTRE_MOTOR).strip().lower()
+    if motor not in MOTORES_ELECTRE:
+        raise ValueError(f"Motor ELECTRE III desconocido: {motor}. Opciones: {', '.join(MOTORES_ELECTRE)}")
+    return motor
+
+def ejecutar_electre3_binario(alternativas_matriz, pesos, preferencia, indiferencia, veto,
+                              direccion, lambda_corte, nombres_alternativas=None,
+                              metodo: str = METODO_FLUJO_NETO) -> List[str]:
+    """
+    Ejecuta ELECTRE III con la librería nativa pasando buffers float64 sin formatear texto en Python.
+
+    Args:
+        alternativas_matriz: matriz de alternativas (lista de listas o np.ndarray)
+        pesos, preferencia, indiferencia, veto, direccion: parámetros por criterio
+        lambda_corte: valor de corte lambda
+        nombres_alternativas: nombres de las alternativas (por defecto A1, A2, ...)
+        metodo: METODO_FLUJO_NETO o METODO_DESTILACION
+
+    Returns:
+        Lista de alternativas ordenadas (empates por posición, ver ordenar_ranking)
+    """
+    matriz, w, p, q, v, _ = preparar_datos_electre3(
+        alternativas_matriz, pesos, preferencia, indiferencia, veto, direccion
+    )
+    d = np.ascontiguousarray(direccion, dtype=np.float64)
+    num_alternativas, num_criterios = matriz.shape
+    if not nombres_alternativas:
+        nombres_alternativas = [f"A{i+1}" for i in range(num_alternativas)]
+
+    puntero_double = ctypes.POINTER(ctypes.c_double)
+    valores = np.zeros(num_alternativas, dtype=np.float64)
+    orden = np.zeros(num_alternativas, dtype=np.intc)
+    estado = registro_electre.explotar_binario(
+        metodo, num_alternativas, num_criterios, lambda_corte,
+        matriz.ctypes.data_as(puntero_double), w.ctypes.data_as(puntero_double),
+        p.ctypes.data_as(puntero_double), q.ctypes.data_as(puntero_double),
+        v.ctypes.data_as(puntero_double), d.ctypes.data_as(puntero_double),
+        valores.ctypes.data_as(puntero_double), orden.ctypes.data_as(ctypes.POINTER(ctypes.c_int))
+    )
+    if estado != 0:
+        raise RuntimeError(f"Error en la interfaz binaria de ELECTRE III: {ERRORES_SHIM_BINARIO.get(estado, estado)}")
+
+    # Empates por posición en la matriz, igual que el resto de los motores
+    return ordenar_ranking(nombres_alternativas, valores, metodo)
+
+def crear_texto_electre3(alternativas_matriz, pesos, preferencia, indiferencia, veto, direccion,
+                         nombres_alternativas=None) -> str:
+    """
+    Arma en memoria la cadena que espera la librería (mismo formato que el CSV temporal con ':' entre filas).
+
+    Returns:
+        Cadena lista para ElectreIIIExplotarFlujoNeto / ElectreIIIExplotarDestilacion
+    """
+    matriz = np.asarray(alternativas_matriz, dtype=np.float64)
+    num_alternativas, num_criterios = matriz.shape
+    if not nombres_alternativas:
+        nombres_alternativas = [f"A{i+1}" for i in range(num_alternativas)]
+
+    def fila(etiqueta, valores):
+        return etiqueta + ''.join(f",{float(valor)!r}" for valor in valores) + ';'
+
+    filas = ['-' + ''.join(f",C{j+1}" for j in range(num_criterios)) + ';']
+    filas.extend(fila(nombre, matriz[i]) for i, nombre in enumerate(nombres_alternativas))
+    filas.append(fila('W', pesos))
+    filas.append(fila('P', preferencia))
+    filas.append(fila('I', indiferencia))
+    filas.append(fila('V', veto))
+    filas.append('D' + ''.join(f",{int(valor)}" for valor in direccion) + ';')
+    return ':'.join(filas) + ':'
+
+def ejecutar_electre3_local(motor: str, alternativas_matriz, pesos, preferencia, indiferencia,
+                            veto, direccion, lambda_corte, nombres_alternativas=None,
+                            metodo: str = METODO_FLUJO_NETO) -> List[str]:
+    """
+    Ejecuta ELECTRE III en el proceso actual sin archivos temporales con cualquiera de los motores.
+
+    Returns:
+        Lista de alternativas ordenadas
+    """
+    if motor == MOTOR_NUMPY:
+        return ejecutar_electre3_numpy(alternativas_matriz, pesos, preferencia, indiferencia, veto,
+                                       direccion, lambda_corte, nombres_alternativas, metodo,
+                                       presupuesto_bytes=settings.ELECTRE_MEMORIA_MAXIMA_MB * 1024 * 1024,
+                                       directorio_memmap=settings.ELECTRE_DIRECTORIO_MEMMAP)
+    if motor == MOTOR_BINARIO:
+        return ejecutar_electre3_binario(alternativas_matriz, pesos, preferencia, indiferencia, veto,
+                                         direccion, lambda_corte, nombres_alternativas, metodo)
+    if motor == MOTOR_DLL:
+        num_alternativas, num_criterios = np.shape(alternativas_matriz)
+        csv_content = crear_texto_electre3(alternativas_matriz, pesos, preferencia, indiferencia,
+                                           veto, direccion, nombres_alternativas)
+        resultado = registro_electre.explotar(metodo, num_alternativas, num_criterios,
+                                              lambda_corte, csv_content.encode('utf-8'))
+        if not resultado:
+            raise RuntimeError("La DLL no retornó resultado")
+        if metodo == METODO_FLUJO_NETO:
+            return interpretar_resultado_flujo_neto(resultado.decode('utf-8'), nombres_alternativas)
+        return interpretar_resultado_destilacion(resultado.decode('utf-8'), nombres_alternativas)
+    raise ValueError(f"Motor ELECTRE III desconocido: {motor}")
+
+def usar_memoria(motor: str) -> bool:
+    """
+    Indica si la ejecución evita el camino de archivos temporales: motores en memoria o pool de procesos activo.
+    """
+    return motor != MOTOR_DLL or pool_procesos_electre.activo
+
+def ejecutar_electre3_en_memoria(motor: str, alternativas_matriz, pesos, preferencia, indiferencia,
+                                 veto, direccion, lambda_corte, nombres_alternativas=None,
+                                 metodo: str = METODO_FLUJO_NETO,
+                                 cancelacion: Optional[threading.Event] = None) -> List[str]:
+    """
+    Ejecuta ELECTRE III sin archivos temporales. Si settings.ELECTRE_PROCESOS > 0 la llamada
+    se hace en un proceso aislado del pool (una caída de la librería no tumba la API).
+
+    Args:
+        cancelacion: evento que, al activarse, termina el proceso del pool que ejecuta la llamada
+
+    Returns:
+        Lista de alternativas ordenadas
+    """
+    verificar_cancelacion(cancelacion)
+    if pool_procesos_electre.activo:
+        return pool_procesos_electre.ejecutar(motor, alternativas_matriz, pesos, preferencia,
+                                              indiferencia, veto, direccion, lambda_corte,
+                                              nombres_alternativas, metodo, cancelacion=cancelacion)
+    return ejecutar_electre3_local(motor, alternativas_matriz, pesos, preferencia, indiferencia,
+                                   veto, direccion, lambda_corte, nombres_alternativas, metodo)
+
+def clave_cache_datos(datos: Dict, metodo: str, motor: str) -> str:
+    """
+    Clave de la caché de resultados para los datos de obtener_datos_escenario_para_electre.
+    """
+    return cache_resultados_electre.clave(
+        datos['matriz_decision'], datos['nombres_alternativas'], datos['pesos'], datos['preferencia'],
+        datos['indiferencia'], datos['veto'], datos['direccion'], datos['corte'], metodo, motor
+    )
+
+def ejecutar_electre3_desde_datos(datos: Dict, metodo: str, motor: str,
+                                  escenario_id: Optional[int] = None,
+                                  cancelacion: Optional[threading.Event] = None) -> List[str]:
+    """
+    Ejecuta ELECTRE III en memoria sobre los datos de obtener_datos_escenario_para_electre.
+
+    Args:
+        datos: diccionario con los datos del escenario
+        metodo: METODO_FLUJO_NETO o METODO_DESTILACION
+        motor: 'dll', 'numpy' o 'binario'
+        escenario_id: con el motor 'numpy', usa la credibilidad incremental guardada del escenario
+        cancelacion: evento de cancelación (ver ejecutar_electre3_en_memoria)
+
+    Returns:
+        Lista de alternativas ordenadas
+    """
+    credibilidad = None
+    if motor == MOTOR_NUMPY and escenario_id is not None:
+        credibilidad = estados_credibilidad.obtener_credibilidad(escenario_id, datos)
+
+    if credibilidad is not None:
+        resultado_alternativas = ordenar_ranking(
+            datos['nombres_alternativas'], explotar(credibilidad, datos['corte'], metodo), metodo
+        )
+    else:
+        resultado_alternativas = ejecutar_electre3_en_memoria(
+            motor, datos['matriz_decision'], datos['pesos'], datos['preferencia'],
+            datos['indiferencia'], datos['veto'], datos['direccion'],
+            datos['corte'], datos['nombres_alternativas'], metodo, cancelacion=cancelacion
+        )
+    logger.debug("Alternativas ordenadas por ELECTRE III (%s, %s): %s", motor, metodo, resultado_alternativas)
+    return resultado_alternativas
+
+def _ordenar_por_posicion(pares, nombres_alternativas, metodo) -> Optional[List[str]]:
+    """
+    Reordena los pares (nombre, valor) de la librería con ordenar_ranking, de modo que los
+    empates queden por posición en la matriz como en los motores numpy y binario.
 
-def interpretar_resultado_flujo_neto(resultado):
+    Returns:
+        Lista ordenada o None si los nombres no identifican a cada alternativa de forma única
+    """
+    if not nombres_alternativas:
+        nombres_alternativas = [f"A{i+1}" for i in range(len(pares))]
+    posiciones = {nombre: i for i, nombre in enumerate(nombres_alternativas)}
+    if len(posiciones) != len(pares) or len(nombres_alternativas) != len(pares):
+        return None
+    valores = np.empty(len(pares), dtype=np.float64)
+    vistos = set()
+    for nombre, valor in pares:
+        if nombre not in posiciones or nombre in vistos:
+            return None
+        vistos.add(nombre)
+        valores[posiciones[nombre]] = float(valor)
+    return ordenar_ranking(list(nombres_alternativas), valores, metodo)
+
+def interpretar_resultado_flujo_neto(resultado, nombres_alternativas=None):
     # Ejemplo: ":A1:1;:B2:0;:C3:-1;"
     pares = re.findall(r":([^:;]+):([-\d\.]+);", resultado)
+    ranking = _ordenar_por_posicion(pares, nombres_alternativas, METODO_FLUJO_NETO)
+    if ranking is not None:
+        return ranking
     # Ordenar por valor de flujo neto (mayor es mejor)
     ranking = sorted(pares, key=lambda x: float(x[1]), reverse=True)
     return [alt for alt, val in ranking]
 
-def interpretar_resultado_destilacion(resultado):
+def interpretar_resultado_destilacion(resultado, nombres_alternativas=None):
     # Ejemplo: "A1:0;B2:1;C3:2;"
     pares = re.findall(r"([^:;]+):(\d+);", resultado)
+    ranking = _ordenar_por_posicion(pares, nombres_alternativas, METODO_DESTILACION)
+    if ranking is not None:
+        return ranking
     # Ordenar por ranking (menor es mejor)
     ranking = sorted(pares, key=lambda x: int(x[1]))
     return [alt for alt, val in ranking]
@@ -107,7 +346,7 @@ def crear_csv_electre3(alternativas_matriz, criterios_nombres, pesos, preferenci
     data.append(['D'] + list(direccion))
     
     # Crear DataFrame
-    columnas = ['-'] + criterios_nombres
+    columnas = ['-'] + list(criterios_nombres)
     df = pd.DataFrame(data, columns=columnas)
     
     # Guardar como CSV con separador de punto y coma
@@ -303,25 +542,115 @@ def ejemplo_uso_con_dll():
     #                                      direccion_hoteles, nombres_hoteles, 0.67)
     print("Función wrapper lista para usar cuando tengas la DLL")
 
-def analisis_sensibilidad_lambda(dll_path, alternativas_matriz, criterios_nombres,
-                                pesos, preferencia, indiferencia, veto, direccion,
-                                nombres_alternativas=None, lambdas=[0.6, 0.67, 0.75]):
+def analisis_sensibilidad_lambda(alternativas_matriz, pesos, preferencia, indiferencia, veto,
+                                direccion, nombres_alternativas=None, lambdas=[0.6, 0.67, 0.75],
+                                metodo: str = METODO_FLUJO_NETO) -> Dict:
     """
     Realiza análisis de sensibilidad con diferentes valores de lambda
+
+    La matriz de credibilidad se calcula una sola vez (motor NumPy, idéntico a la
+    librería) y se explota para todo el vector de lambdas.
+
+    Args:
+        alternativas_matriz: matriz de alternativas (lista de listas o np.ndarray)
+        pesos, preferencia, indiferencia, veto, direccion: parámetros por criterio
+        nombres_alternativas: nombres de las alternativas (por defecto A1, A2, ...)
+        lambdas: valores de corte a evaluar (-1 para el corte automático)
+        metodo: METODO_FLUJO_NETO o METODO_DESTILACION
+
+    Returns:
+        Dict con el ranking de cada lambda y los intervalos de lambda con el mismo ranking
     """
-    resultados = {}
-    
-    for lambda_val in lambdas:
-        print(f"\n--- Analizando con λ = {lambda_val} ---")
-        resultado = ejecutar_electre3_con_dll(dll_path, alternativas_matriz, criterios_nombres,
-                                            pesos, preferencia, indiferencia, veto, direccion,
-                                            nombres_alternativas, lambda_val)
-        if resultado:
-            resultados[lambda_val] = resultado
-    
-    return resultados
+    matriz, w, p, q, v, beneficio = preparar_datos_electre3(
+        alternativas_matriz, pesos, preferencia, indiferencia, veto, direccion
+    )
+    if not nombres_alternativas:
+        nombres_alternativas = [f"A{i+1}" for i in range(matriz.shape[0])]
+
+    lambdas = sorted(set(float(l) for l in lambdas))
+    credibilidad = calcular_matriz_credibilidad(matriz, w, p, q, v, beneficio)
+    evaluaciones = barrido_lambda(credibilidad, lambdas, metodo)
+
+    resultados = []
+    intervalos = []
+    for lambda_val, (valores, desde, hasta) in zip(lambdas, evaluaciones):
+        ranking = ordenar_ranking(nombres_alternativas, valores, metodo)
+        resultados.append({'lambda': lambda_val, 'ranking': ranking})
+        if lambda_val == -1:
+            continue
+
+        # Agrupar lambdas consecutivos que producen el mismo ranking
+        if intervalos and intervalos[-1]['ranking'] == ranking:
+            intervalos[-1]['lambda_max'] = lambda_val
+            intervalos[-1]['valido_hasta'] = hasta
+        else:
+            intervalos.append({
+                'lambda_min': lambda_val,
+                'lambda_max': lambda_val,
+                'valido_desde': desde,
+                'valido_hasta': hasta,
+                'ranking': ranking
+            })
 
-def obtener_datos_escenario_para_electre(db: Session, escenario_id: int) -> Dict:
+    return {
+        'metodo': metodo,
+        'num_lambdas': len(lambdas),
+        'resultados': resultados,
+        'intervalos': intervalos
+    }
+
+def analisis_sensibilidad_lambda_desde_bd(db: Session, escenario_id: int, lambdas: List[float],
+                                         metodo: str = METODO_FLUJO_NETO) -> Dict:
+    """
+    Análisis de sensibilidad de lambda usando los datos de un escenario de la base de datos
+
+    Args:
+        db: Sesión de SQLAlchemy
+        escenario_id: ID del escenario
+        lambdas: valores de corte a evaluar
+        metodo: METODO_FLUJO_NETO o METODO_DESTILACION
+
+    Returns:
+        Dict con el ranking de cada lambda y los intervalos estables
+    """
+    datos = obtener_datos_escenario_para_electre(db, escenario_id)
+    resultado = analisis_sensibilidad_lambda(
+        datos['matriz_decision'], datos['pesos'], datos['preferencia'],
+        datos['indiferencia'], datos['veto'], datos['direccion'],
+        datos['nombres_alternativas'], lambdas, metodo
+    )
+    resultado['escenario_id'] = escenario_id
+    resultado['corte_escenario'] = datos['corte']
+    return resultado
+
+def analisis_robustez_pesos_desde_bd(db: Session, escenario_id: int, metodo: str = METODO_FLUJO_NETO,
+                                     muestras: int = 10000, concentracion: Optional[float] = None,
+                                     perturbacion_umbrales: float = 0.0, muestras_umbrales: int = 1,
+                                     semilla: Optional[int] = None) -> Dict:
+    """
+    Análisis de robustez de pesos (Monte Carlo) usando los datos de un escenario de la base de datos
+
+    Args:
+        db: Sesión de SQLAlchemy
+        escenario_id: ID del escenario
+        metodo: METODO_FLUJO_NETO o METODO_DESTILACION
+        muestras, concentracion, perturbacion_umbrales, muestras_umbrales, semilla:
+            ver AnalizadorRobustez.analizar
+
+    Returns:
+        Dict con la aceptabilidad de rangos y los índices de victoria
+    """
+    datos = obtener_datos_escenario_para_electre(db, escenario_id)
+    resultado = analizador_robustez.analizar(
+        datos['matriz_decision'], datos['pesos'], datos['preferencia'],
+        datos['indiferencia'], datos['veto'], datos['direccion'], datos['corte'],
+        datos['nombres_alternativas'], metodo, muestras, concentracion,
+        perturbacion_umbrales, muestras_umbrales, semilla
+    )
+    resultado['escenario_id'] = escenario_id
+    return resultado
+
+def obtener_datos_escenario_para_electre(db: Session, escenario_id: int) -> EscenarioElectre:
     """
     Obtiene todos los datos necesarios de un escenario para ejecutar ELECTRE III
     
@@ -330,109 +659,9 @@ def obtener_datos_escenario_para_electre(db: Session, escenario_id: int) -> Dict
         escenario_id: ID del escenario a analizar
     
     Returns:
-        Dict con los datos estructurados para ELECTRE III
+        EscenarioElectre inmutable (se lee también como diccionario: datos['matriz_decision'], ...)
     """
-    
-    # Obtener alternativas del escenario
-    alternativas = db.query(Alternativa).filter(
-        Alternativa.escenario_id == escenario_id
-    ).all()
-    
-    # Obtener criterios del escenario
-    criterios = db.query(Criterio).filter(
-        Criterio.escenario_id == escenario_id
-    ).all()
-    
-    # Obtener evaluaciones del escenario
-    evaluaciones = db.query(Evaluacion).filter(
-        Evaluacion.escenario_id == escenario_id
-    ).all()
-    
-    if not alternativas or not criterios or not evaluaciones:
-        raise ValueError(f"No se encontraron datos suficientes para el escenario {escenario_id}")
-    
-    #Obtener corte del escenario si no, colocar -1
-    corte = db.query(Escenario).filter(Escenario.id == escenario_id).first().corte
-    if corte is None:
-        corte = -1
-
-    # Crear diccionario de evaluaciones para acceso rápido
-    eval_dict = {}
-    for eval in evaluaciones:
-        key = (eval.alternativa_id, eval.criterio_id)
-        eval_dict[key] = eval.value
-    
-    # Construir matriz de decisión
-    matriz_decision = []
-    nombres_alternativas = []
-    
-    for alternativa in alternativas:
-        fila = []
-        nombres_alternativas.append(alternativa.name)
-        
-        for criterio in criterios:
-            key = (alternativa.id, criterio.id)
-            if key in eval_dict:
-                fila.append(eval_dict[key])
-            else:
-                raise ValueError(f"Falta evaluación para alternativa {alternativa.name} y criterio {criterio.name}")
-        
-        matriz_decision.append(fila)
-    
-    # Extraer información de criterios
-    nombres_criterios = [criterio.name for criterio in criterios]
-    pesos = [criterio.weight for criterio in criterios]
-    
-    # Umbrales ELECTRE III (usar valores por defecto si no están definidos)
-    preferencia = []
-    indiferencia = []
-    veto = []
-    direccion = []
-    
-    for criterio in criterios:
-        # Umbral de preferencia
-        if criterio.preference_threshold is not None:
-            preferencia.append(criterio.preference_threshold)
-        else:
-            # Valor por defecto: 10% del rango de valores para este criterio
-            valores_criterio = [eval_dict[(alt.id, criterio.id)] for alt in alternativas]
-            rango = max(valores_criterio) - min(valores_criterio)
-            preferencia.append(rango * 0.1)
-        
-        # Umbral de indiferencia
-        if criterio.indifference_threshold is not None:
-            indiferencia.append(criterio.indifference_threshold)
-        else:
-            # Valor por defecto: 5% del rango
-            valores_criterio = [eval_dict[(alt.id, criterio.id)] for alt in alternativas]
-            rango = max(valores_criterio) - min(valores_criterio)
-            indiferencia.append(rango * 0.05)
-        
-        # Umbral de veto
-        if criterio.veto_threshold is not None:
-            veto.append(criterio.veto_threshold)
-        else:
-            # Valor por defecto: 50% del rango
-            valores_criterio = [eval_dict[(alt.id, criterio.id)] for alt in alternativas]
-            rango = max(valores_criterio) - min(valores_criterio)
-            veto.append(rango * 0.5)
-        
-        # Dirección (1 para beneficio, 0 para costo)
-        direccion.append(1 if criterio.is_benefit else 0)
-    
-    return {
-        'matriz_decision': np.array(matriz_decision),
-        'nombres_alternativas': nombres_alternativas,
-        'nombres_criterios': nombres_criterios,
-        'pesos': pesos,
-        'preferencia': preferencia,
-        'indiferencia': indiferencia,
-        'veto': veto,
-        'direccion': direccion,
-        'alternativas_obj': alternativas,
-        'criterios_obj': criterios,
-        'corte' : corte
-    }
+    return cargar_escenario_electre(db, escenario_id)
 
 def crear_csv_electre3_desde_bd(db: Session, escenario_id: int, 
                                nombre_archivo: str = "electre3_bd.csv") -> pd.DataFrame:
@@ -521,7 +750,8 @@ def csv_temporal_electre3_desde_bd(db: Session, escenario_id: int):
         except OSError:
             print(f"No se pudo eliminar el archivo temporal: {archivo_temporal}")
 
-def ejecutar_electre3_desde_bd_flujo_neto(db: Session, escenario_id: int) -> Optional[str]:
+def ejecutar_electre3_desde_bd_flujo_neto(db: Session, escenario_id: int,
+                                          motor: Optional[str] = None) -> Optional[str]:
     """
     Ejecuta ELECTRE III usando datos directamente de la base de datos
     
@@ -530,60 +760,63 @@ def ejecutar_electre3_desde_bd_flujo_neto(db: Session, escenario_id: int) -> Opt
         escenario_id: ID del escenario
         dll_path: Ruta a la DLL de ELECTRE III
         lambda_corte: Valor de corte lambda
+        motor: Motor de cálculo ('dll', 'numpy' o 'binario'); por defecto settings.ELECTRE_MOTOR
         Usando el flujo Neto
     Returns:
         Resultado del análisis ELECTRE III o None si hay error
     """
     try:
-        import ctypes
-        
-        # Cargar la DLL (compatible Windows/Linux)
-        dll = cargar_dll_electre()
-
-        dll.ElectreIIIExplotarFlujoNeto.argtypes = [ctypes.c_long, ctypes.c_long, ctypes.c_double, ctypes.c_char_p]
-        dll.ElectreIIIExplotarFlujoNeto.restype = ctypes.c_char_p
-        # Obtener datos del escenario para contar alternativas y criterios
+        motor = resolver_motor_electre(motor)
         datos = obtener_datos_escenario_para_electre(db, escenario_id)
+        clave_cache = clave_cache_datos(datos, METODO_FLUJO_NETO, motor)
+        en_cache = cache_resultados_electre.obtener(clave_cache)
+        if en_cache is not None:
+            logger.debug("Resultado de ELECTRE III para escenario %s obtenido de la caché", escenario_id)
+            return en_cache
+        if usar_memoria(motor):
+            return cache_resultados_electre.guardar(
+                clave_cache, ejecutar_electre3_desde_datos(datos, motor=motor, metodo=METODO_FLUJO_NETO, escenario_id=escenario_id)
+            )
+
+        # Contar alternativas y criterios del escenario
         num_alternativas = len(datos['nombres_alternativas'])
         num_criterios = len(datos['nombres_criterios'])
         print(f"Escenario {escenario_id} tiene {num_alternativas} alternativas y {num_criterios} criterios")
-        # Usar archivo temporal desde la BD
-        with csv_temporal_electre3_desde_bd(db, escenario_id) as archivo_csv:
-            
-            print(f"Ejecutando ELECTRE III para escenario {escenario_id} con λ = {datos['corte']}")
-            # Leer el contenido del archivo CSV y reemplazar saltos de línea por ':'
-            with open(archivo_csv, 'r', encoding='utf-8') as f:
-                csv_content = f.read().replace('\n', ':')
-
-            # Llamar a la función DLL pasando la cadena en vez del archivo
-            resultado = dll.ElectreIIIExplotarFlujoNeto(
-                ctypes.c_long(num_alternativas),
-                ctypes.c_long(num_criterios),
-                ctypes.c_double(datos['corte']),
-                csv_content.encode('utf-8')
-            )
+        print(f"Ejecutando ELECTRE III para escenario {escenario_id} con λ = {datos['corte']}")
+        # Armar el texto para la DLL con los datos ya cargados (sin volver a consultar la BD)
+        csv_content = crear_texto_electre3(
+            datos['matriz_decision'], datos['pesos'], datos['preferencia'], datos['indiferencia'],
+            datos['veto'], datos['direccion'], datos['nombres_alternativas']
+        )
+        # Llamar a la función DLL pasando la cadena en vez del archivo
+        resultado = registro_electre.explotar(
+            METODO_FLUJO_NETO,
+            num_alternativas,
+            num_criterios,
+            datos['corte'],
+            csv_content.encode('utf-8')
+        )
 
-            
-            if resultado:
-                resultado_str = resultado.decode('utf-8')
-                print("Resultado ELECTRE III:")
-                print(resultado_str)
-                resultado_alternativas = interpretar_resultado_flujo_neto(resultado_str)
-                print("Alternativas ordenadas por ELECTRE III:")
-                print(resultado_alternativas)
+        if resultado:
+            resultado_str = resultado.decode('utf-8')
+            print("Resultado ELECTRE III:")
+            print(resultado_str)
+            resultado_alternativas = interpretar_resultado_flujo_neto(resultado_str, datos['nombres_alternativas'])
+            print("Alternativas ordenadas por ELECTRE III:")
+            print(resultado_alternativas)
+
+            return cache_resultados_electre.guardar(clave_cache, resultado_alternativas)
+        else:
+            print("La DLL no retornó resultado")
+            return None
 
-                return resultado_alternativas
-            else:
-                print("La DLL no retornó resultado")
-                return None
-                
     except Exception as e:
         print(f"Error al ejecutar ELECTRE III desde BD: {e}")
         return None
 
 
 def ejecutar_electre3_desde_bd_destilacion(db: Session, escenario_id: int,
-                              ) -> Optional[str]:
+                                           motor: Optional[str] = None) -> Optional[str]:
     """
     Ejecuta ELECTRE III usando datos directamente de la base de datos
     
@@ -592,60 +825,96 @@ def ejecutar_electre3_desde_bd_destilacion(db: Session, escenario_id: int,
         escenario_id: ID del escenario
         dll_path: Ruta a la DLL de ELECTRE III
         lambda_corte: Valor de corte lambda
+        motor: Motor de cálculo ('dll', 'numpy' o 'binario'); por defecto settings.ELECTRE_MOTOR
         Usando el flujo Neto
     Returns:
         Resultado del análisis ELECTRE III o None si hay error
     """
     try:
-        import ctypes
-        
-        # Cargar la DLL (compatible Windows/Linux)
-        dll = cargar_dll_electre()
-
-        dll.ElectreIIIExplotarDestilacion.argtypes = [ctypes.c_long, ctypes.c_long, ctypes.c_double, ctypes.c_char_p]
-        dll.ElectreIIIExplotarDestilacion.restype = ctypes.c_char_p
-        # Obtener datos del escenario para contar alternativas y criterios
+        motor = resolver_motor_electre(motor)
         datos = obtener_datos_escenario_para_electre(db, escenario_id)
+        clave_cache = clave_cache_datos(datos, METODO_DESTILACION, motor)
+        en_cache = cache_resultados_electre.obtener(clave_cache)
+        if en_cache is not None:
+            logger.debug("Resultado de ELECTRE III para escenario %s obtenido de la caché", escenario_id)
+            return en_cache
+        if usar_memoria(motor):
+            return cache_resultados_electre.guardar(
+                clave_cache, ejecutar_electre3_desde_datos(datos, motor=motor, metodo=METODO_DESTILACION, escenario_id=escenario_id)
+            )
+
+        # Contar alternativas y criterios del escenario
         num_alternativas = len(datos['nombres_alternativas'])
         num_criterios = len(datos['nombres_criterios'])
         print(f"Escenario {escenario_id} tiene {num_alternativas} alternativas y {num_criterios} criterios")
-        # Usar archivo temporal desde la BD
-        with csv_temporal_electre3_desde_bd(db, escenario_id) as archivo_csv:
-            
-            print(f"Ejecutando ELECTRE III para escenario {escenario_id} con λ = {datos['corte']}")
-            # Leer el contenido del archivo CSV y reemplazar saltos de línea por ':'
-            with open(archivo_csv, 'r', encoding='utf-8') as f:
-                csv_content = f.read().replace('\n', ':')
-            print("CSV que se enviará a la DLL:")
-            print(csv_content)
-            print("num_alternativas:", num_alternativas)
-            print("num_criterios:", num_criterios)
-            # Llamar a la función DLL pasando la cadena en vez del archivo
-            resultado = dll.ElectreIIIExplotarDestilacion(
-                ctypes.c_long(num_alternativas),
-                ctypes.c_long(num_criterios),
-                ctypes.c_double(datos['corte']),
-                csv_content.encode('utf-8')
-            )
+        print(f"Ejecutando ELECTRE III para escenario {escenario_id} con λ = {datos['corte']}")
+        # Armar el texto para la DLL con los datos ya cargados (sin volver a consultar la BD)
+        csv_content = crear_texto_electre3(
+            datos['matriz_decision'], datos['pesos'], datos['preferencia'], datos['indiferencia'],
+            datos['veto'], datos['direccion'], datos['nombres_alternativas']
+        )
+        # Llamar a la función DLL pasando la cadena en vez del archivo
+        resultado = registro_electre.explotar(
+            METODO_DESTILACION,
+            num_alternativas,
+            num_criterios,
+            datos['corte'],
+            csv_content.encode('utf-8')
+        )
 
-            
-            if resultado:
-                resultado_str = resultado.decode('utf-8')
-                print("Resultado ELECTRE III:")
-                print(resultado_str)
-                # Interpretar el resultado
-                resultado_alternativas = interpretar_resultado_destilacion(resultado_str)
-                print("Alternativas ordenadas por ELECTRE III:")
-                print(resultado_alternativas)
+        if resultado:
+            resultado_str = resultado.decode('utf-8')
+            print("Resultado ELECTRE III:")
+            print(resultado_str)
+            # Interpretar el resultado
+            resultado_alternativas = interpretar_resultado_destilacion(resultado_str, datos['nombres_alternativas'])
+            print("Alternativas ordenadas por ELECTRE III:")
+            print(resultado_alternativas)
+
+            return cache_resultados_electre.guardar(clave_cache, resultado_alternativas)
+        else:
+            print("La DLL no retornó resultado")
+            return None
 
-                return resultado_alternativas
-            else:
-                print("La DLL no retornó resultado")
-                return None
-                
     except Exception as e:
         print(f"Error al ejecutar ELECTRE III desde BD: {e}")
         return None
+def ejecutar_electre3_desde_bd_combinado(db: Optional[Session], escenario_id: int,
+                                         datos: Optional[EscenarioElectre] = None) -> Optional[Dict]:
+    """
+    Ejecuta flujo neto y destilación sobre una sola matriz de credibilidad del escenario.
+
+    El escenario se carga una sola vez (o se reutilizan los datos recibidos) y la
+    matriz de credibilidad se calcula una sola vez con el motor NumPy, que da los
+    mismos valores que la librería nativa. No usa el estado incremental de
+    estados_credibilidad: los reportes rankean muchos escenarios en paralelo y así no
+    se serializan entre sí ni desalojan los estados de los escenarios que se están
+    editando. Ambos rankings quedan en la caché de resultados del motor 'numpy'.
+
+    Args:
+        db: Sesión de SQLAlchemy (no se usa si se reciben los datos)
+        escenario_id: ID del escenario
+        datos: datos ya obtenidos con obtener_datos_escenario_para_electre (opcional)
+
+    Returns:
+        Dict con 'flujo_neto', 'destilacion', 'puntajes' y 'concordancia', o None si hay error
+    """
+    try:
+        if datos is None:
+            datos = obtener_datos_escenario_para_electre(db, escenario_id)
+        resultado = ejecutar_electre3_numpy_combinado(
+            datos['matriz_decision'], datos['pesos'], datos['preferencia'],
+            datos['indiferencia'], datos['veto'], datos['direccion'],
+            datos['corte'], datos['nombres_alternativas']
+        )
+        for metodo in (METODO_FLUJO_NETO, METODO_DESTILACION):
+            cache_resultados_electre.guardar(clave_cache_datos(datos, metodo, MOTOR_NUMPY), resultado[metodo])
+        logger.debug("ELECTRE III combinado para escenario %s: concordancia %s", escenario_id, resultado['concordancia'])
+        return resultado
+    except Exception as e:
+        logger.error("Error al ejecutar ELECTRE III combinado desde BD: %s", e)
+        return None
+
 def analizar_consistencia_datos(db: Session, escenario_id: int) -> Dict:
     """
     Analiza la consistencia de los datos antes de ejecutar ELECTRE III
@@ -689,7 +958,7 @@ def analizar_consistencia_datos(db: Session, escenario_id: int) -> Dict:
                 'indiferencia': datos['indiferencia'][i],
                 'veto': datos['veto'][i],
                 'direccion': 'beneficio' if datos['direccion'][i] == 1 else 'costo',
-                'umbral_coherente': datos['indiferencia'][i] <= datos['preferencia'][i] <= datos['veto'][i]
+                'umbral_coherente': bool(datos['indiferencia'][i] <= datos['preferencia'][i] <= datos['veto'][i])
             }
         
         return {
@@ -762,10 +1031,11 @@ def ejecutar_electre3_desde_argumentos_flujo_neto(
     veto,
     direccion,
     lambda_corte,
-    nombres_alternativas=None
+    nombres_alternativas=None,
+    motor=None
 ) -> Optional[str]:
     """
-    Ejecuta ELECTRE III usando la DLL, recibiendo todos los datos como argumentos.
+    Ejecuta ELECTRE III con el motor elegido, recibiendo todos los datos como argumentos.
 
     Args:
         alternativas_matriz: matriz de alternativas (lista de listas o np.ndarray)
@@ -777,62 +1047,57 @@ def ejecutar_electre3_desde_argumentos_flujo_neto(
         direccion: lista de dirección (1=beneficio, 0=costo)
         lambda_corte: valor de corte lambda
         nombres_alternativas: lista de nombres de alternativas (opcional)
+        motor: motor de cálculo ('dll', 'numpy' o 'binario'); por defecto settings.ELECTRE_MOTOR
 
     Returns:
         Resultado del análisis ELECTRE III o None si hay error
     """
     try:
-        import ctypes
-        import os
-
-        # Cargar la DLL (compatible Windows/Linux)
-        dll = cargar_dll_electre()
-
-        dll.ElectreIIIExplotarFlujoNeto.argtypes = [
-            ctypes.c_long, ctypes.c_long, ctypes.c_double, ctypes.c_char_p
-        ]
-        dll.ElectreIIIExplotarFlujoNeto.restype = ctypes.c_char_p
-
-        num_alternativas = len(alternativas_matriz)
-        num_criterios = len(criterios_nombres)
-        
-        # Crear archivo CSV temporal con los datos recibidos
-        with csv_temporal_electre3(
-            alternativas_matriz, criterios_nombres, pesos,
-            preferencia, indiferencia, veto, direccion, nombres_alternativas
-        ) as archivo_csv:
-
-            # Leer el contenido del archivo CSV y reemplazar saltos de línea por ':'
-            with open(archivo_csv, 'r', encoding='utf-8') as f:
-                csv_content = f.read().replace('\n', ':')
-
-            print("CSV que se enviará a la DLL:")
-            print(csv_content)
-            print("num_alternativas:", num_alternativas)
-            print("num_criterios:", num_criterios)
-            # Llamar a la función DLL pasando la cadena en vez del archivo
-            resultado = dll.ElectreIIIExplotarFlujoNeto(
-                ctypes.c_long(num_alternativas),
-                ctypes.c_long(num_criterios),
-                ctypes.c_double(lambda_corte),
-                csv_content.encode('utf-8')
-            )
-
-            if resultado:
-                resultado_str = resultado.decode('utf-8')
-                resultado_alternativas = interpretar_resultado_flujo_neto(resultado_str)
-                print("Alternativas ordenadas por ELECTRE III:")
-                print(resultado_alternativas)
+        motor = resolver_motor_electre(motor)
+        clave_cache = cache_resultados_electre.clave(
+            alternativas_matriz, nombres_alternativas, pesos, preferencia, indiferencia, veto,
+            direccion, lambda_corte, METODO_FLUJO_NETO, motor
+        )
+        en_cache = cache_resultados_electre.obtener(clave_cache)
+        if en_cache is not None:
+            logger.debug("Resultado de ELECTRE III obtenido de la caché")
+            return en_cache
+        # Con la DLL el texto se arma en memoria (crear_texto_electre3), sin archivo temporal
+        resultado_alternativas = ejecutar_electre3_en_memoria(
+            motor, alternativas_matriz, pesos, preferencia, indiferencia, veto,
+            direccion, lambda_corte, nombres_alternativas, METODO_FLUJO_NETO
+        )
+        logger.debug("Alternativas ordenadas por ELECTRE III (%s): %s", motor, resultado_alternativas)
+        return cache_resultados_electre.guardar(clave_cache, resultado_alternativas)
+    except Exception as e:
+        logger.error("Error al ejecutar ELECTRE III desde argumentos (%s): %s", METODO_FLUJO_NETO, e)
+        return None
+    
+def ejecutar_electre3_flujo_neto_con_puntajes(alternativas_matriz, pesos, preferencia, indiferencia,
+                                              veto, direccion, lambda_corte,
+                                              nombres_alternativas=None) -> Optional[Dict]:
+    """
+    Ejecuta ELECTRE III con flujo neto devolviendo también el flujo de cada alternativa.
 
-                return resultado_alternativas
-            else:
-                print("La DLL no retornó resultado")
-                return None
+    Usa el motor NumPy acumulando sumas por filas y columnas bloque a bloque, sin
+    construir la matriz de credibilidad completa: la memoria crece linealmente con
+    el número de alternativas.
 
+    Returns:
+        Dict con 'ranking' y 'puntajes', o None si hay error
+    """
+    try:
+        resultado = ejecutar_electre3_numpy_flujo_neto_puntajes(
+            alternativas_matriz, pesos, preferencia, indiferencia, veto, direccion,
+            lambda_corte, nombres_alternativas,
+            presupuesto_bytes=settings.ELECTRE_MEMORIA_MAXIMA_MB * 1024 * 1024
+        )
+        logger.debug("Alternativas ordenadas por ELECTRE III (flujo neto por bloques): %s", resultado['ranking'])
+        return resultado
     except Exception as e:
-        print(f"Error al ejecutar ELECTRE III desde argumentos: {e}")
+        logger.error("Error al ejecutar ELECTRE III con puntajes: %s", e)
         return None
-    
+
 def ejecutar_electre3_desde_argumentos_destilacion(
     alternativas_matriz,
     criterios_nombres,
@@ -842,10 +1107,11 @@ def ejecutar_electre3_desde_argumentos_destilacion(
     veto,
     direccion,
     lambda_corte,
-    nombres_alternativas=None
+    nombres_alternativas=None,
+    motor=None
 ) -> Optional[str]:
     """
-    Ejecuta ELECTRE III usando la DLL, recibiendo todos los datos como argumentos.
+    Ejecuta ELECTRE III con el motor elegido, recibiendo todos los datos como argumentos.
 
     Args:
         alternativas_matriz: matriz de alternativas (lista de listas o np.ndarray)
@@ -857,361 +1123,98 @@ def ejecutar_electre3_desde_argumentos_destilacion(
         direccion: lista de dirección (1=beneficio, 0=costo)
         lambda_corte: valor de corte lambda
         nombres_alternativas: lista de nombres de alternativas (opcional)
+        motor: motor de cálculo ('dll', 'numpy' o 'binario'); por defecto settings.ELECTRE_MOTOR
 
     Returns:
         Resultado del análisis ELECTRE III o None si hay error
     """
     try:
-        import ctypes
-        import os
-
-        # Cargar la DLL (compatible Windows/Linux)
-        dll = cargar_dll_electre()
-
-        dll.ElectreIIIExplotarDestilacion.argtypes = [
-            ctypes.c_long, ctypes.c_long, ctypes.c_double, ctypes.c_char_p
-        ]
-        dll.ElectreIIIExplotarDestilacion.restype = ctypes.c_char_p
-
-        num_alternativas = len(alternativas_matriz)
-        num_criterios = len(criterios_nombres)
-        print (f"Ejecutando ELECTRE III con {num_alternativas} alternativas y {num_criterios} criterios")
-
-        # Crear archivo CSV temporal con los datos recibidos
-        with csv_temporal_electre3(
-            alternativas_matriz, criterios_nombres, pesos,
-            preferencia, indiferencia, veto, direccion, nombres_alternativas
-        ) as archivo_csv:
-
-            # Leer el contenido del archivo CSV y reemplazar saltos de línea por ':'
-            with open(archivo_csv, 'r', encoding='utf-8') as f:
-                csv_content = f.read().replace('\n', ':')
-            print("CSV que se enviará a la DLL:")
-            print(csv_content)
-            print("num_alternativas:", num_alternativas)
-            print("num_criterios:", num_criterios)
-            # Llamar a la función DLL pasando la cadena en vez del archivo
-            resultado = dll.ElectreIIIExplotarDestilacion(
-                ctypes.c_long(num_alternativas),
-                ctypes.c_long(num_criterios),
-                ctypes.c_double(lambda_corte),
-                csv_content.encode('utf-8')
-            )
+        motor = resolver_motor_electre(motor)
+        clave_cache = cache_resultados_electre.clave(
+            alternativas_matriz, nombres_alternativas, pesos, preferencia, indiferencia, veto,
+            direccion, lambda_corte, METODO_DESTILACION, motor
+        )
+        en_cache = cache_resultados_electre.obtener(clave_cache)
+        if en_cache is not None:
+            logger.debug("Resultado de ELECTRE III obtenido de la caché")
+            return en_cache
+        # Con la DLL el texto se arma en memoria (crear_texto_electre3), sin archivo temporal
+        resultado_alternativas = ejecutar_electre3_en_memoria(
+            motor, alternativas_matriz, pesos, preferencia, indiferencia, veto,
+            direccion, lambda_corte, nombres_alternativas, METODO_DESTILACION
+        )
+        logger.debug("Alternativas ordenadas por ELECTRE III (%s): %s", motor, resultado_alternativas)
+        return cache_resultados_electre.guardar(clave_cache, resultado_alternativas)
+    except Exception as e:
+        logger.error("Error al ejecutar ELECTRE III desde argumentos (%s): %s", METODO_DESTILACION, e)
+        return None
 
-            if resultado:
-                resultado_str = resultado.decode('utf-8')
-                resultado_alternativas = interpretar_resultado_destilacion(resultado_str)
-                print("Alternativas ordenadas por ELECTRE III:")
-                print(resultado_alternativas)
+def ejecutar_electre3_desde_csv_en_memoria(flujo: BinaryIO, lambda_corte: float = -1,
+                                           metodo: str = METODO_FLUJO_NETO,
+                                           motor: Optional[str] = None,
+                                           cancelacion: Optional[threading.Event] = None) -> Optional[List[str]]:
+    """
+    Ejecuta ELECTRE III sobre un CSV leído por bloques desde un objeto tipo archivo
+    (p. ej. UploadFile.file), sin archivos temporales en ningún motor.
 
-                return resultado_alternativas
-            else:
-                print("La DLL no retornó resultado")
-                return None
+    Args:
+        flujo: objeto binario con método read(n)
+        lambda_corte: Valor de corte lambda (por defecto -1)
+        metodo: METODO_FLUJO_NETO o METODO_DESTILACION
+        motor: Motor de cálculo ('dll', 'numpy' o 'binario'); por defecto settings.ELECTRE_MOTOR
+        cancelacion: evento que se activa si el cliente abandona la petición
 
+    Returns:
+        Lista de alternativas ordenadas o None si hay error
+    """
+    try:
+        datos = parsear_csv_electre(flujo)
+        datos['corte'] = lambda_corte
+        logger.debug("CSV procesado: %d alternativas, %d criterios",
+                     len(datos['nombres_alternativas']), len(datos['nombres_criterios']))
+
+        motor = resolver_motor_electre(motor)
+        clave_cache = clave_cache_datos(datos, metodo, motor)
+        en_cache = cache_resultados_electre.obtener(clave_cache)
+        if en_cache is not None:
+            logger.debug("Resultado de ELECTRE III obtenido de la caché")
+            return en_cache
+        return cache_resultados_electre.guardar(
+            clave_cache, ejecutar_electre3_desde_datos(datos, metodo=metodo, motor=motor,
+                                                       cancelacion=cancelacion)
+        )
     except Exception as e:
-        print(f"Error al ejecutar ELECTRE III desde argumentos: {e}")
+        logger.error("Error al ejecutar ELECTRE III desde CSV (%s): %s", metodo, e)
         return None
 
-def ejecutar_electre3_desde_csv_destilacion(ruta_csv: str, lambda_corte: float = -1) -> Optional[str]:
+def ejecutar_electre3_desde_csv_destilacion(ruta_csv: str, lambda_corte: float = -1,
+                                            motor: Optional[str] = None) -> Optional[str]:
     """
     Ejecuta ELECTRE III método de destilación leyendo directamente un archivo CSV.
 
     Args:
         ruta_csv: Ruta al archivo CSV con formato ELECTRE III
         lambda_corte: Valor de corte lambda (por defecto -1)
+        motor: Motor de cálculo ('dll', 'numpy' o 'binario'); por defecto settings.ELECTRE_MOTOR
 
     Returns:
         Lista de alternativas ordenadas según destilación o None si hay error
     """
-    try:
-        import ctypes
-        import os
-
-        # Leer el archivo CSV con el formato correcto (separador de comas, punto y coma al final)
-        # Primero leer líneas manualmente para procesarlas correctamente
-        with open(ruta_csv, 'r', encoding='utf-8') as f:
-            lineas = [linea.strip().rstrip(';') for linea in f.readlines() if linea.strip()]
-        
-        # Parsear cada línea dividiendo por comas
-        matriz_datos = []
-        for linea in lineas:
-            if linea:
-                valores = [val.strip() for val in linea.split(',')]
-                matriz_datos.append(valores)
-        
-        # Convertir a numpy array para facilitar el manejo
-        matriz = np.array(matriz_datos, dtype=object)
-        
-        # Identificar filas especiales (W, P, I, Q, V, D)
-        filas_especiales = {}
-        indices_alternativas = []
-        
-        for i, fila in enumerate(matriz):
-            primera_col = str(fila[0]).strip()
-            if primera_col in ['W', 'P', 'I', 'Q', 'V', 'D']:
-                filas_especiales[primera_col] = i
-            elif primera_col != '-':  # Ignorar la fila de encabezado
-                indices_alternativas.append(i)
-        
-        # Extraer datos
-        num_alternativas = len(indices_alternativas)
-        num_criterios = len(matriz[0]) - 1  # -1 porque la primera columna son nombres
-        
-        # Nombres de alternativas
-        nombres_alternativas = [str(matriz[i][0]).strip() for i in indices_alternativas]
-        
-        # Nombres de criterios (de la primera fila con encabezado '-')
-        fila_encabezado = None
-        for i, fila in enumerate(matriz):
-            if str(fila[0]).strip() == '-':
-                fila_encabezado = i
-                break
-        
-        if fila_encabezado is not None and len(matriz[fila_encabezado]) > 1:
-            criterios_nombres = [str(matriz[fila_encabezado][j]).strip() for j in range(1, len(matriz[fila_encabezado]))]
-        else:
-            criterios_nombres = [f"C{j}" for j in range(num_criterios)]
-        
-        # Matriz de alternativas
-        alternativas_matriz = []
-        for i in indices_alternativas:
-            fila_valores = []
-            for j in range(1, num_criterios + 1):
-                valor = matriz[i][j]
-                # Convertir a float, manejando posibles NaN
-                try:
-                    fila_valores.append(float(valor))
-                except (ValueError, TypeError):
-                    fila_valores.append(0.0)
-            alternativas_matriz.append(fila_valores)
-        
-        # Extraer parámetros de filas especiales
-        def extraer_fila_parametros(letra):
-            if letra in filas_especiales:
-                idx = filas_especiales[letra]
-                parametros = []
-                for j in range(1, num_criterios + 1):
-                    try:
-                        parametros.append(float(matriz[idx][j]))
-                    except (ValueError, TypeError, IndexError):
-                        parametros.append(0.0)
-                return parametros
-            else:
-                return [0.0] * num_criterios
-        
-        pesos = extraer_fila_parametros('W')
-        preferencia = extraer_fila_parametros('P')
-        # Intentar 'I' primero, luego 'Q' si no existe
-        indiferencia = extraer_fila_parametros('I') if 'I' in filas_especiales else extraer_fila_parametros('Q')
-        veto = extraer_fila_parametros('V')
-        direccion = extraer_fila_parametros('D')
-        
-        # Convertir direcciones a enteros
-        direccion = [int(d) for d in direccion]
-        
-        print(f"CSV procesado: {num_alternativas} alternativas, {num_criterios} criterios")
-        print(f"Alternativas: {nombres_alternativas}")
-        print(f"Criterios: {criterios_nombres}")
-        
-        # Cargar la DLL (compatible Windows/Linux)
-        dll = cargar_dll_electre()
-
-        dll.ElectreIIIExplotarDestilacion.argtypes = [
-            ctypes.c_long, ctypes.c_long, ctypes.c_double, ctypes.c_char_p
-        ]
-        dll.ElectreIIIExplotarDestilacion.restype = ctypes.c_char_p
-
-        # Crear archivo CSV temporal con formato correcto
-        with csv_temporal_electre3(
-            alternativas_matriz, criterios_nombres, pesos,
-            preferencia, indiferencia, veto, direccion, nombres_alternativas
-        ) as archivo_csv:
-
-            # Leer el contenido del archivo CSV y reemplazar saltos de línea por ':'
-            with open(archivo_csv, 'r', encoding='utf-8') as f:
-                csv_content = f.read().replace('\n', ':')
-
-        # Ejecutar FUERA del context manager para evitar que se elimine el archivo antes de tiempo
-        print(f"Ejecutando ELECTRE III Destilación con λ = {lambda_corte}")
-        print(f"Contenido CSV a enviar: {csv_content[:200]}...")  # Mostrar primeros 200 caracteres
-        
-        # Llamar a la función DLL
-        resultado = dll.ElectreIIIExplotarDestilacion(
-            ctypes.c_long(num_alternativas),
-            ctypes.c_long(num_criterios),
-            ctypes.c_double(lambda_corte),
-            csv_content.encode('utf-8')
-        )
+    with open(ruta_csv, 'rb') as f:
+        return ejecutar_electre3_desde_csv_en_memoria(f, lambda_corte, METODO_DESTILACION, motor)
 
-        if resultado:
-            resultado_str = resultado.decode('utf-8')
-            print("Resultado ELECTRE III (Destilación):")
-            print(resultado_str)
-            resultado_alternativas = interpretar_resultado_destilacion(resultado_str)
-            print("Alternativas ordenadas por Destilación:")
-            for idx, alt in enumerate(resultado_alternativas, 1):
-                print(f"  {idx}. {alt}")
-
-            return resultado_alternativas
-        else:
-            print("La DLL no retornó resultado")
-            return None
-
-    except Exception as e:
-        print(f"Error al ejecutar ELECTRE III desde CSV (Destilación): {e}")
-        import traceback
-        traceback.print_exc()
-        return None
-
-def ejecutar_electre3_desde_csv_flujo_neto(ruta_csv: str, lambda_corte: float = -1) -> Optional[str]:
+def ejecutar_electre3_desde_csv_flujo_neto(ruta_csv: str, lambda_corte: float = -1,
+                                           motor: Optional[str] = None) -> Optional[str]:
     """
     Ejecuta ELECTRE III método de flujo neto leyendo directamente un archivo CSV.
 
     Args:
         ruta_csv: Ruta al archivo CSV con formato ELECTRE III
         lambda_corte: Valor de corte lambda (por defecto -1)
+        motor: Motor de cálculo ('dll', 'numpy' o 'binario'); por defecto settings.ELECTRE_MOTOR
 
     Returns:
         Lista de alternativas ordenadas según flujo neto o None si hay error
     """
-    try:
-        import ctypes
-        import os
-
-        # Leer el archivo CSV con el formato correcto (separador de comas, punto y coma al final)
-        # Primero leer líneas manualmente para procesarlas correctamente
-        with open(ruta_csv, 'r', encoding='utf-8') as f:
-            lineas = [linea.strip().rstrip(';') for linea in f.readlines() if linea.strip()]
-        
-        # Parsear cada línea dividiendo por comas
-        matriz_datos = []
-        for linea in lineas:
-            if linea:
-                valores = [val.strip() for val in linea.split(',')]
-                matriz_datos.append(valores)
-        
-        # Convertir a numpy array para facilitar el manejo
-        matriz = np.array(matriz_datos, dtype=object)
-        
-        # Identificar filas especiales (W, P, I, Q, V, D)
-        filas_especiales = {}
-        indices_alternativas = []
-        
-        for i, fila in enumerate(matriz):
-            primera_col = str(fila[0]).strip()
-            if primera_col in ['W', 'P', 'I', 'Q', 'V', 'D']:
-                filas_especiales[primera_col] = i
-            elif primera_col != '-':  # Ignorar la fila de encabezado
-                indices_alternativas.append(i)
-        
-        # Extraer datos
-        num_alternativas = len(indices_alternativas)
-        num_criterios = len(matriz[0]) - 1  # -1 porque la primera columna son nombres
-        
-        # Nombres de alternativas
-        nombres_alternativas = [str(matriz[i][0]).strip() for i in indices_alternativas]
-        
-        # Nombres de criterios (de la primera fila con encabezado '-')
-        fila_encabezado = None
-        for i, fila in enumerate(matriz):
-            if str(fila[0]).strip() == '-':
-                fila_encabezado = i
-                break
-        
-        if fila_encabezado is not None and len(matriz[fila_encabezado]) > 1:
-            criterios_nombres = [str(matriz[fila_encabezado][j]).strip() for j in range(1, len(matriz[fila_encabezado]))]
-        else:
-            criterios_nombres = [f"C{j}" for j in range(num_criterios)]
-        
-        # Matriz de alternativas
-        alternativas_matriz = []
-        for i in indices_alternativas:
-            fila_valores = []
-            for j in range(1, num_criterios + 1):
-                valor = matriz[i][j]
-                # Convertir a float, manejando posibles NaN
-                try:
-                    fila_valores.append(float(valor))
-                except (ValueError, TypeError):
-                    fila_valores.append(0.0)
-            alternativas_matriz.append(fila_valores)
-        
-        # Extraer parámetros de filas especiales
-        def extraer_fila_parametros(letra):
-            if letra in filas_especiales:
-                idx = filas_especiales[letra]
-                parametros = []
-                for j in range(1, num_criterios + 1):
-                    try:
-                        parametros.append(float(matriz[idx][j]))
-                    except (ValueError, TypeError, IndexError):
-                        parametros.append(0.0)
-                return parametros
-            else:
-                return [0.0] * num_criterios
-        
-        pesos = extraer_fila_parametros('W')
-        preferencia = extraer_fila_parametros('P')
-        # Intentar 'I' primero, luego 'Q' si no existe
-        indiferencia = extraer_fila_parametros('I') if 'I' in filas_especiales else extraer_fila_parametros('Q')
-        veto = extraer_fila_parametros('V')
-        direccion = extraer_fila_parametros('D')
-        
-        # Convertir direcciones a enteros
-        direccion = [int(d) for d in direccion]
-        
-        print(f"CSV procesado: {num_alternativas} alternativas, {num_criterios} criterios")
-        print(f"Alternativas: {nombres_alternativas}")
-        print(f"Criterios: {criterios_nombres}")
-        
-        # Cargar la DLL (compatible Windows/Linux)
-        dll = cargar_dll_electre()
-
-        dll.ElectreIIIExplotarFlujoNeto.argtypes = [
-            ctypes.c_long, ctypes.c_long, ctypes.c_double, ctypes.c_char_p
-        ]
-        dll.ElectreIIIExplotarFlujoNeto.restype = ctypes.c_char_p
-
-        # Crear archivo CSV temporal con formato correcto
-        with csv_temporal_electre3(
-            alternativas_matriz, criterios_nombres, pesos,
-            preferencia, indiferencia, veto, direccion, nombres_alternativas
-        ) as archivo_csv:
-
-            # Leer el contenido del archivo CSV y reemplazar saltos de línea por ':'
-            with open(archivo_csv, 'r', encoding='utf-8') as f:
-                csv_content = f.read().replace('\n', ':')
-
-        # Ejecutar FUERA del context manager para evitar que se elimine el archivo antes de tiempo
-        print(f"Ejecutando ELECTRE III Flujo Neto con λ = {lambda_corte}")
-        print(f"Contenido CSV a enviar: {csv_content[:200]}...")  # Mostrar primeros 200 caracteres
-        
-        # Llamar a la función DLL
-        resultado = dll.ElectreIIIExplotarFlujoNeto(
-            ctypes.c_long(num_alternativas),
-            ctypes.c_long(num_criterios),
-            ctypes.c_double(lambda_corte),
-            csv_content.encode('utf-8')
-        )
-
-        if resultado:
-            resultado_str = resultado.decode('utf-8')
-            print("Resultado ELECTRE III (Flujo Neto):")
-            print(resultado_str)
-            resultado_alternativas = interpretar_resultado_flujo_neto(resultado_str)
-            print("Alternativas ordenadas por Flujo Neto:")
-            for idx, alt in enumerate(resultado_alternativas, 1):
-                print(f"  {idx}. {alt}")
-
-            return resultado_alternativas
-        else:
-            print("La DLL no retornó resultado")
-            return None
-
-    except Exception as e:
-        print(f"Error al ejecutar ELECTRE III desde CSV (Flujo Neto): {e}")
-        import traceback
-        traceback.print_exc()
-        return None
-
+    with open(ruta_csv, 'rb') as f:
+        return ejecutar_electre3_desde_csv_en_memoria(f, lambda_corte, METODO_FLUJO_NETO, motor)
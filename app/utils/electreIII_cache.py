@@ -0,0 +1,124 @@
+"""
+Caché de resultados de ELECTRE III direccionada por contenido.
+
+La clave es un hash de la matriz de decisión, los nombres de las alternativas,
+los pesos, los umbrales P/Q/V, las direcciones, lambda, el método de
+explotación y el motor de cálculo. Como la clave depende solo del contenido, un escenario que cambia
+en la base de datos produce otra clave y no hace falta invalidar a mano.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+
+class CacheResultadosElectre:
+    """
+    LRU acotada por número de entradas con expiración por TTL y contadores de aciertos/fallos.
+    """
+
+    def __init__(self, max_entradas: int, ttl: float):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[str, tuple]" = OrderedDict()
+        self._aciertos = 0
+        self._fallos = 0
+        self._expiradas = 0
+        self._desalojadas = 0
+
+    @property
+    def activa(self) -> bool:
+        return self.max_entradas > 0
+
+    @staticmethod
+    def clave(alternativas_matriz, nombres_alternativas: Optional[Sequence[str]], pesos, preferencia,
+              indiferencia, veto, direccion, lambda_corte: float, metodo: str, motor: str) -> str:
+        """
+        Calcula la clave de contenido de una ejecución. Incluye el motor: un resultado
+        calculado con un motor nunca se devuelve para otro.
+
+        Returns:
+            Hash hexadecimal de los datos de entrada
+        """
+        matriz = np.ascontiguousarray(alternativas_matriz, dtype=np.float64)
+        h = hashlib.blake2b(digest_size=20)
+        h.update(f"{motor}|{metodo}|{float(lambda_corte)!r}|{matriz.shape}".encode('utf-8'))
+        h.update(matriz.tobytes())
+        for vector in (pesos, preferencia, indiferencia, veto, direccion):
+            h.update(b"|")
+            h.update(np.ascontiguousarray(vector, dtype=np.float64).tobytes())
+        if nombres_alternativas:
+            h.update(b"|" + "\x1f".join(str(nombre) for nombre in nombres_alternativas).encode('utf-8'))
+        return h.hexdigest()
+
+    def obtener(self, clave: str) -> Optional[List[str]]:
+        """
+        Busca un resultado vigente en la caché.
+
+        Returns:
+            Copia del ranking guardado o None si no existe o expiró
+        """
+        if not self.activa:
+            return None
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self._fallos += 1
+                return None
+            expira, valor = entrada
+            if expira <= ahora:
+                del self._entradas[clave]
+                self._expiradas += 1
+                self._fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self._aciertos += 1
+            return list(valor)
+
+    def guardar(self, clave: str, valor: Optional[List[str]]) -> Optional[List[str]]:
+        """
+        Guarda un ranking en la caché (los resultados None no se guardan).
+
+        Returns:
+            El mismo valor recibido, para poder usarlo en un return
+        """
+        if not self.activa or valor is None:
+            return valor
+        with self._lock:
+            self._entradas[clave] = (time.monotonic() + self.ttl, tuple(valor))
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self._desalojadas += 1
+        return valor
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def estado(self) -> Dict:
+        with self._lock:
+            consultas = self._aciertos + self._fallos
+            return {
+                "max_entradas": self.max_entradas,
+                "ttl": self.ttl,
+                "entradas": len(self._entradas),
+                "aciertos": self._aciertos,
+                "fallos": self._fallos,
+                "tasa_aciertos": self._aciertos / consultas if consultas else None,
+                "expiradas": self._expiradas,
+                "desalojadas": self._desalojadas,
+            }
+
+
+cache_resultados_electre = CacheResultadosElectre(
+    max_entradas=settings.ELECTRE_CACHE_MAX_ENTRADAS,
+    ttl=settings.ELECTRE_CACHE_TTL,
+)
@@ -0,0 +1,148 @@
+"""
+Parser en memoria por bloques para los CSV de ELECTRE III.
+
+Formato: una fila de encabezado que empieza con '-', una fila por alternativa y
+las filas de parámetros W, P, I (o Q), V y D; celdas separadas por ',' y cada
+fila terminada opcionalmente en ';'. Los valores se escriben directamente en
+arreglos float64 sin pasar por archivos temporales ni matrices de objetos.
+"""
+import codecs
+from typing import BinaryIO, Dict, List, Optional
+
+import numpy as np
+
+# Filas de parámetros reconocidas en la primera columna
+FILAS_PARAMETROS = ('W', 'P', 'I', 'Q', 'V', 'D')
+
+# Tamaño de bloque por defecto al leer el archivo
+TAMANO_BLOQUE_CSV = 1024 * 1024
+
+
+def _convertir_celdas(celdas: List[str]) -> np.ndarray:
+    """
+    Convierte las celdas a float64; las que no son números quedan en 0.0 (igual que el parser anterior).
+    """
+    try:
+        return np.asarray(celdas, dtype=np.float64)
+    except ValueError:
+        valores = np.zeros(len(celdas), dtype=np.float64)
+        for j, celda in enumerate(celdas):
+            try:
+                valores[j] = float(celda)
+            except ValueError:
+                pass
+        return valores
+
+
+class ParserCSVElectre:
+    """
+    Parser incremental: se le pasan bloques de bytes con alimentar() y al final terminar() devuelve los datos.
+    """
+
+    def __init__(self):
+        self._decodificador = codecs.getincrementaldecoder('utf-8-sig')()
+        self._pendiente = ""
+        self._num_criterios: Optional[int] = None
+        self._criterios_nombres: Optional[List[str]] = None
+        self._nombres_alternativas: List[str] = []
+        self._matriz = np.empty((0, 0), dtype=np.float64)
+        self._parametros: Dict[str, np.ndarray] = {}
+
+    def _agregar_alternativa(self, nombre: str, valores: np.ndarray):
+        fila = len(self._nombres_alternativas)
+        if fila == self._matriz.shape[0]:
+            # Crecimiento geométrico para no copiar la matriz en cada fila
+            nueva = np.empty((max(64, fila * 2), self._num_criterios), dtype=np.float64)
+            nueva[:fila] = self._matriz[:fila]
+            self._matriz = nueva
+        self._matriz[fila] = valores
+        self._nombres_alternativas.append(nombre)
+
+    def _procesar_linea(self, linea: str):
+        linea = linea.strip().rstrip(';')
+        if not linea:
+            return
+        celdas = [celda.strip() for celda in linea.split(',')]
+        if self._num_criterios is None:
+            # Igual que antes: el número de criterios sale de la primera fila
+            self._num_criterios = len(celdas) - 1
+            self._matriz = np.empty((0, self._num_criterios), dtype=np.float64)
+
+        etiqueta = celdas[0]
+        if etiqueta == '-':
+            if self._criterios_nombres is None:
+                self._criterios_nombres = celdas[1:]
+            return
+
+        valores = celdas[1:self._num_criterios + 1]
+        if etiqueta in FILAS_PARAMETROS:
+            # A las filas de parámetros incompletas se les completa con 0.0
+            fila = np.zeros(self._num_criterios, dtype=np.float64)
+            fila[:len(valores)] = _convertir_celdas(valores)
+            self._parametros[etiqueta] = fila
+            return
+
+        if len(valores) < self._num_criterios:
+            raise ValueError(f"La alternativa {etiqueta} tiene {len(valores)} valores y se esperaban {self._num_criterios}")
+        self._agregar_alternativa(etiqueta, _convertir_celdas(valores))
+
+    def alimentar(self, bloque: bytes):
+        """
+        Procesa un bloque de bytes; la última línea incompleta queda pendiente para el siguiente bloque.
+        """
+        texto = self._pendiente + self._decodificador.decode(bloque)
+        lineas = texto.split('\n')
+        self._pendiente = lineas.pop()
+        for linea in lineas:
+            self._procesar_linea(linea)
+
+    def terminar(self) -> Dict:
+        """
+        Procesa lo pendiente y devuelve los datos del CSV.
+
+        Returns:
+            Dict con 'matriz_decision' (n, m), 'nombres_alternativas', 'nombres_criterios',
+            'pesos', 'preferencia', 'indiferencia', 'veto' y 'direccion'
+        """
+        self._procesar_linea(self._pendiente + self._decodificador.decode(b"", final=True))
+        self._pendiente = ""
+        if self._num_criterios is None or not self._nombres_alternativas:
+            raise ValueError("El CSV no contiene alternativas")
+
+        m = self._num_criterios
+        ceros = np.zeros(m, dtype=np.float64)
+        parametros = self._parametros
+        indiferencia = parametros['I'] if 'I' in parametros else parametros.get('Q', ceros)
+        nombres_criterios = self._criterios_nombres or [f"C{j}" for j in range(m)]
+
+        return {
+            'matriz_decision': self._matriz[:len(self._nombres_alternativas)],
+            'nombres_alternativas': self._nombres_alternativas,
+            'nombres_criterios': nombres_criterios,
+            'pesos': parametros.get('W', ceros),
+            'preferencia': parametros.get('P', ceros),
+            'indiferencia': indiferencia,
+            'veto': parametros.get('V', ceros),
+            # Las direcciones se truncan a entero como en el parser anterior
+            'direccion': np.trunc(parametros.get('D', ceros)).astype(int),
+        }
+
+
+def parsear_csv_electre(flujo: BinaryIO, tamano_bloque: int = TAMANO_BLOQUE_CSV) -> Dict:
+    """
+    Lee un CSV de ELECTRE III por bloques desde un objeto tipo archivo binario (p. ej. UploadFile.file).
+
+    Args:
+        flujo: objeto con método read(n) que devuelve bytes
+        tamano_bloque: bytes a leer por bloque
+
+    Returns:
+        Dict con los datos del CSV (ver ParserCSVElectre.terminar)
+    """
+    parser = ParserCSVElectre()
+    while True:
+        bloque = flujo.read(tamano_bloque)
+        if not bloque:
+            break
+        parser.alimentar(bloque)
+    return parser.terminar()
@@ -0,0 +1,185 @@
+"""
+Carga de escenarios para ELECTRE III con una sola consulta.
+
+Se cruzan alternativas y criterios del escenario (ordenados por id) con un
+LEFT OUTER JOIN a las evaluaciones, de modo que una evaluación faltante aparece
+como NULL. Cada valor se ubica en la matriz de decisión por los ids de su
+alternativa y criterio, así que las evaluaciones duplicadas no la desalinean.
+Los valores se vuelcan directamente a arreglos NumPy y los umbrales no
+definidos se completan por criterio con operaciones vectorizadas sobre el rango.
+"""
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Any, Dict, Sequence, Tuple, Union
+
+import numpy as np
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from app.models import Alternativa, Criterio, Escenario, Evaluacion
+
+# Fracción del rango de valores usada cuando un umbral no está definido (P, Q, V)
+FRACCIONES_UMBRAL_POR_DEFECTO = (0.1, 0.05, 0.5)
+
+
+def _solo_lectura(arreglo: np.ndarray) -> np.ndarray:
+    arreglo.setflags(write=False)
+    return arreglo
+
+
+@dataclass(frozen=True)
+class EscenarioElectre:
+    """
+    Datos inmutables de un escenario listos para ELECTRE III.
+
+    Los arreglos son de solo lectura. Se puede leer como el diccionario que
+    devolvía antes obtener_datos_escenario_para_electre (datos['pesos'], ...).
+    """
+    escenario_id: int
+    corte: float
+    ids_alternativas: np.ndarray
+    ids_criterios: np.ndarray
+    nombres_alternativas: Tuple[str, ...]
+    nombres_criterios: Tuple[str, ...]
+    matriz_decision: np.ndarray
+    pesos: np.ndarray
+    preferencia: np.ndarray
+    indiferencia: np.ndarray
+    veto: np.ndarray
+    direccion: np.ndarray
+    # (m, 3) True donde P, Q o V vienen del criterio y no del valor por defecto
+    umbrales_definidos: np.ndarray
+
+    def __getitem__(self, clave: str) -> Any:
+        try:
+            return getattr(self, clave)
+        except AttributeError:
+            raise KeyError(clave) from None
+
+
+def _consulta_escenarios():
+    """
+    Alternativas x criterios de cada escenario con su evaluación (NULL si falta), ordenados por id.
+    """
+    return (
+        select(
+            Escenario.id, Escenario.corte,
+            Alternativa.id, Alternativa.name,
+            Criterio.id, Criterio.name, Criterio.weight,
+            Criterio.preference_threshold, Criterio.indifference_threshold, Criterio.veto_threshold,
+            Criterio.is_benefit,
+            Evaluacion.value,
+        )
+        .select_from(Escenario)
+        .join(Alternativa, Alternativa.escenario_id == Escenario.id)
+        .join(Criterio, Criterio.escenario_id == Escenario.id)
+        .outerjoin(Evaluacion, and_(
+            Evaluacion.escenario_id == Escenario.id,
+            Evaluacion.alternativa_id == Alternativa.id,
+            Evaluacion.criterio_id == Criterio.id,
+        ))
+        .order_by(Escenario.id, Alternativa.id, Criterio.id, Evaluacion.id)
+    )
+
+
+def _construir_escenario(escenario_id: int, filas: Sequence) -> EscenarioElectre:
+    """
+    Arma el EscenarioElectre a partir de las filas (ordenadas) de un escenario.
+    """
+    if not filas:
+        raise ValueError(f"No se encontraron datos suficientes para el escenario {escenario_id}")
+
+    (_, cortes, ids_alt, nombres_alt, ids_crit, nombres_crit, pesos,
+     preferencia, indiferencia, veto, beneficio, valores) = zip(*filas)
+
+    # Cada valor va a la celda de su (alternativa, criterio) según la posición del id entre los
+    # ids únicos ordenados; no se asume una fila por celda porque la tabla de evaluaciones no
+    # impide duplicados. Si una celda se repite gana la última fila (la evaluación de mayor id).
+    alternativas, primera_alt, fila_alt = np.unique(np.asarray(ids_alt, dtype=np.int64),
+                                                    return_index=True, return_inverse=True)
+    criterios, primera_crit, columna_crit = np.unique(np.asarray(ids_crit, dtype=np.int64),
+                                                      return_index=True, return_inverse=True)
+    n, m = alternativas.size, criterios.size
+    celdas = fila_alt * m + columna_crit
+    ultimas = celdas.size - 1 - np.unique(celdas[::-1], return_index=True)[1]
+    matriz = np.full(n * m, np.nan)
+    matriz[celdas[ultimas]] = np.asarray(valores, dtype=np.float64)[ultimas]
+    matriz = matriz.reshape(n, m)
+
+    nombres_alt = [nombres_alt[k] for k in primera_alt]
+    nombres_crit = [nombres_crit[k] for k in primera_crit]
+    faltantes = np.isnan(matriz)
+    if faltantes.all():
+        raise ValueError(f"No se encontraron datos suficientes para el escenario {escenario_id}")
+    if faltantes.any():
+        i, j = np.argwhere(faltantes)[0]
+        raise ValueError(f"Falta evaluación para alternativa {nombres_alt[i]} y criterio {nombres_crit[j]}")
+
+    def por_criterio(columna: Sequence) -> list:
+        return [columna[k] for k in primera_crit]
+
+    # Umbrales por defecto: porcentaje del rango de cada criterio
+    umbrales = np.asarray([por_criterio(preferencia), por_criterio(indiferencia), por_criterio(veto)],
+                          dtype=np.float64).T
+    definidos = ~np.isnan(umbrales)
+    rango = matriz.max(axis=0) - matriz.min(axis=0)
+    umbrales = np.where(definidos, umbrales, rango[:, None] * np.asarray(FRACCIONES_UMBRAL_POR_DEFECTO))
+
+    corte = cortes[0]
+    return EscenarioElectre(
+        escenario_id=escenario_id,
+        corte=-1 if corte is None else corte,
+        ids_alternativas=_solo_lectura(alternativas),
+        ids_criterios=_solo_lectura(criterios),
+        nombres_alternativas=tuple(nombres_alt),
+        nombres_criterios=tuple(nombres_crit),
+        matriz_decision=_solo_lectura(matriz),
+        pesos=_solo_lectura(np.asarray(por_criterio(pesos), dtype=np.float64)),
+        preferencia=_solo_lectura(umbrales[:, 0].copy()),
+        indiferencia=_solo_lectura(umbrales[:, 1].copy()),
+        veto=_solo_lectura(umbrales[:, 2].copy()),
+        direccion=_solo_lectura(np.asarray([1 if b else 0 for b in por_criterio(beneficio)], dtype=np.int64)),
+        umbrales_definidos=_solo_lectura(definidos),
+    )
+
+
+def cargar_escenario_electre(db: Session, escenario_id: int) -> EscenarioElectre:
+    """
+    Carga un escenario con una sola consulta ordenada.
+
+    Args:
+        db: Sesión de SQLAlchemy
+        escenario_id: ID del escenario
+
+    Returns:
+        EscenarioElectre con la matriz de decisión y los parámetros por criterio
+
+    Raises:
+        ValueError: si el escenario no tiene alternativas, criterios o evaluaciones,
+            o si falta la evaluación de alguna celda
+    """
+    filas = db.execute(_consulta_escenarios().where(Escenario.id == escenario_id)).all()
+    return _construir_escenario(escenario_id, filas)
+
+
+def cargar_escenarios_electre(db: Session, escenario_ids: Sequence[int]) -> Dict[int, Union[EscenarioElectre, ValueError]]:
+    """
+    Carga varios escenarios con una sola consulta.
+
+    Args:
+        db: Sesión de SQLAlchemy
+        escenario_ids: IDs de los escenarios
+
+    Returns:
+        Dict escenario_id -> EscenarioElectre, o el ValueError del escenario si sus datos
+        están incompletos (un escenario con errores no impide cargar los demás)
+    """
+    filas = db.execute(_consulta_escenarios().where(Escenario.id.in_(list(escenario_ids)))).all()
+    por_escenario = {escenario_id: list(grupo) for escenario_id, grupo in groupby(filas, key=lambda fila: fila[0])}
+    escenarios = {}
+    for escenario_id in escenario_ids:
+        try:
+            escenarios[escenario_id] = _construir_escenario(escenario_id, por_escenario.get(escenario_id, []))
+        except ValueError as e:
+            escenarios[escenario_id] = e
+    return escenarios
@@ -0,0 +1,364 @@
+"""
+Estado incremental de la matriz de credibilidad por escenario (motor NumPy).
+
+Para cada escenario se guardan los índices parciales c_j y d_j de cada criterio,
+la concordancia global y la credibilidad. Cuando cambia una evaluación solo se
+recalculan la fila y la columna de esa alternativa en el criterio afectado; al
+agregar o quitar alternativas o criterios se ajustan las pilas sin recalcular
+los demás criterios. Si cambia un umbral (incluidos los calculados por defecto
+a partir del rango de valores) se recalcula ese criterio completo.
+
+Los valores obtenidos son idénticos a calcular_matriz_credibilidad.
+"""
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.electreIII_escenario import FRACCIONES_UMBRAL_POR_DEFECTO, EscenarioElectre
+from app.utils.electreIII_numpy import concordancia_criterio, discordancia_criterio
+
+logger = logging.getLogger(__name__)
+
+
+class EstadoCredibilidad:
+    """
+    Credibilidad de un escenario con las pilas c_j / d_j necesarias para actualizarla por partes.
+    """
+
+    def __init__(self, datos: EscenarioElectre):
+        self.ids_alternativas: List[int] = []
+        self.ids_criterios: List[int] = []
+        self.matriz = np.zeros((0, 0))
+        self.parametros = np.zeros((0, 4))  # columnas: peso, preferencia, indiferencia, veto
+        self.beneficio = np.zeros(0, dtype=bool)
+        self.por_defecto = np.zeros((0, 3), dtype=bool)
+        self.c = np.zeros((0, 0, 0))
+        self.d = np.zeros((0, 0, 0))
+        self.concordancia = np.zeros((0, 0))
+        self.credibilidad = np.zeros((0, 0))
+        self.sincronizar(datos)
+
+    @property
+    def bytes(self) -> int:
+        """
+        Memoria ocupada por las matrices del estado.
+        """
+        return sum(arreglo.nbytes for arreglo in (self.matriz, self.parametros, self.c, self.d,
+                                                   self.concordancia, self.credibilidad))
+
+    @staticmethod
+    def _leer_datos(datos: EscenarioElectre) -> Tuple[List[int], List[int], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        parametros = np.column_stack([datos.pesos, datos.preferencia, datos.indiferencia, datos.veto])
+        return (datos.ids_alternativas.tolist(), datos.ids_criterios.tolist(), datos.matriz_decision,
+                parametros, datos.direccion == 1, ~datos.umbrales_definidos)
+
+    def _recalcular_criterio(self, j: int):
+        valores = self.matriz[:, j]
+        _, p, q, v = self.parametros[j]
+        self.c[j] = concordancia_criterio(valores, p, q, self.beneficio[j])
+        self.d[j] = discordancia_criterio(valores, p, v, self.beneficio[j])
+
+    def _parchar_alternativa(self, j: int, i: int):
+        valores = self.matriz[:, j]
+        _, p, q, v = self.parametros[j]
+        b = self.beneficio[j]
+        fila, columna = slice(i, i + 1), slice(None)
+        self.c[j, i, :] = concordancia_criterio(valores, p, q, b, fila, columna)[0]
+        self.c[j, :, i] = concordancia_criterio(valores, p, q, b, columna, fila)[:, 0]
+        self.d[j, i, :] = discordancia_criterio(valores, p, v, b, fila, columna)[0]
+        self.d[j, :, i] = discordancia_criterio(valores, p, v, b, columna, fila)[:, 0]
+
+    def _concordancia_de(self, c: np.ndarray) -> np.ndarray:
+        """
+        Mismo orden de operaciones que calcular_matriz_concordancia, sobre una pila (m, ...) de c_j.
+        """
+        suma_ponderada = np.zeros(c.shape[1:])
+        suma_pesos = 0.0
+        for j in range(c.shape[0]):
+            suma_pesos += self.parametros[j, 0]
+            suma_ponderada += c[j] * self.parametros[j, 0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return suma_ponderada / suma_pesos
+
+    def _aplicar_discordancia(self, concordancia: np.ndarray, d: np.ndarray) -> np.ndarray:
+        factor = np.ones_like(concordancia)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for j in range(d.shape[0]):
+                factor = np.where(d[j] > concordancia, factor * (1.0 - d[j]) / (1.0 - concordancia), factor)
+        return concordancia * factor
+
+    def _recalcular_credibilidad(self, indices: Optional[Iterable[int]] = None):
+        """
+        Recalcula concordancia y credibilidad completas o solo las filas y columnas de las alternativas indicadas.
+        """
+        if indices is None:
+            self.concordancia = self._concordancia_de(self.c)
+            np.fill_diagonal(self.concordancia, 1.0)
+            self.credibilidad = self._aplicar_discordancia(self.concordancia, self.d)
+            return
+
+        indices = np.fromiter(sorted(set(indices)), dtype=np.intp)
+        if indices.size == 0:
+            return
+        posiciones = np.arange(indices.size)
+        filas = self._concordancia_de(self.c[:, indices, :])
+        columnas = self._concordancia_de(self.c[:, :, indices])
+        filas[posiciones, indices] = 1.0
+        columnas[indices, posiciones] = 1.0
+        self.concordancia[indices, :] = filas
+        self.concordancia[:, indices] = columnas
+        self.credibilidad[indices, :] = self._aplicar_discordancia(filas, self.d[:, indices, :])
+        self.credibilidad[:, indices] = self._aplicar_discordancia(columnas, self.d[:, :, indices])
+
+    def _redimensionar(self, conservar_alt: np.ndarray, conservar_crit: np.ndarray, n: int, m: int):
+        """
+        Quita las alternativas/criterios eliminados y agrega espacio al final para los nuevos.
+        """
+        n0, m0 = int(conservar_alt.sum()), int(conservar_crit.sum())
+        ixa = np.flatnonzero(conservar_alt)
+        ixc = np.flatnonzero(conservar_crit)
+        for nombre in ('c', 'd'):
+            nueva = np.zeros((m, n, n))
+            nueva[:m0, :n0, :n0] = getattr(self, nombre)[np.ix_(ixc, ixa, ixa)]
+            setattr(self, nombre, nueva)
+        for nombre in ('concordancia', 'credibilidad'):
+            nueva = np.zeros((n, n))
+            nueva[:n0, :n0] = getattr(self, nombre)[np.ix_(ixa, ixa)]
+            setattr(self, nombre, nueva)
+
+    def sincronizar(self, datos: EscenarioElectre):
+        """
+        Lleva el estado a los datos actuales del escenario actualizando solo lo que cambió.
+
+        Args:
+            datos: escenario cargado con cargar_escenario_electre
+        """
+        self._aplicar(*self._leer_datos(datos))
+
+    def _aplicar(self, ids_alt: List[int], ids_crit: List[int], matriz: np.ndarray,
+                 parametros: np.ndarray, beneficio: np.ndarray, por_defecto: np.ndarray):
+        conjunto_alt, conjunto_crit = set(ids_alt), set(ids_crit)
+        conservar_alt = np.array([i in conjunto_alt for i in self.ids_alternativas], dtype=bool)
+        conservar_crit = np.array([i in conjunto_crit for i in self.ids_criterios], dtype=bool)
+        previos_alt = [i for i, c in zip(self.ids_alternativas, conservar_alt) if c]
+        previos_crit = [i for i, c in zip(self.ids_criterios, conservar_crit) if c]
+
+        # Las alternativas y criterios nuevos solo pueden ir al final; si el orden cambió se recalcula todo
+        if ids_alt[:len(previos_alt)] != previos_alt or ids_crit[:len(previos_crit)] != previos_crit:
+            conservar_alt[:] = False
+            conservar_crit[:] = False
+        ixa, ixc = np.flatnonzero(conservar_alt), np.flatnonzero(conservar_crit)
+        n0, m0 = ixa.size, ixc.size
+        n, m = matriz.shape
+
+        criterios_quitados = m0 < len(self.ids_criterios)
+        matriz_anterior = self.matriz[np.ix_(ixa, ixc)]
+        parametros_anteriores = self.parametros[ixc]
+        beneficio_anterior = self.beneficio[ixc]
+        if (n0, m0) != self.matriz.shape or (n, m) != (n0, m0):
+            self._redimensionar(conservar_alt, conservar_crit, n, m)
+
+        self.ids_alternativas, self.ids_criterios = list(ids_alt), list(ids_crit)
+        self.matriz, self.parametros = matriz, parametros
+        self.beneficio, self.por_defecto = beneficio, por_defecto
+
+        completo = criterios_quitados
+        parchadas = set()
+        for j in range(m):
+            if (j >= m0 or beneficio_anterior[j] != beneficio[j]
+                    or not np.array_equal(parametros_anteriores[j, 1:], parametros[j, 1:])):
+                # Criterio nuevo o con umbrales distintos: se recalcula completo
+                self._recalcular_criterio(j)
+                completo = True
+                continue
+            if parametros_anteriores[j, 0] != parametros[j, 0]:
+                completo = True
+            cambiadas = np.flatnonzero(matriz_anterior[:, j] != matriz[:n0, j]).tolist() + list(range(n0, n))
+            for i in cambiadas:
+                self._parchar_alternativa(j, i)
+            parchadas.update(cambiadas)
+
+        if completo or len(parchadas) * 4 > n:
+            self._recalcular_credibilidad()
+        else:
+            self._recalcular_credibilidad(parchadas)
+
+    def actualizar_valores(self, cambios: Iterable[Tuple[int, int, float]]) -> bool:
+        """
+        Aplica cambios de evaluaciones (alternativa_id, criterio_id, valor) sobre el estado.
+
+        Returns:
+            False si algún cambio no corresponde al estado (hay que reconstruirlo)
+        """
+        posicion_alt = {id_: i for i, id_ in enumerate(self.ids_alternativas)}
+        posicion_crit = {id_: j for j, id_ in enumerate(self.ids_criterios)}
+        matriz = self.matriz.copy()
+        for alternativa_id, criterio_id, valor in cambios:
+            if alternativa_id not in posicion_alt or criterio_id not in posicion_crit or valor is None:
+                return False
+            matriz[posicion_alt[alternativa_id], posicion_crit[criterio_id]] = valor
+
+        # Recalcular los umbrales por defecto (porcentaje del rango) igual que el cargador de datos
+        parametros = self.parametros.copy()
+        for j in range(matriz.shape[1]):
+            columna = matriz[:, j].tolist()
+            rango = max(columna) - min(columna)
+            for k, fraccion in enumerate(FRACCIONES_UMBRAL_POR_DEFECTO):
+                if self.por_defecto[j, k]:
+                    parametros[j, k + 1] = rango * fraccion
+
+        self._aplicar(self.ids_alternativas, self.ids_criterios, matriz, parametros,
+                      self.beneficio, self.por_defecto)
+        return True
+
+
+class RegistroEstadosCredibilidad:
+    """
+    Estados de credibilidad por escenario con desalojo LRU.
+
+    presupuesto_bytes acota la memoria de todos los estados juntos: al guardar un
+    estado se desalojan los menos usados hasta que quepa. Cada escenario tiene su
+    propio lock; la construcción y la sincronización se hacen fuera del lock del
+    registro, que solo protege el diccionario de estados y la contabilidad de bytes.
+    """
+
+    def __init__(self, max_escenarios: int, presupuesto_bytes: int):
+        self.max_escenarios = max_escenarios
+        self.presupuesto_bytes = presupuesto_bytes
+        self._lock = threading.Lock()
+        self._estados: "OrderedDict[int, EstadoCredibilidad]" = OrderedDict()
+        self._bytes: Dict[int, int] = {}
+        self._bytes_total = 0
+        # Un lock por escenario; se libera solo cuando nadie lo está usando
+        self._locks_escenario: "weakref.WeakValueDictionary[int, threading.Lock]" = weakref.WeakValueDictionary()
+        self._estadisticas = {"construidos": 0, "sincronizados": 0, "parches_escritura": 0,
+                              "invalidados": 0, "desalojados": 0}
+
+    @property
+    def activo(self) -> bool:
+        return self.max_escenarios > 0
+
+    def _cabe(self, n: int, m: int) -> bool:
+        # Pilas c_j y d_j más concordancia y credibilidad
+        return (2 * m + 2) * n * n * 8 <= self.presupuesto_bytes
+
+    def _lock_de(self, escenario_id: int) -> threading.Lock:
+        with self._lock:
+            lock = self._locks_escenario.get(escenario_id)
+            if lock is None:
+                lock = threading.Lock()
+                self._locks_escenario[escenario_id] = lock
+            return lock
+
+    def _quitar(self, escenario_id: int) -> bool:
+        # Requiere self._lock
+        if self._estados.pop(escenario_id, None) is None:
+            return False
+        self._bytes_total -= self._bytes.pop(escenario_id)
+        return True
+
+    def _guardar(self, escenario_id: int, estado: EstadoCredibilidad):
+        """
+        Registra (o vuelve a contabilizar) un estado y desaloja los menos usados hasta respetar el presupuesto.
+        """
+        tamano = estado.bytes
+        with self._lock:
+            self._quitar(escenario_id)
+            if tamano > self.presupuesto_bytes:
+                return
+            self._estados[escenario_id] = estado
+            self._bytes[escenario_id] = tamano
+            self._bytes_total += tamano
+            # El estado recién guardado es el último del LRU y cabe solo: el ciclo nunca lo quita
+            while len(self._estados) > self.max_escenarios or self._bytes_total > self.presupuesto_bytes:
+                self._quitar(next(iter(self._estados)))
+                self._estadisticas["desalojados"] += 1
+
+    def obtener_credibilidad(self, escenario_id: int, datos: EscenarioElectre) -> Optional[np.ndarray]:
+        """
+        Devuelve la matriz de credibilidad del escenario actualizando el estado guardado.
+
+        Returns:
+            Copia de la matriz (n, n) o None si el escenario no cabe en el presupuesto de memoria
+        """
+        n, m = datos.matriz_decision.shape
+        if not self.activo or not self._cabe(n, m):
+            return None
+        with self._lock_de(escenario_id):
+            with self._lock:
+                estado = self._estados.get(escenario_id)
+            try:
+                if estado is None:
+                    estado = EstadoCredibilidad(datos)
+                    clave = "construidos"
+                else:
+                    estado.sincronizar(datos)
+                    clave = "sincronizados"
+            except Exception:
+                # Un estado a medio sincronizar no se puede reutilizar
+                self.invalidar(escenario_id, bloqueado=True)
+                raise
+            credibilidad = estado.credibilidad.copy()
+            self._guardar(escenario_id, estado)
+            with self._lock:
+                self._estadisticas[clave] += 1
+            return credibilidad
+
+    def actualizar_evaluaciones(self, escenario_id: int, cambios: Iterable[Tuple[int, int, float]]):
+        """
+        Parcha el estado del escenario (si existe) después de escribir evaluaciones.
+        """
+        with self._lock_de(escenario_id):
+            with self._lock:
+                estado = self._estados.get(escenario_id)
+            if estado is None:
+                return
+            try:
+                aplicado = estado.actualizar_valores(list(cambios))
+            except Exception as e:
+                logger.warning("Error al actualizar el estado de credibilidad del escenario %s: %s", escenario_id, e)
+                aplicado = False
+            if aplicado:
+                with self._lock:
+                    self._estadisticas["parches_escritura"] += 1
+            else:
+                self.invalidar(escenario_id, bloqueado=True)
+
+    def invalidar(self, escenario_id: int, bloqueado: bool = False):
+        """
+        Descarta el estado del escenario.
+
+        Args:
+            escenario_id: ID del escenario
+            bloqueado: True si quien llama ya tiene el lock del escenario
+        """
+        lock = None if bloqueado else self._lock_de(escenario_id)
+        if lock is not None:
+            lock.acquire()
+        try:
+            with self._lock:
+                if self._quitar(escenario_id):
+                    self._estadisticas["invalidados"] += 1
+        finally:
+            if lock is not None:
+                lock.release()
+
+    def estado(self) -> Dict:
+        with self._lock:
+            estado = dict(self._estadisticas)
+            estado["escenarios"] = len(self._estados)
+            estado["bytes"] = self._bytes_total
+        estado["max_escenarios"] = self.max_escenarios
+        estado["presupuesto_bytes"] = self.presupuesto_bytes
+        return estado
+
+
+estados_credibilidad = RegistroEstadosCredibilidad(
+    max_escenarios=settings.ELECTRE_INCREMENTAL_MAX_ESCENARIOS,
+    presupuesto_bytes=settings.ELECTRE_MEMORIA_MAXIMA_MB * 1024 * 1024,
+)
@@ -0,0 +1,231 @@
+"""
+Registro de la librería nativa ELECTRE III a nivel de proceso.
+
+La librería (y el shim binario si está configurado) se carga una sola vez,
+las funciones de explotación se enlazan y tipan una sola vez, y se llevan
+estadísticas de carga y de llamadas para el endpoint de salud. Un fallo al
+cargar el shim solo deshabilita el motor 'binario'.
+"""
+import ctypes
+import logging
+import os
+import platform
+import threading
+import time
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.utils.electreIII_numpy import METODO_DESTILACION, METODO_FLUJO_NETO
+
+# Función exportada por la librería para cada método de explotación
+FUNCIONES_EXPLOTACION = {
+    METODO_FLUJO_NETO: "ElectreIIIExplotarFlujoNeto",
+    METODO_DESTILACION: "ElectreIIIExplotarDestilacion",
+}
+FUNCION_BINARIA = "ElectreIIIExplotarBinario"
+
+# Problema mínimo usado por la prueba de salud: A1 domina a A2 en el único criterio
+_CSV_PRUEBA = b"-,C1;:A1,1.0;:A2,0.0;:W,1.0;:P,0.2;:I,0.1;:V,0.5;:D,1;:"
+_RESULTADO_PRUEBA = ":A1:1;:A2:-1;"
+
+logger = logging.getLogger(__name__)
+
+
+class RegistroLibreriaElectre:
+    """
+    Mantiene cargada la librería ELECTRE III y sus funciones ya configuradas.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dll = None
+        self._shim = None
+        self._funciones: Dict[str, object] = {}
+        self._punteros: Dict[str, ctypes.c_void_p] = {}
+        self.error_carga: Optional[str] = None
+        self.error_binario: Optional[str] = None
+        self.tiempo_carga: Optional[float] = None
+        self.cargada_en: Optional[float] = None
+        self._estadisticas = {
+            nombre: {"llamadas": 0, "errores": 0, "tiempo_total": 0.0}
+            for nombre in list(FUNCIONES_EXPLOTACION.values()) + [FUNCION_BINARIA]
+        }
+
+    @property
+    def cargada(self) -> bool:
+        return self._dll is not None
+
+    def cargar(self) -> ctypes.CDLL:
+        """
+        Carga la librería y enlaza las funciones de explotación (solo la primera vez).
+
+        Returns:
+            ctypes.CDLL: Instancia de la librería cargada
+        """
+        if self._dll is not None:
+            return self._dll
+
+        with self._lock:
+            if self._dll is not None:
+                return self._dll
+
+            inicio = time.perf_counter()
+            try:
+                if platform.system() == 'Windows':
+                    # En Windows, añadir el directorio de DLLs al path de búsqueda
+                    os.add_dll_directory(settings.DEBUGGER_PATH)
+
+                dll = ctypes.CDLL(settings.DLL_PATH)
+                funciones = {}
+                punteros = {}
+                for metodo, nombre in FUNCIONES_EXPLOTACION.items():
+                    funcion = getattr(dll, nombre)
+                    funcion.argtypes = [ctypes.c_long, ctypes.c_long, ctypes.c_double, ctypes.c_char_p]
+                    funcion.restype = ctypes.c_char_p
+                    funciones[metodo] = funcion
+                    punteros[metodo] = ctypes.cast(funcion, ctypes.c_void_p)
+            except (OSError, AttributeError) as e:
+                self.error_carga = str(e)
+                logger.error("Error al cargar la librería ELECTRE III: %s", e)
+                raise
+
+            self._funciones = funciones
+            self._punteros = punteros
+            self._shim = self._cargar_shim()
+            self._dll = dll
+            self.error_carga = None
+            self.tiempo_carga = time.perf_counter() - inicio
+            self.cargada_en = time.time()
+            logger.info("Librería ELECTRE III cargada en %.2f ms: %s", self.tiempo_carga * 1000, settings.DLL_PATH)
+            return dll
+
+    def _cargar_shim(self) -> Optional[ctypes.CDLL]:
+        """
+        Carga el shim binario si está configurado. Un error solo se registra en
+        error_binario: la librería principal y los motores 'dll' y 'numpy' siguen disponibles.
+
+        Returns:
+            ctypes.CDLL del shim o None si no está configurado o no se pudo cargar
+        """
+        self.error_binario = None
+        if not settings.DLL_BINARIO_PATH:
+            return None
+        try:
+            shim = ctypes.CDLL(settings.DLL_BINARIO_PATH)
+            puntero_double = ctypes.POINTER(ctypes.c_double)
+            binaria = getattr(shim, FUNCION_BINARIA)
+            binaria.argtypes = [
+                ctypes.c_void_p, ctypes.c_long, ctypes.c_long, ctypes.c_double,
+                puntero_double, puntero_double, puntero_double, puntero_double, puntero_double,
+                puntero_double, puntero_double, ctypes.POINTER(ctypes.c_int)
+            ]
+            binaria.restype = ctypes.c_int
+            return shim
+        except (OSError, AttributeError) as e:
+            self.error_binario = str(e)
+            logger.warning("Motor 'binario' deshabilitado, no se pudo cargar el shim %s: %s",
+                           settings.DLL_BINARIO_PATH, e)
+            return None
+
+    def precargar(self) -> bool:
+        """
+        Intenta cargar la librería al iniciar la aplicación sin interrumpir el arranque.
+
+        Returns:
+            True si la librería quedó cargada
+        """
+        try:
+            self.cargar()
+            return True
+        except Exception:
+            return False
+
+    def _registrar(self, nombre: str, inicio: float, error: bool):
+        with self._lock:
+            estadistica = self._estadisticas[nombre]
+            estadistica["llamadas"] += 1
+            estadistica["tiempo_total"] += time.perf_counter() - inicio
+            if error:
+                estadistica["errores"] += 1
+
+    def explotar(self, metodo: str, num_alternativas: int, num_criterios: int,
+                 lambda_corte: float, csv_content: bytes) -> Optional[bytes]:
+        """
+        Llama a ElectreIIIExplotarFlujoNeto o ElectreIIIExplotarDestilacion con el CSV en texto.
+
+        Returns:
+            Resultado en bytes tal como lo retorna la librería
+        """
+        self.cargar()
+        funcion = self._funciones[metodo]
+        inicio = time.perf_counter()
+        error = True
+        try:
+            resultado = funcion(num_alternativas, num_criterios, lambda_corte, csv_content)
+            error = not resultado
+            return resultado
+        finally:
+            self._registrar(FUNCIONES_EXPLOTACION[metodo], inicio, error)
+
+    def explotar_binario(self, metodo: str, num_alternativas: int, num_criterios: int,
+                         lambda_corte: float, *buffers) -> int:
+        """
+        Llama a ElectreIIIExplotarBinario del shim con los buffers ya preparados.
+
+        Returns:
+            Código de estado del shim (0 si todo fue correcto)
+        """
+        self.cargar()
+        if self._shim is None:
+            if self.error_binario:
+                raise ValueError(f"El motor 'binario' no está disponible: {self.error_binario}")
+            raise ValueError("DLL_BINARIO_PATH no está configurado")
+        inicio = time.perf_counter()
+        estado = -1
+        try:
+            estado = getattr(self._shim, FUNCION_BINARIA)(
+                self._punteros[metodo], num_alternativas, num_criterios, lambda_corte, *buffers
+            )
+            return estado
+        finally:
+            self._registrar(FUNCION_BINARIA, inicio, estado != 0)
+
+    def estadisticas(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {nombre: dict(valores) for nombre, valores in self._estadisticas.items()}
+
+    def salud(self) -> Dict:
+        """
+        Verifica que la librería responda con un problema mínimo de resultado conocido.
+
+        Returns:
+            Dict con el estado de la librería, tiempos de carga y contadores de llamadas
+        """
+        estado = {
+            "dll_path": settings.DLL_PATH,
+            "binario_configurado": bool(settings.DLL_BINARIO_PATH),
+            "cargada": False,
+            "operativa": False,
+        }
+        try:
+            self.cargar()
+            estado["cargada"] = True
+            inicio = time.perf_counter()
+            resultado = self.explotar(METODO_FLUJO_NETO, 2, 1, -1, _CSV_PRUEBA)
+            estado["tiempo_prueba_ms"] = (time.perf_counter() - inicio) * 1000
+            estado["operativa"] = resultado is not None and resultado.decode('utf-8') == _RESULTADO_PRUEBA
+            if not estado["operativa"]:
+                estado["error"] = f"Resultado inesperado en la prueba: {resultado!r}"
+        except Exception as e:
+            estado["error"] = str(e)
+
+        estado["tiempo_carga_ms"] = self.tiempo_carga * 1000 if self.tiempo_carga is not None else None
+        estado["cargada_en"] = self.cargada_en
+        estado["binario_cargado"] = self._shim is not None
+        if self.error_binario:
+            estado["error_binario"] = self.error_binario
+        estado["llamadas"] = self.estadisticas()
+        return estado
+
+
+registro_electre = RegistroLibreriaElectre()
@@ -0,0 +1,632 @@
+"""
+Motor ELECTRE III vectorizado con NumPy.
+
+Reproduce el cálculo de la librería nativa (ELECTREIIISL) sin pasar por el
+CSV en texto: las matrices de concordancia, discordancia y credibilidad se
+calculan con broadcasting sobre todos los pares de alternativas, recorriendo
+los criterios en el mismo orden que la librería para obtener exactamente los
+mismos valores en punto flotante.
+"""
+import tempfile
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+METODO_FLUJO_NETO = "flujo_neto"
+METODO_DESTILACION = "destilacion"
+
+# La librería nativa compara contra lambda con una tolerancia de 0.0005 en precisión simple
+_EPSILON_LAMBDA = float(np.float32(0.0005))
+# Arreglos (filas, n) float64 que conviven al calcular un bloque de credibilidad, incluidos temporales
+_ARREGLOS_POR_BLOQUE = 10
+
+
+def preparar_datos_electre3(alternativas_matriz, pesos, preferencia, indiferencia,
+                            veto, direccion) -> Tuple[np.ndarray, ...]:
+    """
+    Convierte los datos de entrada a arreglos float64 contiguos y valida sus dimensiones.
+
+    Args:
+        alternativas_matriz: matriz de alternativas (lista de listas o np.ndarray)
+        pesos: lista de pesos (W)
+        preferencia: lista de umbrales de preferencia (P)
+        indiferencia: lista de umbrales de indiferencia (I/Q)
+        veto: lista de umbrales de veto (V)
+        direccion: lista de dirección (1=beneficio, otro valor=costo)
+
+    Returns:
+        Tupla (matriz, pesos, preferencia, indiferencia, veto, beneficio)
+    """
+    matriz = np.ascontiguousarray(alternativas_matriz, dtype=np.float64)
+    if matriz.ndim != 2:
+        raise ValueError("La matriz de alternativas debe ser bidimensional")
+
+    num_criterios = matriz.shape[1]
+    vectores = []
+    for param, nombre in zip([pesos, preferencia, indiferencia, veto, direccion],
+                             ['pesos', 'preferencia', 'indiferencia', 'veto', 'direccion']):
+        vector = np.ascontiguousarray(param, dtype=np.float64).reshape(-1)
+        if len(vector) != num_criterios:
+            raise ValueError(f"La longitud de {nombre} ({len(vector)}) no coincide con el número de criterios ({num_criterios})")
+        vectores.append(vector)
+
+    # La librería lee D con strtol: solo la parte entera igual a 1 indica beneficio
+    beneficio = np.trunc(vectores[4]) == 1
+    return matriz, vectores[0], vectores[1], vectores[2], vectores[3], beneficio
+
+
+def _indices_diagonal(filas: slice, columnas: slice, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Posiciones (locales al bloque) de los elementos de la diagonal global que caen en el bloque.
+    """
+    i0, i1, _ = filas.indices(n)
+    j0, j1, _ = columnas.indices(n)
+    comunes = np.arange(max(i0, j0), min(i1, j1))
+    return comunes - i0, comunes - j0
+
+
+def concordancia_criterio(valores: np.ndarray, p: float, q: float, beneficio: bool,
+                          filas: slice = slice(None), columnas: slice = slice(None)) -> np.ndarray:
+    """
+    Calcula el índice de concordancia parcial c_j(a, b) de un criterio para todos los pares.
+
+    Args:
+        valores: columna de la matriz de decisión para el criterio (n,)
+        p: umbral de preferencia
+        q: umbral de indiferencia
+        beneficio: True si el criterio se maximiza
+        filas, columnas: bloque de alternativas a y b a calcular (por defecto todas)
+
+    Returns:
+        Matriz (filas, columnas) con c_j(a, b), filas = a, columnas = b
+    """
+    ga = valores[filas, None]
+    gb = valores[None, columnas]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if beneficio:
+            return np.where(ga + q >= gb, 1.0,
+                            np.where(gb > ga + p, 0.0, ((ga - gb) + p) / (p - q)))
+        return np.where(gb >= ga - q, 1.0,
+                        np.where(ga - p > gb, 0.0, ((gb - ga) + p) / (p - q)))
+
+
+def discordancia_criterio(valores: np.ndarray, p: float, v: float, beneficio: bool,
+                          filas: slice = slice(None), columnas: slice = slice(None)) -> np.ndarray:
+    """
+    Calcula el índice de discordancia d_j(a, b) de un criterio para todos los pares.
+
+    Args:
+        valores: columna de la matriz de decisión para el criterio (n,)
+        p: umbral de preferencia
+        v: umbral de veto
+        beneficio: True si el criterio se maximiza
+        filas, columnas: bloque de alternativas a y b a calcular (por defecto todas)
+
+    Returns:
+        Matriz (filas, columnas) con d_j(a, b); la diagonal vale 1 como en la librería nativa
+    """
+    ga = valores[filas, None]
+    gb = valores[None, columnas]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if beneficio:
+            d = np.where(ga + p >= gb, 0.0,
+                         np.where(gb > v + ga, 1.0, ((gb - ga) - p) / (v - p)))
+        else:
+            d = np.where(gb >= ga - p, 0.0,
+                         np.where(ga - v > gb, 1.0, ((ga - gb) - p) / (v - p)))
+    d[_indices_diagonal(filas, columnas, len(valores))] = 1.0
+    return d
+
+
+def calcular_matriz_concordancia(matriz: np.ndarray, pesos: np.ndarray, preferencia: np.ndarray,
+                                 indiferencia: np.ndarray, beneficio: np.ndarray,
+                                 filas: slice = slice(None), columnas: slice = slice(None)) -> np.ndarray:
+    """
+    Calcula la matriz de concordancia global C(a, b) = sum(w_j * c_j) / sum(w_j).
+
+    Returns:
+        Matriz (filas, columnas) de concordancia con diagonal 1
+    """
+    n, m = matriz.shape
+    suma_ponderada = np.zeros((len(range(*filas.indices(n))), len(range(*columnas.indices(n)))))
+    suma_pesos = 0.0
+    # Se acumula criterio por criterio para respetar el orden de sumas de la librería
+    for j in range(m):
+        c = concordancia_criterio(matriz[:, j], preferencia[j], indiferencia[j], beneficio[j], filas, columnas)
+        suma_pesos += pesos[j]
+        suma_ponderada += c * pesos[j]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        concordancia = suma_ponderada / suma_pesos
+    concordancia[_indices_diagonal(filas, columnas, n)] = 1.0
+    return concordancia
+
+
+def calcular_matriz_credibilidad(matriz: np.ndarray, pesos: np.ndarray, preferencia: np.ndarray,
+                                 indiferencia: np.ndarray, veto: np.ndarray, beneficio: np.ndarray,
+                                 filas: slice = slice(None), columnas: slice = slice(None)) -> np.ndarray:
+    """
+    Calcula la matriz de credibilidad S(a, b) de ELECTRE III (o solo un bloque de ella).
+
+    La discordancia de cada criterio se calcula y se aplica de inmediato, por lo
+    que la memoria usada es O(filas * columnas) independientemente del número de criterios.
+
+    Returns:
+        Matriz (filas, columnas) de credibilidad
+    """
+    concordancia = calcular_matriz_concordancia(matriz, pesos, preferencia, indiferencia, beneficio,
+                                                filas, columnas)
+    factor = np.ones_like(concordancia)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for j in range(matriz.shape[1]):
+            d = discordancia_criterio(matriz[:, j], preferencia[j], veto[j], beneficio[j], filas, columnas)
+            factor = np.where(d > concordancia, factor * (1.0 - d) / (1.0 - concordancia), factor)
+    return concordancia * factor
+
+
+def filas_por_bloque(n: int, presupuesto_bytes: int) -> int:
+    """
+    Número de filas de cada bloque (filas, n) para que el cálculo quepa en el presupuesto de memoria.
+    """
+    return int(max(1, min(n, presupuesto_bytes // (_ARREGLOS_POR_BLOQUE * 8 * max(n, 1)))))
+
+
+def requiere_bloques(n: int, presupuesto_bytes: Optional[int]) -> bool:
+    """
+    Indica si el cálculo completo de n x n no cabe en el presupuesto de memoria.
+    """
+    return bool(presupuesto_bytes) and _ARREGLOS_POR_BLOQUE * 8 * n * n > presupuesto_bytes
+
+
+def calcular_matriz_credibilidad_por_bloques(matriz: np.ndarray, pesos: np.ndarray, preferencia: np.ndarray,
+                                             indiferencia: np.ndarray, veto: np.ndarray,
+                                             beneficio: np.ndarray, presupuesto_bytes: int,
+                                             directorio_memmap: Optional[str] = None) -> np.ndarray:
+    """
+    Calcula la matriz de credibilidad por bloques de filas dentro de un presupuesto de memoria.
+
+    Si la matriz completa ocupa más de la mitad del presupuesto se guarda en un
+    archivo temporal mapeado en memoria (np.memmap); el archivo se borra solo al
+    liberar el arreglo.
+
+    Args:
+        matriz, pesos, preferencia, indiferencia, veto, beneficio: datos de preparar_datos_electre3
+        presupuesto_bytes: memoria máxima para el cálculo
+        directorio_memmap: directorio del archivo temporal (por defecto el del sistema)
+
+    Returns:
+        Matriz (n, n) de credibilidad (np.ndarray o np.memmap), idéntica a calcular_matriz_credibilidad
+    """
+    n = matriz.shape[0]
+    tamano = n * n * 8
+    if tamano <= presupuesto_bytes // 2:
+        credibilidad = np.empty((n, n), dtype=np.float64)
+        trabajo = presupuesto_bytes - tamano
+    else:
+        # TemporaryFile ya no tiene nombre en disco: el espacio se libera al cerrar el mapeo
+        archivo = tempfile.TemporaryFile(dir=directorio_memmap, suffix='.credibilidad')
+        credibilidad = np.memmap(archivo, dtype=np.float64, mode='w+', shape=(n, n))
+        trabajo = presupuesto_bytes
+
+    paso = filas_por_bloque(n, trabajo)
+    for inicio in range(0, n, paso):
+        filas = slice(inicio, min(n, inicio + paso))
+        credibilidad[filas] = calcular_matriz_credibilidad(matriz, pesos, preferencia, indiferencia,
+                                                           veto, beneficio, filas)
+    if isinstance(credibilidad, np.memmap):
+        credibilidad.flush()
+    return credibilidad
+
+
+def calcular_matriz_t(credibilidad: np.ndarray, lambda_corte: float,
+                      activos: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Construye la matriz de superación nítida T a partir de la credibilidad.
+
+    Con lambda_corte == -1 se usa el nivel de corte automático de la librería
+    (lambda máximo menos el umbral de discriminación 0.3 - 0.15 * lambda);
+    en otro caso T(a, b) = S(a, b) > lambda_corte.
+
+    Args:
+        credibilidad: matriz S (n, n)
+        lambda_corte: valor de corte lambda
+        activos: máscara opcional de alternativas que participan (destilación)
+
+    Returns:
+        Matriz booleana (n, n) con diagonal en False
+    """
+    n = credibilidad.shape[0]
+    mascara = ~np.eye(n, dtype=bool)
+    if activos is not None:
+        mascara &= activos[:, None] & activos[None, :]
+
+    if lambda_corte != -1:
+        return mascara & (credibilidad > lambda_corte)
+
+    valores = credibilidad[mascara]
+    # La librería guarda lambda máximo en precisión simple
+    lambda_max = float(np.float32(max(0.0, valores.max()))) if valores.size else 0.0
+    lambda_limite = float(np.float32(lambda_max - (0.3 - 0.15 * lambda_max)))
+    candidatos = valores[(valores > -1) & (lambda_limite > valores)
+                         & ~(_EPSILON_LAMBDA > np.abs(valores - lambda_limite))]
+    lambda_efectivo = float(candidatos.max()) if candidatos.size else -1.0
+
+    discriminacion = (credibilidad - credibilidad.T) > (0.3 - 0.15 * credibilidad)
+    return (mascara & (credibilidad > lambda_efectivo)
+            & ~(_EPSILON_LAMBDA > np.abs(credibilidad - lambda_efectivo))
+            & discriminacion)
+
+
+def explotar_flujo_neto(credibilidad: np.ndarray, lambda_corte: float) -> np.ndarray:
+    """
+    Calcula el flujo neto (superaciones dadas menos recibidas) de cada alternativa.
+
+    Returns:
+        Arreglo (n,) de enteros con el flujo neto
+    """
+    t = calcular_matriz_t(credibilidad, lambda_corte)
+    return t.sum(axis=1, dtype=np.int64) - t.sum(axis=0, dtype=np.int64)
+
+
+def explotar_flujo_neto_por_bloques(obtener_filas: Callable[[int, int], np.ndarray], n: int,
+                                    lambda_corte: float, paso: int,
+                                    obtener_columnas: Optional[Callable[[int, int], np.ndarray]] = None) -> np.ndarray:
+    """
+    Flujo neto acumulando sumas por filas y por columnas de T bloque a bloque, sin tener T completa.
+
+    Con lambda_corte == -1 se hacen dos pasadas previas para obtener el corte
+    automático y la discriminación necesita también el bloque transpuesto S(b, a).
+
+    Args:
+        obtener_filas: función (inicio, fin) -> S[inicio:fin, :]
+        n: número de alternativas
+        lambda_corte: valor de corte lambda
+        paso: filas por bloque
+        obtener_columnas: función (inicio, fin) -> S[:, inicio:fin] (solo para lambda_corte == -1)
+
+    Returns:
+        Arreglo (n,) de enteros, igual a explotar_flujo_neto
+    """
+    rangos = [(inicio, min(n, inicio + paso)) for inicio in range(0, n, paso)]
+
+    def bloques():
+        for inicio, fin in rangos:
+            bloque = np.asarray(obtener_filas(inicio, fin), dtype=np.float64)
+            mascara = np.ones(bloque.shape, dtype=bool)
+            mascara[_indices_diagonal(slice(inicio, fin), slice(None), n)] = False
+            yield inicio, fin, bloque, mascara
+
+    if lambda_corte == -1:
+        maximo = max((float(b[m].max()) for _, _, b, m in bloques() if m.any()), default=None)
+        lambda_max = float(np.float32(max(0.0, maximo))) if maximo is not None else 0.0
+        lambda_limite = float(np.float32(lambda_max - (0.3 - 0.15 * lambda_max)))
+        lambda_efectivo = -1.0
+        for _, _, bloque, mascara in bloques():
+            valores = bloque[mascara]
+            candidatos = valores[(valores > -1) & (lambda_limite > valores)
+                                 & ~(_EPSILON_LAMBDA > np.abs(valores - lambda_limite))]
+            if candidatos.size:
+                lambda_efectivo = max(lambda_efectivo, float(candidatos.max()))
+
+    salientes = np.zeros(n, dtype=np.int64)
+    entrantes = np.zeros(n, dtype=np.int64)
+    for inicio, fin, bloque, mascara in bloques():
+        if lambda_corte != -1:
+            t = mascara & (bloque > lambda_corte)
+        else:
+            transpuesto = np.asarray(obtener_columnas(inicio, fin), dtype=np.float64).T
+            discriminacion = (bloque - transpuesto) > (0.3 - 0.15 * bloque)
+            t = (mascara & (bloque > lambda_efectivo)
+                 & ~(_EPSILON_LAMBDA > np.abs(bloque - lambda_efectivo))
+                 & discriminacion)
+        salientes[inicio:fin] = t.sum(axis=1, dtype=np.int64)
+        entrantes += t.sum(axis=0, dtype=np.int64)
+    return salientes - entrantes
+
+
+def _seleccionar_extremos(t: np.ndarray, activos: np.ndarray, ascendente: bool) -> Tuple[np.ndarray, bool]:
+    """
+    Califica las alternativas activas y marca las de calificación extrema.
+
+    Replica RankearTmp de la librería: la búsqueda del máximo parte de 0 y la
+    del mínimo de 10, y se sigue refinando mientras haya empate entre varias.
+
+    Returns:
+        Tupla (alternativas seleccionadas, continuar destilación interna)
+    """
+    calificacion = (t.sum(axis=1) - t.sum(axis=0)).astype(np.float32)
+    calificacion[~activos] = 0
+    if not calificacion.any():
+        return activos, False
+
+    if ascendente:
+        extremo = min(np.float32(10.0), calificacion[activos].min())
+    else:
+        extremo = max(np.float32(0.0), calificacion[activos].max())
+    seleccion = calificacion == extremo
+    return seleccion, bool(seleccion.sum() > 1 and extremo != 0)
+
+
+def _destilar(credibilidad: np.ndarray, lambda_corte: float, ascendente: bool) -> np.ndarray:
+    """
+    Ejecuta una destilación (descendente o ascendente) y devuelve el rango de cada alternativa.
+
+    Returns:
+        Arreglo (n,) con el rango; 1 es la mejor posición en ambos sentidos
+    """
+    n = credibilidad.shape[0]
+    pendientes = np.ones(n, dtype=bool)
+    rangos = np.zeros(n)
+    k = 2
+    while True:
+        activos = pendientes.copy()
+        continuar = True
+        while continuar:
+            t = calcular_matriz_t(credibilidad, lambda_corte, activos)
+            activos, continuar = _seleccionar_extremos(t, activos, ascendente)
+
+        if not activos.any():
+            raise ValueError("La destilación no pudo extraer ninguna alternativa")
+        pendientes[activos] = False
+        rangos[activos] = k - 1
+
+        sin_rango = np.flatnonzero(rangos == 0)
+        if len(sin_rango) == 1:
+            rangos[sin_rango[-1]] = k
+        if not (rangos == 0).any():
+            break
+        k += 1
+
+    if ascendente:
+        rangos = (int(rangos.max()) + 1) - rangos
+    return rangos
+
+
+def explotar_destilacion(credibilidad: np.ndarray, lambda_corte: float) -> np.ndarray:
+    """
+    Combina las destilaciones descendente y ascendente en el preorden final.
+
+    Returns:
+        Arreglo (n,) con el número de alternativas que cada una supera
+        estrictamente en el preorden final (mayor es mejor)
+    """
+    descendente = _destilar(credibilidad, lambda_corte, ascendente=False)
+    ascendente = _destilar(credibilidad, lambda_corte, ascendente=True)
+
+    da, db = descendente[:, None], descendente[None, :]
+    aa, ab = ascendente[:, None], ascendente[None, :]
+    preferida = ((da < db) & (aa <= ab)) | ((da == db) & (aa < ab))
+    np.fill_diagonal(preferida, False)
+    return preferida.sum(axis=1)
+
+
+def explotar(credibilidad: np.ndarray, lambda_corte: float, metodo: str) -> np.ndarray:
+    """
+    Aplica el método de explotación indicado sobre una matriz de credibilidad.
+
+    Returns:
+        Arreglo (n,) con el valor de cada alternativa según el método
+    """
+    if metodo == METODO_FLUJO_NETO:
+        return explotar_flujo_neto(credibilidad, lambda_corte)
+    if metodo == METODO_DESTILACION:
+        return explotar_destilacion(credibilidad, lambda_corte)
+    raise ValueError(f"Método de explotación desconocido: {metodo}")
+
+
+def barrido_lambda(credibilidad: np.ndarray, lambdas: Sequence[float],
+                   metodo: str) -> List[Tuple[np.ndarray, Optional[float], Optional[float]]]:
+    """
+    Explota una misma matriz de credibilidad para varios valores de lambda.
+
+    Con un lambda fijo T(a, b) = S(a, b) > lambda, así que todos los lambdas entre
+    dos valores consecutivos de S producen la misma T: cada tramo se explota una sola vez.
+
+    Args:
+        credibilidad: matriz S (n, n)
+        lambdas: valores de corte a evaluar (-1 para el corte automático)
+        metodo: METODO_FLUJO_NETO o METODO_DESTILACION
+
+    Returns:
+        Lista (valores, desde, hasta) por lambda; [desde, hasta) es el rango exacto de
+        lambdas con la misma T (None si no está acotado o si lambda es -1)
+    """
+    n = credibilidad.shape[0]
+    unicos = np.unique(credibilidad[~np.eye(n, dtype=bool)])
+    calculados = {}
+    resultados = []
+    for lambda_corte in lambdas:
+        if lambda_corte == -1:
+            clave, desde, hasta = "auto", None, None
+        else:
+            clave = int(np.searchsorted(unicos, lambda_corte, side='right'))
+            desde = float(unicos[clave - 1]) if clave > 0 else None
+            hasta = float(unicos[clave]) if clave < len(unicos) else None
+        if clave not in calculados:
+            calculados[clave] = explotar(credibilidad, lambda_corte, metodo)
+        resultados.append((calculados[clave], desde, hasta))
+    return resultados
+
+
+def ordenar_ranking(nombres: Sequence[str], valores: np.ndarray, metodo: str) -> List[str]:
+    """
+    Ordena las alternativas por su valor; los empates quedan por posición en la matriz
+    (orden de id de alternativa al cargar desde la BD). Todos los motores (dll, numpy y
+    binario) ordenan con esta función, así que el ranking no depende del motor.
+
+    Args:
+        nombres: nombres de las alternativas en el orden de la matriz
+        valores: flujo neto o resultado de destilación por alternativa
+        metodo: METODO_FLUJO_NETO o METODO_DESTILACION
+
+    Returns:
+        Lista de nombres ordenada
+    """
+    # sorted es estable: con reverse=True los empates conservan el orden de posición
+    orden = sorted(range(len(nombres)), key=lambda i: valores[i], reverse=True)
+    if metodo == METODO_DESTILACION:
+        orden = sorted(orden, key=lambda i: valores[i])
+    return [nombres[i] for i in orden]
+
+
+def ejecutar_electre3_numpy(alternativas_matriz, pesos, preferencia, indiferencia, veto,
+                            direccion, lambda_corte, nombres_alternativas=None,
+                            metodo: str = METODO_FLUJO_NETO, presupuesto_bytes: Optional[int] = None,
+                            directorio_memmap: Optional[str] = None) -> List[str]:
+    """
+    Ejecuta ELECTRE III completo con el motor NumPy.
+
+    Args:
+        alternativas_matriz: matriz de alternativas (lista de listas o np.ndarray)
+        pesos, preferencia, indiferencia, veto, direccion: parámetros por criterio
+        lambda_corte: valor de corte lambda (-1 para el corte automático)
+        nombres_alternativas: nombres de las alternativas (por defecto A1, A2, ...)
+        metodo: METODO_FLUJO_NETO o METODO_DESTILACION
+        presupuesto_bytes: memoria máxima; si el cálculo completo no cabe se hace por bloques
+        directorio_memmap: directorio para la matriz de credibilidad en disco cuando no cabe en memoria
+
+    Returns:
+        Lista de alternativas ordenadas (empates por posición, ver ordenar_ranking)
+    """
+    matriz, w, p, q, v, beneficio = preparar_datos_electre3(
+        alternativas_matriz, pesos, preferencia, indiferencia, veto, direccion
+    )
+    n = matriz.shape[0]
+    if not nombres_alternativas:
+        nombres_alternativas = [f"A{i+1}" for i in range(n)]
+    if len(nombres_alternativas) != n:
+        raise ValueError("El número de nombres no coincide con las filas de la matriz")
+
+    if not requiere_bloques(n, presupuesto_bytes):
+        credibilidad = calcular_matriz_credibilidad(matriz, w, p, q, v, beneficio)
+        return ordenar_ranking(nombres_alternativas, explotar(credibilidad, lambda_corte, metodo), metodo)
+
+    credibilidad = calcular_matriz_credibilidad_por_bloques(matriz, w, p, q, v, beneficio,
+                                                           presupuesto_bytes, directorio_memmap)
+    if metodo == METODO_FLUJO_NETO:
+        valores = explotar_flujo_neto_por_bloques(
+            lambda inicio, fin: credibilidad[inicio:fin], n, lambda_corte,
+            filas_por_bloque(n, presupuesto_bytes // 2),
+            lambda inicio, fin: credibilidad[:, inicio:fin]
+        )
+    else:
+        # La destilación recorre T completa en cada iteración: se carga la matriz
+        valores = explotar(np.asarray(credibilidad), lambda_corte, metodo)
+    return ordenar_ranking(nombres_alternativas, valores, metodo)
+
+
+def calcular_flujo_neto_en_flujo(matriz: np.ndarray, pesos: np.ndarray, preferencia: np.ndarray,
+                                 indiferencia: np.ndarray, veto: np.ndarray, beneficio: np.ndarray,
+                                 lambda_corte: float, paso: int) -> np.ndarray:
+    """
+    Flujo neto sin guardar la matriz de credibilidad: cada bloque de filas (y su bloque
+    transpuesto cuando lambda es -1) se recalcula al vuelo, así la memoria es O(paso * n).
+
+    Returns:
+        Arreglo (n,) de enteros, igual a explotar_flujo_neto sobre la matriz completa
+    """
+    n = matriz.shape[0]
+    return explotar_flujo_neto_por_bloques(
+        lambda inicio, fin: calcular_matriz_credibilidad(matriz, pesos, preferencia, indiferencia, veto,
+                                                         beneficio, slice(inicio, fin)),
+        n, lambda_corte, paso,
+        lambda inicio, fin: calcular_matriz_credibilidad(matriz, pesos, preferencia, indiferencia, veto,
+                                                         beneficio, slice(None), slice(inicio, fin))
+    )
+
+
+def ejecutar_electre3_numpy_flujo_neto_puntajes(alternativas_matriz, pesos, preferencia, indiferencia,
+                                               veto, direccion, lambda_corte, nombres_alternativas=None,
+                                               presupuesto_bytes: Optional[int] = None) -> Dict:
+    """
+    Ranking de flujo neto con el puntaje de cada alternativa, en memoria lineal en n.
+
+    Args:
+        alternativas_matriz: matriz de alternativas (lista de listas o np.ndarray)
+        pesos, preferencia, indiferencia, veto, direccion: parámetros por criterio
+        lambda_corte: valor de corte lambda (-1 para el corte automático)
+        nombres_alternativas: nombres de las alternativas (por defecto A1, A2, ...)
+        presupuesto_bytes: memoria para los bloques (por defecto bloques de 256 filas)
+
+    Returns:
+        Dict con 'ranking' (ordenado con ordenar_ranking) y 'puntajes' (flujo neto por alternativa)
+    """
+    matriz, w, p, q, v, beneficio = preparar_datos_electre3(
+        alternativas_matriz, pesos, preferencia, indiferencia, veto, direccion
+    )
+    n = matriz.shape[0]
+    if not nombres_alternativas:
+        nombres_alternativas = [f"A{i+1}" for i in range(n)]
+    if len(nombres_alternativas) != n:
+        raise ValueError("El número de nombres no coincide con las filas de la matriz")
+
+    paso = filas_por_bloque(n, presupuesto_bytes) if presupuesto_bytes else min(n, 256)
+    flujo = calcular_flujo_neto_en_flujo(matriz, w, p, q, v, beneficio, lambda_corte, max(paso, 1))
+    return {
+        'ranking': ordenar_ranking(nombres_alternativas, flujo, METODO_FLUJO_NETO),
+        'puntajes': {nombre: int(valor) for nombre, valor in zip(nombres_alternativas, flujo)},
+    }
+
+
+def concordancia_rankings(valores_a: np.ndarray, valores_b: np.ndarray) -> Optional[float]:
+    """
+    Tau-b de Kendall entre dos puntajes por alternativa (mayor es mejor en ambos), con empates.
+
+    Returns:
+        Valor en [-1, 1] (1 = mismo orden) o None si alguno de los puntajes es constante
+    """
+    a = np.asarray(valores_a, dtype=np.float64)
+    b = np.asarray(valores_b, dtype=np.float64)
+    superior = np.triu(np.ones((a.size, a.size), dtype=bool), k=1)
+    signo_a = np.sign(a[:, None] - a[None, :])[superior]
+    signo_b = np.sign(b[:, None] - b[None, :])[superior]
+    denominador = np.sqrt(np.count_nonzero(signo_a) * np.count_nonzero(signo_b))
+    if denominador == 0:
+        return None
+    return float(np.sum(signo_a * signo_b) / denominador)
+
+
+def ejecutar_electre3_numpy_combinado(alternativas_matriz, pesos, preferencia, indiferencia, veto,
+                                      direccion, lambda_corte, nombres_alternativas=None,
+                                      credibilidad: Optional[np.ndarray] = None) -> Dict:
+    """
+    Calcula la matriz de credibilidad una sola vez y la explota con flujo neto y con destilación.
+
+    Args:
+        alternativas_matriz: matriz de alternativas (lista de listas o np.ndarray)
+        pesos, preferencia, indiferencia, veto, direccion: parámetros por criterio
+        lambda_corte: valor de corte lambda (-1 para el corte automático)
+        nombres_alternativas: nombres de las alternativas (por defecto A1, A2, ...)
+        credibilidad: matriz de credibilidad ya calculada (opcional)
+
+    Returns:
+        Dict con ambos rankings, el puntaje de cada alternativa por método y la concordancia entre ellos
+    """
+    matriz, w, p, q, v, beneficio = preparar_datos_electre3(
+        alternativas_matriz, pesos, preferencia, indiferencia, veto, direccion
+    )
+    if not nombres_alternativas:
+        nombres_alternativas = [f"A{i+1}" for i in range(matriz.shape[0])]
+    if len(nombres_alternativas) != matriz.shape[0]:
+        raise ValueError("El número de nombres no coincide con las filas de la matriz")
+
+    if credibilidad is None:
+        credibilidad = calcular_matriz_credibilidad(matriz, w, p, q, v, beneficio)
+    flujo = explotar_flujo_neto(credibilidad, lambda_corte)
+    destilacion = explotar_destilacion(credibilidad, lambda_corte)
+    ranking_flujo = ordenar_ranking(nombres_alternativas, flujo, METODO_FLUJO_NETO)
+    ranking_destilacion = ordenar_ranking(nombres_alternativas, destilacion, METODO_DESTILACION)
+
+    return {
+        METODO_FLUJO_NETO: ranking_flujo,
+        METODO_DESTILACION: ranking_destilacion,
+        'puntajes': {
+            METODO_FLUJO_NETO: {nombre: int(valor) for nombre, valor in zip(nombres_alternativas, flujo)},
+            METODO_DESTILACION: {nombre: int(valor) for nombre, valor in zip(nombres_alternativas, destilacion)},
+        },
+        'concordancia': {
+            # Ambos puntajes son "mayor es mejor" (el ranking de destilación se lista de menor a mayor)
+            'kendall_tau': concordancia_rankings(flujo, destilacion),
+            'mejores_flujo_neto': [nombres_alternativas[i] for i in np.flatnonzero(flujo == flujo.max())],
+            'mejores_destilacion': [nombres_alternativas[i] for i in np.flatnonzero(destilacion == destilacion.max())],
+        },
+    }
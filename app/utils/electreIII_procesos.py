@@ -0,0 +1,239 @@
+"""
+Pool de procesos aislados para ELECTRE III.
+
+Cada proceso precarga la librería nativa y recibe la matriz de decisión y los
+umbrales por memoria compartida. Si la librería se cae (segfault) o no termina
+dentro del tiempo límite, solo se pierde ese proceso: se termina y se levanta
+otro en su lugar, y la API sigue respondiendo.
+"""
+import atexit
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.electreIII_numpy import preparar_datos_electre3
+
+logger = logging.getLogger(__name__)
+
+
+class ProcesoElectreError(RuntimeError):
+    """El proceso de ELECTRE III terminó inesperadamente o fue cancelado."""
+
+
+def _bucle_trabajador(conexion):
+    """
+    Bucle principal de cada proceso: precarga la librería y atiende tareas hasta recibir None.
+    """
+    from app.utils.electreIII import ejecutar_electre3_local
+    from app.utils.electreIII_libreria import registro_electre
+
+    registro_electre.precargar()
+    while True:
+        try:
+            tarea = conexion.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if tarea is None:
+            break
+
+        nombre_memoria, n, m, lambda_corte, nombres, metodo, motor = tarea
+        try:
+            # Los procesos comparten el resource_tracker del principal, que es quien libera el bloque
+            memoria = shared_memory.SharedMemory(name=nombre_memoria)
+            try:
+                datos = np.ndarray(n * m + 5 * m, dtype=np.float64, buffer=memoria.buf).copy()
+            finally:
+                memoria.close()
+
+            matriz = datos[:n * m].reshape(n, m)
+            pesos, preferencia, indiferencia, veto, direccion = datos[n * m:].reshape(5, m)
+            ranking = ejecutar_electre3_local(
+                motor, matriz, pesos, preferencia, indiferencia, veto, direccion,
+                lambda_corte, nombres, metodo
+            )
+            conexion.send(("ok", ranking))
+        except Exception as e:
+            conexion.send(("error", str(e)))
+
+
+class _Trabajador:
+    def __init__(self, contexto):
+        self.conexion, conexion_hijo = contexto.Pipe()
+        self.proceso = contexto.Process(target=_bucle_trabajador, args=(conexion_hijo,), daemon=True)
+        self.proceso.start()
+        conexion_hijo.close()
+
+    def terminar(self):
+        try:
+            self.conexion.close()
+        except OSError:
+            pass
+        if self.proceso.is_alive():
+            self.proceso.terminate()
+            self.proceso.join(1)
+            if self.proceso.is_alive():
+                self.proceso.kill()
+        self.proceso.join(1)
+
+
+class PoolProcesosElectre:
+    """
+    Pool de procesos trabajadores de ELECTRE III con tiempo límite por llamada y reinicio automático.
+    """
+
+    def __init__(self, num_procesos: int, timeout: float):
+        self.num_procesos = num_procesos
+        self.timeout = timeout
+        self._contexto = multiprocessing.get_context("spawn")
+        self._libres: "queue.Queue[_Trabajador]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._iniciado = False
+        self._estadisticas = {
+            "llamadas": 0,
+            "errores": 0,
+            "timeouts": 0,
+            "cancelaciones": 0,
+            "caidas": 0,
+            "reinicios": 0,
+        }
+
+    @property
+    def activo(self) -> bool:
+        return self.num_procesos > 0
+
+    def iniciar(self):
+        """
+        Levanta los procesos trabajadores (solo la primera vez).
+        """
+        with self._lock:
+            if self._iniciado:
+                return
+            for _ in range(self.num_procesos):
+                self._libres.put(_Trabajador(self._contexto))
+            self._iniciado = True
+        atexit.register(self.detener)
+        logger.info("Pool de procesos ELECTRE III iniciado con %d procesos", self.num_procesos)
+
+    def detener(self):
+        """
+        Termina todos los procesos libres del pool.
+        """
+        with self._lock:
+            self._iniciado = False
+        while True:
+            try:
+                trabajador = self._libres.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                trabajador.conexion.send(None)
+            except (OSError, ValueError):
+                pass
+            trabajador.terminar()
+
+    def _contar(self, clave: str):
+        with self._lock:
+            self._estadisticas[clave] += 1
+
+    def _reemplazar(self, trabajador: _Trabajador):
+        trabajador.terminar()
+        self._contar("reinicios")
+        self._libres.put(_Trabajador(self._contexto))
+
+    def ejecutar(self, motor: str, alternativas_matriz, pesos, preferencia, indiferencia, veto,
+                 direccion, lambda_corte, nombres_alternativas=None, metodo: str = "flujo_neto",
+                 timeout: Optional[float] = None,
+                 cancelacion: Optional[threading.Event] = None) -> List[str]:
+        """
+        Ejecuta ELECTRE III en un proceso trabajador.
+
+        Args:
+            motor: 'dll', 'numpy' o 'binario'
+            alternativas_matriz, pesos, preferencia, indiferencia, veto, direccion: datos del problema
+            lambda_corte: valor de corte lambda
+            nombres_alternativas: nombres de las alternativas (opcional)
+            metodo: 'flujo_neto' o 'destilacion'
+            timeout: segundos máximos de la llamada (por defecto settings.ELECTRE_PROCESOS_TIMEOUT)
+            cancelacion: evento opcional; si se activa se termina el proceso y se cancela la llamada
+
+        Returns:
+            Lista de alternativas ordenadas
+        """
+        self.iniciar()
+        matriz, w, p, q, v, _ = preparar_datos_electre3(
+            alternativas_matriz, pesos, preferencia, indiferencia, veto, direccion
+        )
+        d = np.ascontiguousarray(direccion, dtype=np.float64)
+        n, m = matriz.shape
+        limite = time.monotonic() + (timeout or self.timeout)
+        self._contar("llamadas")
+
+        try:
+            trabajador = self._libres.get(timeout=max(0.0, limite - time.monotonic()))
+        except queue.Empty:
+            self._contar("timeouts")
+            raise TimeoutError("No hay procesos de ELECTRE III disponibles")
+
+        memoria = shared_memory.SharedMemory(create=True, size=max(8, (n * m + 5 * m) * 8))
+        sano = False
+        try:
+            datos = np.ndarray(n * m + 5 * m, dtype=np.float64, buffer=memoria.buf)
+            datos[:n * m] = matriz.ravel()
+            datos[n * m:] = np.concatenate([w, p, q, v, d])
+            del datos
+
+            trabajador.conexion.send((
+                memoria.name, n, m, float(lambda_corte),
+                list(nombres_alternativas) if nombres_alternativas else None, metodo, motor
+            ))
+            while True:
+                if cancelacion is not None and cancelacion.is_set():
+                    self._contar("cancelaciones")
+                    raise ProcesoElectreError("Ejecución de ELECTRE III cancelada")
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    self._contar("timeouts")
+                    raise TimeoutError("ELECTRE III superó el tiempo límite de ejecución")
+                if trabajador.conexion.poll(min(restante, 0.1)):
+                    estado, valor = trabajador.conexion.recv()
+                    break
+                if not trabajador.proceso.is_alive():
+                    raise EOFError
+
+            sano = True
+            if estado != "ok":
+                self._contar("errores")
+                raise RuntimeError(valor)
+            return valor
+        except (EOFError, BrokenPipeError, ConnectionResetError):
+            self._contar("caidas")
+            raise ProcesoElectreError("El proceso de ELECTRE III terminó inesperadamente")
+        finally:
+            memoria.close()
+            memoria.unlink()
+            if sano:
+                self._libres.put(trabajador)
+            else:
+                self._reemplazar(trabajador)
+
+    def estado(self) -> Dict:
+        with self._lock:
+            estado = dict(self._estadisticas)
+            estado["iniciado"] = self._iniciado
+        estado["num_procesos"] = self.num_procesos
+        estado["libres"] = self._libres.qsize()
+        estado["timeout"] = self.timeout
+        return estado
+
+
+pool_procesos_electre = PoolProcesosElectre(
+    num_procesos=settings.ELECTRE_PROCESOS,
+    timeout=settings.ELECTRE_PROCESOS_TIMEOUT,
+)
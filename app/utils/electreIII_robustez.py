@@ -0,0 +1,316 @@
+"""
+Análisis de robustez de pesos de ELECTRE III por Monte Carlo (motor NumPy).
+
+Se muestrean vectores de pesos (uniformes en el simplex o alrededor de los pesos
+del escenario) y, opcionalmente, factores que escalan los umbrales P/Q/V. Los
+índices parciales c_j y d_j no dependen de los pesos, así que se calculan una
+sola vez por juego de umbrales y cada lote de pesos solo combina esas pilas.
+Los lotes se reparten entre procesos trabajadores; cada proceso guarda sus
+propias pilas, así que el presupuesto de memoria se divide entre los procesos y
+los análisis se ejecutan de a uno.
+
+Resultados:
+- aceptabilidad de rangos: fracción de muestras en que cada alternativa ocupa
+  cada posición (posición = 1 + alternativas estrictamente mejores, los empates
+  comparten la mejor posición);
+- índices de victoria: fracción de muestras en que una alternativa queda
+  estrictamente por delante de otra.
+"""
+import atexit
+import hashlib
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.electreIII_numpy import (
+    _ARREGLOS_POR_BLOQUE,
+    METODO_DESTILACION,
+    METODO_FLUJO_NETO,
+    concordancia_criterio,
+    discordancia_criterio,
+    explotar,
+    preparar_datos_electre3,
+)
+
+# Máximo de muestras por lote enviado a un proceso
+MAX_MUESTRAS_POR_LOTE = 256
+
+# Pilas c_j / d_j del último juego de umbrales calculado en este proceso
+_pilas_trabajador: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+
+def calcular_pilas_criterios(matriz: np.ndarray, preferencia: np.ndarray, indiferencia: np.ndarray,
+                             veto: np.ndarray, beneficio: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula los índices parciales de concordancia y discordancia de todos los criterios.
+
+    Returns:
+        Tupla (c, d) de arreglos (m, n, n)
+    """
+    m = matriz.shape[1]
+    c = np.stack([concordancia_criterio(matriz[:, j], preferencia[j], indiferencia[j], beneficio[j])
+                  for j in range(m)])
+    d = np.stack([discordancia_criterio(matriz[:, j], preferencia[j], veto[j], beneficio[j])
+                  for j in range(m)])
+    return c, d
+
+
+def credibilidad_por_lote(c: np.ndarray, d: np.ndarray, pesos: np.ndarray) -> np.ndarray:
+    """
+    Calcula la matriz de credibilidad para un lote de vectores de pesos.
+
+    Se acumula criterio por criterio en el mismo orden que calcular_matriz_credibilidad,
+    por lo que con los pesos del escenario se obtiene la misma matriz.
+
+    Args:
+        c, d: pilas (m, n, n) de concordancia y discordancia parciales
+        pesos: lote de pesos (B, m)
+
+    Returns:
+        Arreglo (B, n, n) con la credibilidad de cada muestra
+    """
+    m, n, _ = c.shape
+    suma_ponderada = np.zeros((pesos.shape[0], n, n))
+    suma_pesos = np.zeros(pesos.shape[0])
+    for j in range(m):
+        suma_pesos += pesos[:, j]
+        suma_ponderada += c[j] * pesos[:, j, None, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        concordancia = suma_ponderada / suma_pesos[:, None, None]
+        concordancia[:, np.arange(n), np.arange(n)] = 1.0
+        factor = np.ones_like(concordancia)
+        for j in range(m):
+            factor = np.where(d[j] > concordancia, factor * (1.0 - d[j]) / (1.0 - concordancia), factor)
+    return concordancia * factor
+
+
+def contar_rangos(valores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cuenta posiciones y victorias por pares de un lote de resultados de explotación.
+
+    Args:
+        valores: arreglo (B, n) con el valor de cada alternativa (mayor es mejor)
+
+    Returns:
+        Tupla (aceptabilidad, victorias) de conteos (n, n): aceptabilidad[i, r] cuenta
+        las muestras con la alternativa i en la posición r; victorias[i, k] las muestras
+        con i estrictamente por delante de k
+    """
+    n = valores.shape[1]
+    mejores = valores[:, None, :] > valores[:, :, None]
+    rangos = mejores.sum(axis=2)
+    aceptabilidad = np.zeros((n, n), dtype=np.int64)
+    np.add.at(aceptabilidad, (np.broadcast_to(np.arange(n), rangos.shape), rangos), 1)
+    victorias = mejores.sum(axis=0, dtype=np.int64).T
+    return aceptabilidad, victorias
+
+
+def _evaluar_lote(clave: str, matriz: np.ndarray, preferencia: np.ndarray, indiferencia: np.ndarray,
+                  veto: np.ndarray, beneficio: np.ndarray, pesos: np.ndarray, lambda_corte: float,
+                  metodo: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tarea de un proceso trabajador: evalúa un lote de pesos con un juego de umbrales.
+    """
+    pilas = _pilas_trabajador.get(clave)
+    if pilas is None:
+        _pilas_trabajador.clear()
+        pilas = calcular_pilas_criterios(matriz, preferencia, indiferencia, veto, beneficio)
+        _pilas_trabajador[clave] = pilas
+    credibilidad = credibilidad_por_lote(pilas[0], pilas[1], pesos)
+    valores = np.stack([explotar(s, lambda_corte, metodo) for s in credibilidad])
+    return contar_rangos(valores)
+
+
+def muestrear_pesos(rng: np.random.Generator, pesos: np.ndarray, muestras: int,
+                    concentracion: Optional[float]) -> np.ndarray:
+    """
+    Muestrea vectores de pesos normalizados (suman 1).
+
+    Args:
+        rng: generador de números aleatorios
+        pesos: pesos del escenario
+        muestras: cantidad de vectores
+        concentracion: None para muestrear uniforme en el simplex; si no, Dirichlet
+            centrada en los pesos del escenario (más alta = más cerca de ellos)
+
+    Returns:
+        Arreglo (muestras, m)
+    """
+    m = len(pesos)
+    if concentracion is None:
+        return rng.dirichlet(np.ones(m), size=muestras)
+    total = pesos.sum()
+    if total <= 0:
+        raise ValueError("Los pesos del escenario deben sumar más de 0")
+    # Dirichlet necesita parámetros positivos: los pesos en 0 quedan casi siempre en 0
+    alfa = np.maximum(pesos / total * concentracion, 1e-3)
+    return rng.dirichlet(alfa, size=muestras)
+
+
+class AnalizadorRobustez:
+    """
+    Ejecuta el análisis de robustez de pesos en lotes sobre un pool de procesos.
+    """
+
+    def __init__(self, num_procesos: int, presupuesto_bytes: int):
+        self.num_procesos = num_procesos
+        self.presupuesto_bytes = presupuesto_bytes
+        self._lock = threading.Lock()
+        # Un análisis a la vez: las pilas de cada trabajador son de un solo análisis y el presupuesto cuenta con eso
+        self._lock_analisis = threading.Lock()
+        self._ejecutor: Optional[ProcessPoolExecutor] = None
+        self._estadisticas = {"analisis": 0, "muestras": 0, "errores": 0, "reinicios": 0}
+
+    def _obtener_ejecutor(self) -> Optional[ProcessPoolExecutor]:
+        if self.num_procesos <= 0:
+            return None
+        with self._lock:
+            if self._ejecutor is None:
+                self._ejecutor = ProcessPoolExecutor(
+                    max_workers=self.num_procesos, mp_context=multiprocessing.get_context("spawn")
+                )
+                atexit.register(self.detener)
+            return self._ejecutor
+
+    def detener(self):
+        """
+        Termina los procesos del pool (se vuelven a crear en el siguiente análisis).
+        """
+        with self._lock:
+            ejecutor, self._ejecutor = self._ejecutor, None
+        if ejecutor is not None:
+            ejecutor.shutdown(wait=False, cancel_futures=True)
+
+    def _contar(self, clave: str, cantidad: int = 1):
+        with self._lock:
+            self._estadisticas[clave] += cantidad
+
+    def muestras_por_lote(self, n: int, m: int) -> int:
+        """
+        Muestras por lote para que cada proceso, con sus pilas c_j / d_j, quede dentro de su parte del
+        presupuesto de memoria.
+
+        Returns:
+            Muestras por lote, o 0 si ni una muestra cabe junto a las pilas
+        """
+        por_proceso = self.presupuesto_bytes // max(1, self.num_procesos)
+        pilas = 2 * m * n * n * 8
+        por_muestra = _ARREGLOS_POR_BLOQUE * n * n * 8
+        return int(min(MAX_MUESTRAS_POR_LOTE, max(0, por_proceso - pilas) // por_muestra))
+
+    def analizar(self, alternativas_matriz, pesos, preferencia, indiferencia, veto, direccion,
+                 lambda_corte: float, nombres_alternativas: Optional[Sequence[str]] = None,
+                 metodo: str = METODO_FLUJO_NETO, muestras: int = 10000,
+                 concentracion: Optional[float] = None, perturbacion_umbrales: float = 0.0,
+                 muestras_umbrales: int = 1, semilla: Optional[int] = None) -> Dict:
+        """
+        Ejecuta el análisis de robustez de pesos por Monte Carlo.
+
+        Args:
+            alternativas_matriz, pesos, preferencia, indiferencia, veto, direccion: datos del problema
+            lambda_corte: valor de corte lambda (-1 para el corte automático)
+            nombres_alternativas: nombres de las alternativas (por defecto A1, A2, ...)
+            metodo: METODO_FLUJO_NETO o METODO_DESTILACION
+            muestras: cantidad total de vectores de pesos
+            concentracion: ver muestrear_pesos
+            perturbacion_umbrales: variación relativa máxima de los umbrales (0 = sin perturbar);
+                P, Q y V de cada criterio se escalan por el mismo factor para conservar su orden
+            muestras_umbrales: juegos de umbrales a muestrear (las muestras de pesos se reparten entre ellos)
+            semilla: semilla del generador para resultados reproducibles
+
+        Returns:
+            Dict con la aceptabilidad de rangos y los índices de victoria por alternativa
+        """
+        if metodo not in (METODO_FLUJO_NETO, METODO_DESTILACION):
+            raise ValueError(f"Método de explotación desconocido: {metodo}")
+        if not 0.0 <= perturbacion_umbrales < 1.0:
+            raise ValueError("La perturbación de umbrales debe estar entre 0 y 1")
+        matriz, w, p, q, v, beneficio = preparar_datos_electre3(
+            alternativas_matriz, pesos, preferencia, indiferencia, veto, direccion
+        )
+        n, m = matriz.shape
+        if not nombres_alternativas:
+            nombres_alternativas = [f"A{i+1}" for i in range(n)]
+        lote = self.muestras_por_lote(n, m)
+        if lote == 0:
+            raise ValueError("El escenario es demasiado grande para el análisis de robustez")
+
+        inicio = time.perf_counter()
+        rng = np.random.default_rng(semilla)
+        if perturbacion_umbrales == 0.0:
+            muestras_umbrales = 1
+        muestras_umbrales = max(1, min(muestras_umbrales, muestras))
+        factores = np.ones((muestras_umbrales, m))
+        if perturbacion_umbrales > 0.0:
+            factores = rng.uniform(1.0 - perturbacion_umbrales, 1.0 + perturbacion_umbrales,
+                                   size=(muestras_umbrales, m))
+        muestras_pesos = muestrear_pesos(rng, w, muestras, concentracion)
+
+        base = hashlib.blake2b(matriz.tobytes() + beneficio.tobytes(), digest_size=16).hexdigest()
+        tareas = []
+        for k, grupo in enumerate(np.array_split(muestras_pesos, muestras_umbrales)):
+            clave = f"{base}:{factores[k].tobytes().hex()}"
+            for desde in range(0, len(grupo), lote):
+                tareas.append((clave, matriz, p * factores[k], q * factores[k], v * factores[k],
+                               beneficio, grupo[desde:desde + lote], float(lambda_corte), metodo))
+
+        aceptabilidad = np.zeros((n, n), dtype=np.int64)
+        victorias = np.zeros((n, n), dtype=np.int64)
+        with self._lock_analisis:
+            ejecutor = self._obtener_ejecutor()
+            try:
+                if ejecutor is None:
+                    resultados = (_evaluar_lote(*tarea) for tarea in tareas)
+                else:
+                    resultados = (futuro.result() for futuro in [ejecutor.submit(_evaluar_lote, *tarea) for tarea in tareas])
+                for conteo_rangos, conteo_victorias in resultados:
+                    aceptabilidad += conteo_rangos
+                    victorias += conteo_victorias
+            except BrokenProcessPool:
+                self._contar("errores")
+                self._contar("reinicios")
+                self.detener()
+                raise RuntimeError("Un proceso del análisis de robustez terminó inesperadamente")
+            finally:
+                _pilas_trabajador.clear()
+
+        self._contar("analisis")
+        self._contar("muestras", muestras)
+        nombres = list(nombres_alternativas)
+        return {
+            'metodo': metodo,
+            'lambda': lambda_corte,
+            'muestras': muestras,
+            'muestras_umbrales': muestras_umbrales,
+            'perturbacion_umbrales': perturbacion_umbrales,
+            'concentracion': concentracion,
+            'semilla': semilla,
+            'alternativas': nombres,
+            'aceptabilidad_rangos': {
+                nombre: (aceptabilidad[i] / muestras).tolist() for i, nombre in enumerate(nombres)
+            },
+            'indices_victoria': {
+                nombre: {otro: float(victorias[i, k] / muestras) for k, otro in enumerate(nombres) if k != i}
+                for i, nombre in enumerate(nombres)
+            },
+            'tiempo_segundos': time.perf_counter() - inicio,
+        }
+
+    def estado(self) -> Dict:
+        with self._lock:
+            estado = dict(self._estadisticas)
+            estado["iniciado"] = self._ejecutor is not None
+        estado["num_procesos"] = self.num_procesos
+        return estado
+
+
+analizador_robustez = AnalizadorRobustez(
+    num_procesos=settings.ELECTRE_ROBUSTEZ_PROCESOS,
+    presupuesto_bytes=settings.ELECTRE_MEMORIA_MAXIMA_MB * 1024 * 1024,
+)
@@ -0,0 +1,134 @@
+"""
+Benchmark de serialización JSON de las respuestas grandes.
+
+Compara el camino anterior contra RespuestaJSON (orjson con NumPy y datetime
+nativos) sobre datos sintéticos:
+- reporte_completo (sin response_model): antes jsonable_encoder + JSONResponse
+  con json de la biblioteca estándar y la matriz convertida con .tolist().
+- evaluaciones por escenario (con response_model): pydantic ya entrega datos
+  planos, así que solo cambia el render (json de la biblioteca estándar vs orjson).
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.benchmark_json --escenarios 20 --alternativas 300 --criterios 20
+"""
+import argparse
+import datetime
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.respuestas import RespuestaJSON
+
+
+def reporte_sintetico(escenarios: int, n: int, m: int, rng: np.random.Generator) -> Dict[str, Any]:
+    """
+    Reporte con la misma forma que obtener_reporte_completo_proyecto (matriz como arreglo de NumPy).
+    """
+    ahora = datetime.datetime.utcnow()
+    nombres = [f"A{i}" for i in range(n)]
+    return {
+        "proyecto": {"id": 1, "title": "Proyecto", "description": None, "created_at": ahora, "updated_at": ahora},
+        "escenarios": [
+            {
+                "id": k, "name": f"Escenario {k}", "description": None, "corte": -1.0,
+                "created_at": ahora, "updated_at": ahora,
+                "criterios": [
+                    {"id": j, "name": f"C{j}", "description": None, "weight": float(rng.random()),
+                     "is_benefit": bool(j % 2), "preference_threshold": None,
+                     "indifference_threshold": None, "veto_threshold": None}
+                    for j in range(m)
+                ],
+                "alternativas": [{"id": i, "name": nombre, "description": None} for i, nombre in enumerate(nombres)],
+                "matriz_decision": np.round(rng.random((n, m)) * 100, 2),
+                "resultados_electre": {
+                    "flujo_neto": nombres, "destilacion": nombres,
+                    "puntajes": {nombre: float(valor) for nombre, valor in zip(nombres, rng.random(n))},
+                    "concordancia": 0.9
+                },
+                "tiempos": {"espera_segundos": 0.0, "calculo_segundos": 0.1}
+            }
+            for k in range(escenarios)
+        ],
+        "tiempos": {"carga_segundos": 0.1, "total_segundos": 1.0}
+    }
+
+
+def evaluaciones_sinteticas(n: int, m: int, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    """
+    Listado de evaluaciones con criterio y alternativa anidados, como el esquema Evaluacion.
+    """
+    criterios = [
+        {"id": j, "name": f"C{j}", "description": None, "weight": 0.5, "is_benefit": True, "escenario_id": 1,
+         "preference_threshold": None, "indifference_threshold": None, "veto_threshold": None}
+        for j in range(m)
+    ]
+    alternativas = [{"id": i, "name": f"A{i}", "description": None, "escenario_id": 1} for i in range(n)]
+    return [
+        {"id": i * m + j, "value": float(valor), "escenario_id": 1,
+         "criterio": criterios[j], "alternativa": alternativas[i]}
+        for (i, j), valor in np.ndenumerate(np.round(rng.random((n, m)) * 100, 2))
+    ]
+
+
+def con_listas(contenido: Any) -> Any:
+    """
+    Copia del contenido con los arreglos convertidos con .tolist(), como hacía el camino anterior.
+    """
+    if isinstance(contenido, dict):
+        return {clave: con_listas(valor) for clave, valor in contenido.items()}
+    if isinstance(contenido, list):
+        return [con_listas(valor) for valor in contenido]
+    if isinstance(contenido, np.ndarray):
+        return contenido.tolist()
+    return contenido
+
+
+def medir(funcion: Callable[[], bytes], repeticiones: int) -> float:
+    """
+    Mejor tiempo en segundos de varias repeticiones.
+    """
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def comparar(nombre: str, anterior: Callable[[], bytes], nuevo: Callable[[], bytes], repeticiones: int):
+    if json.loads(anterior()) != json.loads(nuevo()):
+        print(f"{nombre}: ¡las dos serializaciones no producen el mismo JSON!")
+        return
+    tiempo_anterior = medir(anterior, repeticiones)
+    tiempo_nuevo = medir(nuevo, repeticiones)
+    print(f"{nombre}: {len(nuevo()) / 1e6:.2f} MB | anterior: {tiempo_anterior * 1e3:.1f} ms"
+          f" | orjson: {tiempo_nuevo * 1e3:.1f} ms | {tiempo_anterior / tiempo_nuevo:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escenarios", type=int, default=20)
+    parser.add_argument("--alternativas", type=int, default=300)
+    parser.add_argument("--criterios", type=int, default=20)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    reporte = reporte_sintetico(args.escenarios, args.alternativas, args.criterios, rng)
+    comparar("reporte_completo",
+             lambda: JSONResponse(jsonable_encoder(con_listas(reporte))).body,
+             lambda: RespuestaJSON(reporte).body,
+             args.repeticiones)
+    evaluaciones = evaluaciones_sinteticas(args.alternativas, args.criterios, rng)
+    comparar("evaluaciones por escenario (render)",
+             lambda: JSONResponse(evaluaciones).body,
+             lambda: RespuestaJSON(evaluaciones).body,
+             args.repeticiones)
+
+
+if __name__ == "__main__":
+    main()
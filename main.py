@@ -1,13 +1,37 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.respuestas import RespuestaJSON
+from app.db.async_session import async_engine
 from app.db.init_db import DBInitializer
+from app.utils.electreIII_libreria import registro_electre
+from app.utils.electreIII_procesos import pool_procesos_electre
+from app.utils.electreIII_robustez import analizador_robustez
 
 DBInitializer.create_tables()
+# Cargar la librería ELECTRE III una sola vez por proceso
+registro_electre.precargar()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Levantar los procesos aislados de ELECTRE III solo en el proceso del servidor
+    if pool_procesos_electre.activo:
+        pool_procesos_electre.iniciar()
+    yield
+    pool_procesos_electre.detener()
+    analizador_robustez.detener()
+    await async_engine.dispose()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
+    # Respuestas serializadas con orjson (NumPy y datetime nativos)
+    default_response_class=RespuestaJSON
 )
 
 # Configurar CORS
@@ -0,0 +1,55 @@
+"""
+Configuración común de las pruebas.
+
+La configuración de la aplicación se lee al importarla, así que las variables
+de entorno mínimas se definen aquí antes de cualquier import de app. Las pruebas
+usan una base SQLite en memoria compartida entre un engine síncrono y uno
+asíncrono (aiosqlite), ambos con StaticPool para que la base no desaparezca
+entre conexiones.
+
+Dependencias de las pruebas: pip install -r requirements-dev.txt
+"""
+import os
+
+URI_PRUEBAS = "sqlite:///file:electre_pruebas?mode=memory&cache=shared&uri=true"
+DIRECTORIO_DLL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app", "dll")
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", URI_PRUEBAS)
+os.environ.setdefault("SECRET_KEY", "pruebas")
+os.environ.setdefault("DLL_PATH", os.path.join(DIRECTORIO_DLL, "ELECTREIIISL.so"))
+os.environ.setdefault("DEBUGGER_PATH", DIRECTORIO_DLL)
+for variable in ("MYSQL_USER", "MYSQL_PASSWORD", "MYSQL_HOST", "MYSQL_PORT", "MYSQL_DATABASE"):
+    os.environ.setdefault(variable, "pruebas" if variable != "MYSQL_PORT" else "3306")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+
+@pytest.fixture(scope="session")
+def engines():
+    """
+    Engines síncrono y asíncrono sobre la misma base en memoria, con las tablas creadas.
+    """
+    from app.db.init_db import Base  # registra todos los modelos en Base.metadata
+
+    engine = create_engine(URI_PRUEBAS, poolclass=StaticPool, connect_args={"check_same_thread": False})
+    async_engine = create_async_engine(URI_PRUEBAS.replace("sqlite://", "sqlite+aiosqlite://", 1),
+                                       poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield engine, async_engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def sesiones(engines):
+    """
+    Fábricas de sesiones síncronas y asíncronas de la base de pruebas.
+    """
+    engine, async_engine = engines
+    return (
+        sessionmaker(autocommit=False, autoflush=False, bind=engine),
+        async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False),
+    )
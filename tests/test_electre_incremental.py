@@ -0,0 +1,181 @@
+"""
+Estado incremental de la credibilidad frente al recálculo completo.
+
+Después de cada tipo de cambio (valores, alternativas, criterios, umbrales) la
+credibilidad de EstadoCredibilidad debe ser idéntica a la que da
+calcular_matriz_credibilidad sobre los mismos datos.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pytest
+
+from app.utils.electreIII_escenario import EscenarioElectre, _construir_escenario
+from app.utils.electreIII_incremental import EstadoCredibilidad
+from app.utils.electreIII_numpy import calcular_matriz_credibilidad, preparar_datos_electre3
+
+ESCENARIO_ID = 1
+
+
+class EscenarioPrueba:
+    """
+    Escenario en memoria que se arma con el mismo constructor que usa el cargador de la BD,
+    así los umbrales por defecto (porcentaje del rango) se calculan igual que en la API.
+    """
+
+    def __init__(self, rng: np.random.Generator, n: int, m: int):
+        self.rng = rng
+        self.alternativas: List[int] = list(range(1, n + 1))
+        # id -> [peso, preferencia, indiferencia, veto, beneficio]; None usa el umbral por defecto
+        self.criterios: Dict[int, list] = {}
+        self.valores: Dict[Tuple[int, int], float] = {}
+        for j in range(m):
+            self.agregar_criterio(100 + j, preferencia=2.0 if j % 2 == 0 else None,
+                                  indiferencia=0.5 if j % 3 == 0 else None,
+                                  veto=6.0 if j % 2 == 0 else None)
+
+    def valor(self) -> float:
+        return float(self.rng.integers(0, 20))
+
+    def agregar_criterio(self, criterio_id: int, preferencia: Optional[float] = None,
+                         indiferencia: Optional[float] = None, veto: Optional[float] = None):
+        self.criterios[criterio_id] = [float(self.rng.integers(1, 5)), preferencia, indiferencia, veto,
+                                       criterio_id % 2 == 0]
+        for alternativa_id in self.alternativas:
+            self.valores[(alternativa_id, criterio_id)] = self.valor()
+
+    def agregar_alternativa(self) -> int:
+        alternativa_id = max(self.alternativas) + 1
+        self.alternativas.append(alternativa_id)
+        for criterio_id in self.criterios:
+            self.valores[(alternativa_id, criterio_id)] = self.valor()
+        return alternativa_id
+
+    def datos(self) -> EscenarioElectre:
+        filas = [
+            (ESCENARIO_ID, -1, alternativa_id, f"A{alternativa_id}", criterio_id, f"C{criterio_id}",
+             peso, preferencia, indiferencia, veto, beneficio, self.valores[(alternativa_id, criterio_id)])
+            for alternativa_id in self.alternativas
+            for criterio_id, (peso, preferencia, indiferencia, veto, beneficio) in sorted(self.criterios.items())
+        ]
+        return _construir_escenario(ESCENARIO_ID, filas)
+
+
+def credibilidad_completa(datos: EscenarioElectre) -> np.ndarray:
+    matriz, pesos, preferencia, indiferencia, veto, beneficio = preparar_datos_electre3(
+        datos.matriz_decision, datos.pesos, datos.preferencia, datos.indiferencia, datos.veto, datos.direccion
+    )
+    return calcular_matriz_credibilidad(matriz, pesos, preferencia, indiferencia, veto, beneficio)
+
+
+def verificar(estado: EstadoCredibilidad, escenario: EscenarioPrueba):
+    np.testing.assert_array_equal(estado.credibilidad, credibilidad_completa(escenario.datos()))
+
+
+@pytest.fixture
+def escenario() -> EscenarioPrueba:
+    return EscenarioPrueba(np.random.default_rng(0), n=10, m=5)
+
+
+@pytest.fixture
+def estado(escenario) -> EstadoCredibilidad:
+    estado = EstadoCredibilidad(escenario.datos())
+    verificar(estado, escenario)
+    return estado
+
+
+def test_parchar_valores(escenario, estado):
+    for _ in range(20):
+        cambios = []
+        for _ in range(3):
+            alternativa_id = int(escenario.rng.choice(escenario.alternativas))
+            criterio_id = int(escenario.rng.choice(list(escenario.criterios)))
+            escenario.valores[(alternativa_id, criterio_id)] = float(escenario.rng.integers(-5, 30))
+            cambios.append((alternativa_id, criterio_id, escenario.valores[(alternativa_id, criterio_id)]))
+        assert estado.actualizar_valores(cambios)
+        verificar(estado, escenario)
+
+
+def test_sincronizar_valores(escenario, estado):
+    escenario.valores[(escenario.alternativas[0], 100)] = 50.0
+    estado.sincronizar(escenario.datos())
+    verificar(estado, escenario)
+
+
+def test_agregar_y_quitar_alternativas(escenario, estado):
+    for _ in range(3):
+        escenario.agregar_alternativa()
+        estado.sincronizar(escenario.datos())
+        verificar(estado, escenario)
+    for alternativa_id in (escenario.alternativas[0], escenario.alternativas[4], escenario.alternativas[-1]):
+        escenario.alternativas.remove(alternativa_id)
+        estado.sincronizar(escenario.datos())
+        verificar(estado, escenario)
+
+
+def test_agregar_y_quitar_criterios(escenario, estado):
+    escenario.agregar_criterio(200)
+    estado.sincronizar(escenario.datos())
+    verificar(estado, escenario)
+    escenario.agregar_criterio(201, preferencia=3.0, indiferencia=1.0, veto=10.0)
+    estado.sincronizar(escenario.datos())
+    verificar(estado, escenario)
+    for criterio_id in (100, 201):
+        del escenario.criterios[criterio_id]
+        estado.sincronizar(escenario.datos())
+        verificar(estado, escenario)
+
+
+def test_cambiar_umbrales_y_pesos(escenario, estado):
+    criterios = escenario.criterios
+    criterios[100][1] = 4.0            # preferencia definida
+    estado.sincronizar(escenario.datos())
+    verificar(estado, escenario)
+    criterios[101][2] = 0.25           # indiferencia antes por defecto
+    estado.sincronizar(escenario.datos())
+    verificar(estado, escenario)
+    criterios[102][3] = None           # veto vuelve al valor por defecto
+    estado.sincronizar(escenario.datos())
+    verificar(estado, escenario)
+    criterios[103][0] = 7.0            # solo el peso
+    estado.sincronizar(escenario.datos())
+    verificar(estado, escenario)
+    criterios[104][4] = not criterios[104][4]  # dirección
+    estado.sincronizar(escenario.datos())
+    verificar(estado, escenario)
+
+
+def test_umbral_por_defecto_sigue_al_rango(escenario, estado):
+    # Criterio 101 sin preferencia ni veto definidos: cambiar el máximo de la columna mueve sus umbrales
+    assert escenario.criterios[101][1] is None
+    escenario.valores[(escenario.alternativas[2], 101)] = 100.0
+    assert estado.actualizar_valores([(escenario.alternativas[2], 101, 100.0)])
+    verificar(estado, escenario)
+
+
+def test_secuencia_aleatoria_de_cambios(escenario, estado):
+    rng = escenario.rng
+    siguiente_criterio = 300
+    for _ in range(100):
+        operacion = rng.random()
+        if operacion < 0.4:
+            alternativa_id = int(rng.choice(escenario.alternativas))
+            criterio_id = int(rng.choice(list(escenario.criterios)))
+            escenario.valores[(alternativa_id, criterio_id)] = float(rng.integers(-5, 30))
+            assert estado.actualizar_valores([(alternativa_id, criterio_id,
+                                               escenario.valores[(alternativa_id, criterio_id)])])
+        else:
+            if operacion < 0.5:
+                escenario.agregar_alternativa()
+            elif operacion < 0.6 and len(escenario.alternativas) > 3:
+                escenario.alternativas.remove(int(rng.choice(escenario.alternativas)))
+            elif operacion < 0.7:
+                escenario.agregar_criterio(siguiente_criterio)
+                siguiente_criterio += 1
+            elif operacion < 0.8 and len(escenario.criterios) > 2:
+                del escenario.criterios[int(rng.choice(list(escenario.criterios)))]
+            else:
+                criterio = escenario.criterios[int(rng.choice(list(escenario.criterios)))]
+                criterio[int(rng.integers(0, 4))] = float(rng.integers(1, 8))
+            estado.sincronizar(escenario.datos())
+        verificar(estado, escenario)
@@ -0,0 +1,82 @@
+"""
+Paridad de rankings entre el motor NumPy y la librería nativa ELECTRE III.
+
+Ambos motores deben devolver exactamente el mismo orden (incluido el desempate
+por posición en la matriz) con flujo neto y con destilación, sobre matrices
+aleatorias y sobre el CSV de ejemplo del repositorio.
+"""
+import os
+
+import numpy as np
+import pytest
+
+from app.utils.electreIII import MOTOR_DLL, MOTOR_NUMPY, ejecutar_electre3_local
+from app.utils.electreIII_csv import parsear_csv_electre
+from app.utils.electreIII_libreria import registro_electre
+from app.utils.electreIII_numpy import METODO_DESTILACION, METODO_FLUJO_NETO
+
+CSV_EJEMPLO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "electre3_bd_2.csv")
+METODOS = (METODO_FLUJO_NETO, METODO_DESTILACION)
+CORTES = (-1, 0.5, 0.7)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def libreria():
+    """
+    Las pruebas se omiten si la librería nativa no se puede cargar en esta plataforma.
+    """
+    try:
+        registro_electre.cargar()
+    except (OSError, AttributeError) as e:
+        pytest.skip(f"Librería ELECTRE III no disponible: {e}")
+
+
+def problema_aleatorio(rng: np.random.Generator):
+    """
+    Matriz y parámetros aleatorios; la mitad de las veces con valores enteros para forzar empates.
+    """
+    n, m = int(rng.integers(2, 15)), int(rng.integers(1, 7))
+    if rng.random() < 0.5:
+        matriz = rng.integers(0, 10, size=(n, m)).astype(float)
+    else:
+        matriz = np.round(rng.random((n, m)) * 100, 2)
+    pesos = np.round(rng.random(m), 2) + 0.01
+    indiferencia = np.round(rng.random(m) * 3, 1)
+    preferencia = indiferencia + np.round(rng.random(m) * 5, 1)
+    veto = preferencia + np.round(rng.random(m) * 20, 1)
+    direccion = rng.integers(0, 2, size=m)
+    nombres = [f"A{i}" for i in range(n)]
+    return matriz, pesos, preferencia, indiferencia, veto, direccion, nombres
+
+
+def rankings(matriz, pesos, preferencia, indiferencia, veto, direccion, corte, nombres, metodo):
+    return [
+        ejecutar_electre3_local(motor, matriz, pesos, preferencia, indiferencia, veto,
+                                direccion, corte, nombres, metodo)
+        for motor in (MOTOR_DLL, MOTOR_NUMPY)
+    ]
+
+
+@pytest.mark.parametrize("metodo", METODOS)
+@pytest.mark.parametrize("semilla", range(5))
+def test_matrices_aleatorias(semilla, metodo):
+    rng = np.random.default_rng(semilla)
+    for _ in range(20):
+        matriz, pesos, preferencia, indiferencia, veto, direccion, nombres = problema_aleatorio(rng)
+        for corte in CORTES:
+            dll, numpy = rankings(matriz, pesos, preferencia, indiferencia, veto, direccion,
+                                  corte, nombres, metodo)
+            assert dll == numpy, (matriz.tolist(), corte)
+
+
+@pytest.mark.parametrize("metodo", METODOS)
+@pytest.mark.parametrize("corte", CORTES)
+def test_csv_de_ejemplo(metodo, corte):
+    with open(CSV_EJEMPLO, "rb") as flujo:
+        datos = parsear_csv_electre(flujo)
+
+    dll, numpy = rankings(datos["matriz_decision"], datos["pesos"], datos["preferencia"],
+                          datos["indiferencia"], datos["veto"], datos["direccion"], corte,
+                          datos["nombres_alternativas"], metodo)
+    assert dll == numpy
+    assert sorted(numpy) == sorted(datos["nombres_alternativas"])
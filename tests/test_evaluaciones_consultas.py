@@ -0,0 +1,114 @@
+"""
+Cantidad de consultas de los listados de evaluaciones.
+
+Con criterio y alternativa cargados con selectinload cada listado hace un número
+fijo de consultas, sin importar cuántas evaluaciones devuelva (sin N+1).
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import models
+from app.api import deps
+from app.db.async_session import get_async_db
+from app.db.session import get_db
+from main import app
+
+ALTERNATIVAS = 4
+CRITERIOS = 3
+
+
+@pytest.fixture(scope="module")
+def escenario(sesiones):
+    """
+    Usuario con un proyecto y un escenario de ALTERNATIVAS x CRITERIOS evaluaciones.
+    """
+    SesionPruebas, _ = sesiones
+    with SesionPruebas() as db:
+        user = models.User(email="consultas@pruebas.com", name="pruebas", hashed_password="x", is_active=True)
+        db.add(user)
+        db.flush()
+        proyecto = models.Proyecto(title="Proyecto", owner_id=user.id)
+        db.add(proyecto)
+        db.flush()
+        escenario = models.Escenario(name="Escenario", proyecto_id=proyecto.id, corte=-1)
+        db.add(escenario)
+        db.flush()
+        alternativas = [models.Alternativa(name=f"A{i}", escenario_id=escenario.id) for i in range(ALTERNATIVAS)]
+        criterios = [models.Criterio(name=f"C{j}", weight=1.0, is_benefit=True, escenario_id=escenario.id)
+                     for j in range(CRITERIOS)]
+        db.add_all(alternativas + criterios)
+        db.flush()
+        db.add_all([
+            models.Evaluacion(escenario_id=escenario.id, alternativa_id=a.id, criterio_id=c.id, value=float(i + j))
+            for i, a in enumerate(alternativas) for j, c in enumerate(criterios)
+        ])
+        db.commit()
+        db.refresh(user)
+        db.expunge(user)
+        return {
+            "user": user,
+            "escenario_id": escenario.id,
+            "alternativa_id": alternativas[0].id,
+            "criterio_id": criterios[0].id,
+        }
+
+
+@pytest.fixture(scope="module")
+def cliente(engines, sesiones, escenario):
+    """
+    Cliente de la API sobre la base de pruebas con el usuario del escenario ya autenticado.
+    """
+    SesionPruebas, SesionAsyncPruebas = sesiones
+
+    def get_db_pruebas():
+        with SesionPruebas() as db:
+            yield db
+
+    async def get_async_db_pruebas():
+        async with SesionAsyncPruebas() as db:
+            yield db
+
+    async def get_current_user_async_pruebas():
+        return escenario["user"]
+
+    app.dependency_overrides[get_db] = get_db_pruebas
+    app.dependency_overrides[get_async_db] = get_async_db_pruebas
+    app.dependency_overrides[deps.get_current_user] = lambda: escenario["user"]
+    app.dependency_overrides[deps.get_current_user_async] = get_current_user_async_pruebas
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def contar_consultas(engines):
+    """
+    Cuenta las sentencias ejecutadas en ambos engines de pruebas.
+    """
+    engine, async_engine = engines
+    consultas = []
+
+    def registrar(conn, cursor, statement, *args):
+        consultas.append(statement)
+
+    for destino in (engine, async_engine.sync_engine):
+        event.listen(destino, "before_cursor_execute", registrar)
+    yield consultas
+    for destino in (engine, async_engine.sync_engine):
+        event.remove(destino, "before_cursor_execute", registrar)
+
+
+@pytest.mark.parametrize("ruta, clave, cantidad", [
+    ("escenario", "escenario_id", ALTERNATIVAS * CRITERIOS),
+    ("alternativa", "alternativa_id", CRITERIOS),
+    ("criterio", "criterio_id", ALTERNATIVAS),
+])
+def test_listado_evaluaciones_consultas_fijas(cliente, escenario, contar_consultas, ruta, clave, cantidad):
+    respuesta = cliente.get(f"/api/v1/evaluaciones/{ruta}/{escenario[clave]}")
+
+    assert respuesta.status_code == 200
+    evaluaciones = respuesta.json()
+    assert len(evaluaciones) == cantidad
+    assert all(e["criterio"]["id"] and e["alternativa"]["id"] for e in evaluaciones)
+    # Verificación de pertenencia, evaluaciones y un SELECT ... IN para criterios y otro para alternativas
+    assert len(contar_consultas) == 4, contar_consultas